@@ -0,0 +1,492 @@
+# attempt_store.py
+import atexit
+import json
+import math
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Historique des tentatives, à côté de stats.json
+ATTEMPTS_DB_PATH = os.path.join(os.path.dirname(__file__), "data", "attempts.sqlite3")
+
+# Taille maximale d'un lot d'insertions et délai maximal avant son écriture (secondes)
+BATCH_SIZE = 256
+BATCH_DELAY = 0.5
+
+# Budget de stockage : au-delà, les tentatives les plus anciennes ne sont plus conservées
+# que dans les agrégats (voir AttemptStore.compact)
+MAX_RAW_EVENTS = 500_000
+# Les agrégats journaliers plus anciens sont supprimés (les agrégats hebdomadaires restent)
+DAY_ROLLUP_RETENTION_DAYS = 400
+# Compaction tous les COMPACT_EVERY événements écrits
+COMPACT_EVERY = 5_000
+
+# Migrations du schéma, dans l'ordre : la base est à la version PRAGMA user_version et
+# chaque migration manquante est appliquée une fois, dans une transaction
+_MIGRATIONS = [
+    # 1 : historique détaillé
+    """
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY,
+    event_id TEXT NOT NULL UNIQUE,
+    ts REAL NOT NULL,
+    mode TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    item TEXT NOT NULL,
+    correct INTEGER NOT NULL,
+    played TEXT,
+    expected TEXT,
+    latency REAL
+);
+CREATE INDEX IF NOT EXISTS idx_attempts_mode_item_ts ON attempts (mode, item, ts);
+CREATE INDEX IF NOT EXISTS idx_attempts_kind_item_ts ON attempts (kind, item, ts);
+CREATE INDEX IF NOT EXISTS idx_attempts_ts ON attempts (ts);
+""",
+    # 2 : agrégats et métadonnées (les agrégats sont reconstruits à l'ouverture)
+    """
+CREATE TABLE IF NOT EXISTS rollups (
+    period TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    item TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    correct INTEGER NOT NULL,
+    latency_sum REAL NOT NULL,
+    latency_count INTEGER NOT NULL,
+    PRIMARY KEY (period, bucket, kind, mode, item)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+""",
+]
+SCHEMA_VERSION = len(_MIGRATIONS)
+
+_UPSERT_ROLLUP = """
+INSERT INTO rollups (period, bucket, mode, kind, item, attempts, correct, latency_sum, latency_count)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (period, bucket, kind, mode, item) DO UPDATE SET
+    attempts = attempts + excluded.attempts,
+    correct = correct + excluded.correct,
+    latency_sum = latency_sum + excluded.latency_sum,
+    latency_count = latency_count + excluded.latency_count
+"""
+
+_INSERT = """
+INSERT OR IGNORE INTO attempts (event_id, ts, mode, kind, item, correct, played, expected, latency)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def day_bucket(timestamp: float) -> str:
+    """Agrégat journalier (date locale), ex: '2026-10-19'."""
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d")
+
+
+def week_bucket(timestamp: float) -> str:
+    """Agrégat hebdomadaire (semaine ISO), ex: '2026-W43'."""
+    year, week, _ = datetime.fromtimestamp(timestamp).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def _rollup_keys(timestamp: float):
+    return (("day", day_bucket(timestamp)), ("week", week_bucket(timestamp)), ("all", "all"))
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+class AttemptStore:
+    """
+    Historique de toutes les tentatives (une ligne par tentative) dans une base SQLite.
+
+    La base est en mode WAL : les lectures (requêtes des écrans de statistiques) ne
+    bloquent pas l'écriture. Un seul thread écrit : record() place l'événement dans une
+    file et retourne immédiatement ; le thread d'écriture insère les événements par lots
+    (au plus BATCH_SIZE, au plus BATCH_DELAY secondes d'attente) dans une transaction.
+
+    Chaque événement porte un identifiant unique (event_id) : réinsérer un événement
+    déjà connu est sans effet.
+
+    Des agrégats par jour, par semaine et sur tout l'historique (tentatives, réussites,
+    temps de réponse par mode et par élément) sont mis à jour dans la même transaction
+    que l'insertion : les écrans de synthèse les lisent sans parcourir l'historique.
+    La compaction (compact) borne la taille de l'historique détaillé.
+    """
+
+    def __init__(self, path: str = ATTEMPTS_DB_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory, exist_ok=True)
+
+        self._writer_connection = _connect(path)
+        self._migrate()
+        self._compacted_before = float(self._get_meta("compacted_before", "0"))
+        self._written_since_compaction = 0
+        if self._get_meta("rollups_built") is None:
+            self._rebuild_rollups()
+        self._reader_connection = _connect(path)
+        self._reader_lock = threading.Lock()
+
+        self._queue = queue.Queue()
+        self._closed = False
+        self._writer = threading.Thread(target=self._run_writer, name="attempt-writer", daemon=True)
+        self._writer.start()
+
+    def _migrate(self):
+        """Applique les migrations manquantes (la base est d'abord sauvegardée si elle contient des données)."""
+        connection = self._writer_connection
+        version = connection.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        if version > 0:
+            backup = sqlite3.connect(f"{self.path}.v{version}.bak")
+            try:
+                connection.backup(backup)
+            finally:
+                backup.close()
+        # Bases antérieures à la numérotation (version 0) : les migrations sont idempotentes
+        for target in range(version + 1, SCHEMA_VERSION + 1):
+            connection.executescript(
+                f"BEGIN;\n{_MIGRATIONS[target - 1]}\nPRAGMA user_version = {target};\nCOMMIT;"
+            )
+
+    # ---------- Écriture ----------
+    def record(self, mode: str, kind: str, item: str, correct: bool,
+               played: Optional[Iterable[int]] = None, expected: Optional[Iterable[int]] = None,
+               latency: Optional[float] = None, timestamp: Optional[float] = None,
+               event_id: Optional[str] = None) -> str:
+        """Enregistre une tentative (non bloquant). Retourne l'identifiant de l'événement."""
+        event_id = event_id or uuid.uuid4().hex
+        row = (
+            event_id,
+            timestamp if timestamp is not None else time.time(),
+            mode,
+            kind,
+            item,
+            1 if correct else 0,
+            json.dumps(sorted(played)) if played is not None else None,
+            json.dumps(sorted(expected)) if expected is not None else None,
+            latency,
+        )
+        self._queue.put(row)
+        return event_id
+
+    def _run_writer(self):
+        while True:
+            row = self._queue.get()
+            if row is None:
+                self._queue.task_done()
+                return
+            batch = [row]
+            deadline = time.time() + BATCH_DELAY
+            stop = False
+            while len(batch) < BATCH_SIZE:
+                try:
+                    row = self._queue.get(timeout=max(0.0, deadline - time.time()))
+                except queue.Empty:
+                    break
+                if row is None:
+                    stop = True
+                    break
+                batch.append(row)
+            try:
+                self._write_batch(batch)
+            except Exception:
+                # Lot inexploitable (ligne mal formée...) : il est abandonné, le thread d'écriture continue
+                pass
+            finally:
+                for _ in range(len(batch) + (1 if stop else 0)):
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _write_batch(self, batch: List[Tuple]):
+        try:
+            with self._writer_connection:
+                rollups = {}
+                for row in batch:
+                    event_id, timestamp, mode, kind, item, correct, _, _, latency = row
+                    if timestamp < self._compacted_before:
+                        # Période déjà compactée : l'événement y est peut-être déjà compté
+                        continue
+                    if self._writer_connection.execute(_INSERT, row).rowcount == 0:
+                        continue  # Événement déjà connu
+                    for period, bucket in _rollup_keys(timestamp):
+                        totals = rollups.setdefault((period, bucket, mode, kind, item), [0, 0, 0.0, 0])
+                        totals[0] += 1
+                        totals[1] += correct
+                        if latency is not None:
+                            totals[2] += latency
+                            totals[3] += 1
+                self._writer_connection.executemany(
+                    _UPSERT_ROLLUP, [key + tuple(totals) for key, totals in rollups.items()]
+                )
+            self._written_since_compaction += len(batch)
+            if self._written_since_compaction >= COMPACT_EVERY:
+                self.compact()
+        except sqlite3.Error:
+            # Base momentanément indisponible : l'historique est perdu, pas la session
+            pass
+
+    # ---------- Agrégats et compaction (thread d'écriture) ----------
+    def _get_meta(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        row = self._writer_connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, key: str, value: str):
+        self._writer_connection.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (key, value),
+        )
+
+    def _rebuild_rollups(self):
+        """Reconstruit les agrégats à partir de l'historique détaillé (base créée avant les agrégats)."""
+        with self._writer_connection:
+            self._writer_connection.execute("DELETE FROM rollups")
+            rollups = {}
+            cursor = self._writer_connection.execute("SELECT ts, mode, kind, item, correct, latency FROM attempts")
+            for timestamp, mode, kind, item, correct, latency in cursor:
+                for period, bucket in _rollup_keys(timestamp):
+                    totals = rollups.setdefault((period, bucket, mode, kind, item), [0, 0, 0.0, 0])
+                    totals[0] += 1
+                    totals[1] += correct
+                    if latency is not None:
+                        totals[2] += latency
+                        totals[3] += 1
+            self._writer_connection.executemany(
+                _UPSERT_ROLLUP, [key + tuple(totals) for key, totals in rollups.items()]
+            )
+            self._set_meta("rollups_built", "1")
+
+    def compact(self, max_raw_events: int = MAX_RAW_EVENTS,
+                day_retention_days: int = DAY_ROLLUP_RETENTION_DAYS):
+        """
+        Borne le stockage : au-delà de `max_raw_events` tentatives, les plus anciennes ne
+        subsistent que dans les agrégats (déjà à jour) ; les agrégats journaliers de plus de
+        `day_retention_days` jours sont supprimés. Les événements antérieurs à la limite
+        compactée sont ensuite refusés, pour ne pas être comptés deux fois.
+        """
+        self._written_since_compaction = 0
+        with self._writer_connection:
+            total = self._writer_connection.execute("SELECT COUNT(*) FROM attempts").fetchone()[0]
+            excess = total - max_raw_events
+            if excess > 0:
+                cutoff = self._writer_connection.execute(
+                    "SELECT ts FROM attempts ORDER BY ts LIMIT 1 OFFSET ?", (excess,)
+                ).fetchone()[0]
+                self._writer_connection.execute("DELETE FROM attempts WHERE ts < ?", (cutoff,))
+                self._compacted_before = max(self._compacted_before, cutoff)
+                self._set_meta("compacted_before", repr(self._compacted_before))
+            oldest_day = day_bucket(time.time() - day_retention_days * 86400)
+            self._writer_connection.execute(
+                "DELETE FROM rollups WHERE period = 'day' AND bucket < ?", (oldest_day,)
+            )
+
+    def flush(self):
+        """Attend l'écriture de tous les événements en file (avant une requête de synthèse)."""
+        if not self._closed:
+            self._queue.join()
+
+    def export_events(self) -> List[Tuple]:
+        """Tous les événements détaillés (non compactés), par date : (event_id, ts, mode, kind, item, correct, played, expected, latency)."""
+        self.flush()
+        return self._query(
+            "SELECT event_id, ts, mode, kind, item, correct, played, expected, latency FROM attempts ORDER BY ts, event_id"
+        )
+
+    def import_events(self, rows: Iterable[Iterable]) -> int:
+        """
+        Ajoute des événements exportés (non bloquant) ; les événements déjà connus sont ignorés.
+        Les lignes mal formées (fichier d'un autre appareil) sont rejetées avant la file
+        d'écriture. Retourne le nombre de lignes rejetées.
+        """
+        rejected = 0
+        for row in rows:
+            row = _valid_event_row(row)
+            if row is None:
+                rejected += 1
+            else:
+                self._queue.put(row)
+        return rejected
+
+    def close(self):
+        if self._closed:
+            return
+        self._queue.put(None)
+        self._writer.join()
+        self._closed = True
+        self._writer_connection.close()
+        self._reader_connection.close()
+
+    # ---------- Requêtes (indexées) ----------
+    def _query(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        with self._reader_lock:
+            return self._reader_connection.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _rollup_filters(kind: str, mode: Optional[str], period: str, buckets: Iterable[str]):
+        buckets = list(buckets)
+        clauses = ["period = ?", f"bucket IN ({', '.join('?' * len(buckets))})", "kind = ?"]
+        params = [period] + buckets + [kind]
+        if mode is not None:
+            clauses.append("mode = ?")
+            params.append(mode)
+        return " AND ".join(clauses), params
+
+    def _since_buckets(self, since: Optional[float]):
+        """Agrégats couvrant la période [since, maintenant] (jours entiers)."""
+        if since is None:
+            return "all", ["all"]
+        start = datetime.fromtimestamp(since).date()
+        days = (datetime.now().date() - start).days
+        return "day", [(start + timedelta(days=offset)).isoformat() for offset in range(max(0, days) + 1)]
+
+    def top_errors(self, kind: str, limit: int = 5, mode: Optional[str] = None,
+                   since: Optional[float] = None) -> List[Tuple[str, int]]:
+        """
+        Éléments à travailler : [(élément, solde d'erreurs)], solde décroissant.
+        Le solde est calculé sur la période demandée (erreurs - réussites), à partir des
+        agrégats (`since` est arrondi au début de sa journée).
+        """
+        period, buckets = self._since_buckets(since)
+        where, params = self._rollup_filters(kind, mode, period, buckets)
+        return self._query(
+            f"SELECT item, SUM(attempts - 2 * correct) AS balance FROM rollups "
+            f"WHERE {where} GROUP BY item HAVING balance > 0 ORDER BY balance DESC, item LIMIT ?",
+            tuple(params) + (limit,),
+        )
+
+    def error_weights(self, kind: str, mode: Optional[str] = None,
+                      since: Optional[float] = None) -> Dict[str, int]:
+        """Solde d'erreurs par élément (erreurs - réussites, éléments à solde positif uniquement)."""
+        period, buckets = self._since_buckets(since)
+        where, params = self._rollup_filters(kind, mode, period, buckets)
+        rows = self._query(
+            f"SELECT item, SUM(attempts - 2 * correct) AS balance FROM rollups "
+            f"WHERE {where} GROUP BY item HAVING balance > 0",
+            tuple(params),
+        )
+        return dict(rows)
+
+    def period_summary(self, mode: str, period: str = "day",
+                       timestamp: Optional[float] = None) -> Dict[str, Optional[float]]:
+        """
+        Synthèse d'un mode sur le jour ('day'), la semaine ('week') ou tout l'historique ('all')
+        contenant `timestamp` : tentatives, réussites, temps de réponse moyen.
+        """
+        timestamp = timestamp if timestamp is not None else time.time()
+        bucket = {"day": day_bucket, "week": week_bucket}.get(period, lambda _: "all")(timestamp)
+        attempts, correct, latency_sum, latency_count = self._query(
+            "SELECT COALESCE(SUM(attempts), 0), COALESCE(SUM(correct), 0), "
+            "COALESCE(SUM(latency_sum), 0), COALESCE(SUM(latency_count), 0) "
+            "FROM rollups WHERE period = ? AND bucket = ? AND mode = ?",
+            (period, bucket, mode),
+        )[0]
+        return {
+            "attempts": attempts,
+            "correct": correct,
+            "mean_latency": latency_sum / latency_count if latency_count else None,
+        }
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def _valid_event_row(row) -> Optional[Tuple]:
+    """Ligne d'export (event_id, ts, mode, kind, item, correct, played, expected, latency) vérifiée, ou None."""
+    try:
+        row = tuple(row)
+    except TypeError:
+        return None
+    if len(row) != 9:
+        return None
+    event_id, timestamp, mode, kind, item, correct, played, expected, latency = row
+    if not (isinstance(event_id, str) and event_id and _is_number(timestamp)
+            and all(isinstance(value, str) for value in (mode, kind, item))
+            and correct in (0, 1) and not isinstance(correct, float)
+            and all(value is None or isinstance(value, str) for value in (played, expected))
+            and (latency is None or _is_number(latency))):
+        return None
+    return (event_id, float(timestamp), mode, kind, item, int(correct), played, expected, latency)
+
+
+def _quarantine_database(path: str) -> None:
+    """Renomme une base illisible (et ses fichiers WAL) en <nom>.corrupt-<date>."""
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            try:
+                os.replace(path + suffix, f"{path}.corrupt-{stamp}{suffix}")
+            except OSError:
+                pass
+
+
+_store: Optional[AttemptStore] = None
+_store_lock = threading.Lock()
+
+
+def get_attempt_store() -> Optional[AttemptStore]:
+    """Retourne l'historique des tentatives (ouvert au premier accès), ou None s'il est indisponible."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            try:
+                _store = AttemptStore(ATTEMPTS_DB_PATH)
+            except sqlite3.OperationalError:
+                # Base verrouillée, disque plein... : historique indisponible pour cette session
+                return None
+            except sqlite3.DatabaseError:
+                # Fichier endommagé : mis de côté, l'historique repart d'une base neuve
+                _quarantine_database(ATTEMPTS_DB_PATH)
+                try:
+                    _store = AttemptStore(ATTEMPTS_DB_PATH)
+                except sqlite3.Error:
+                    return None
+            except sqlite3.Error:
+                return None
+            atexit.register(_store.close)
+        return _store
+
+
+def set_attempts_path(path: str) -> None:
+    """Change la base de l'historique (profil actif) : l'ancienne est fermée, la nouvelle ouverte au premier accès."""
+    global _store, ATTEMPTS_DB_PATH
+    with _store_lock:
+        if os.path.abspath(path) == os.path.abspath(ATTEMPTS_DB_PATH):
+            return
+        ATTEMPTS_DB_PATH = path
+        previous, _store = _store, None
+    if previous is not None:
+        previous.close()
+
+
+def close_attempt_store() -> None:
+    """Écrit les tentatives en file et ferme l'historique (rouvert au prochain accès)."""
+    global _store
+    with _store_lock:
+        previous, _store = _store, None
+    if previous is not None:
+        previous.close()
+
+
+def record_attempt(mode: str, kind: str, item: str, correct: bool,
+                   played: Optional[Iterable[int]] = None, expected: Optional[Iterable[int]] = None,
+                   latency: Optional[float] = None) -> None:
+    """Enregistre une tentative dans l'historique (sans effet si la base est indisponible)."""
+    store = get_attempt_store()
+    if store is not None:
+        store.record(mode, kind, item, correct, played, expected, latency)
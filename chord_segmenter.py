@@ -0,0 +1,120 @@
+# chord_segmenter.py
+from typing import Optional, Set, Tuple
+
+SEGMENTATION_MODES = ('onset', 'release')
+
+
+class ChordSegmenter:
+    """
+    Découpe le flux de notes MIDI en tentatives d'accord.
+
+    - 'onset' : la tentative est soumise dès que `expected_size` notes distinctes sont
+      arrivées dans la fenêtre d'attaque (`onset_window` secondes après la première note),
+      sans attendre le relâchement des touches.
+    - 'release' : la tentative est soumise quand toutes les touches sont relâchées depuis
+      `release_timeout` secondes (comportement historique).
+
+    En mode 'onset', si la taille attendue est inconnue ou si la fenêtre expire avant
+    d'avoir reçu assez de notes (accord plaqué lentement), on retombe sur la détection
+    par relâchement.
+
+    Les horodatages sont ceux d'arrivée des messages MIDI, fournis par l'appelant :
+    le segmenteur ne lit jamais l'horloge lui-même.
+    """
+
+    def __init__(self, mode: str = 'onset', onset_window: float = 0.08,
+                 release_timeout: float = 0.3, expected_size: Optional[int] = None):
+        if mode not in SEGMENTATION_MODES:
+            raise ValueError(f"Mode de segmentation inconnu : {mode}")
+        self.mode = mode
+        self.onset_window = onset_window
+        self.release_timeout = release_timeout
+        self.expected_size = expected_size
+
+        self.notes_on: Set[int] = set()
+        self.attempt: Set[int] = set()
+        self.first_onset_time: Optional[float] = None
+        self.last_onset_time: Optional[float] = None
+        self.last_release_time: Optional[float] = None
+        # Horodatages (première note, dernière note) de la dernière tentative soumise
+        self.submitted_timing: Tuple[Optional[float], Optional[float]] = (None, None)
+        # Après une soumission à l'attaque, les touches encore enfoncées appartiennent
+        # au geste déjà jugé : on attend qu'une touche soit relâchée avant d'en ouvrir un autre.
+        self._latched = False
+        self._released_since_latch = False
+
+    def reset(self, expected_size: Optional[int] = None, forget_held: bool = False):
+        """
+        Oublie la tentative en cours. Les touches enfoncées restent suivies, sauf avec
+        `forget_held` (périphérique déconnecté : leurs note_off n'arriveront jamais).
+        """
+        if expected_size is not None:
+            self.expected_size = expected_size
+        if forget_held:
+            self.notes_on.clear()
+            self._latched = False
+            self._released_since_latch = False
+        self.attempt.clear()
+        self.first_onset_time = None
+        self.last_release_time = None
+
+    def feed(self, msg, timestamp: float) -> Optional[Set[int]]:
+        """
+        Traite un message MIDI arrivé à `timestamp`.
+        Retourne la tentative terminée si elle l'est à l'attaque, sinon None.
+        """
+        if msg.type == 'note_on' and msg.velocity > 0:
+            return self._note_on(msg.note, timestamp)
+        if msg.type == 'note_off' or (msg.type == 'note_on' and msg.velocity == 0):
+            self._note_off(msg.note, timestamp)
+        return None
+
+    def poll(self, now: float) -> Optional[Set[int]]:
+        """Détection par relâchement : retourne la tentative si le délai est écoulé."""
+        if (self.attempt and not self.notes_on and self.last_release_time is not None
+                and now - self.last_release_time > self.release_timeout):
+            return self._submit()
+        return None
+
+    def _note_on(self, note: int, timestamp: float) -> Optional[Set[int]]:
+        if self._latched:
+            if not self._released_since_latch:
+                # Note ajoutée au geste déjà soumis : ignorée
+                self.notes_on.add(note)
+                return None
+            # Nouveau geste, comme après un relâchement complet
+            self._latched = False
+
+        if self.first_onset_time is None:
+            self.first_onset_time = timestamp
+
+        self.notes_on.add(note)
+        self.attempt.add(note)
+        self.last_onset_time = timestamp
+        self.last_release_time = None
+
+        if (self.mode == 'onset' and self.expected_size
+                and len(self.attempt) >= self.expected_size
+                and timestamp - self.first_onset_time <= self.onset_window):
+            self._latched = True
+            self._released_since_latch = False
+            return self._submit()
+        return None
+
+    def _note_off(self, note: int, timestamp: float):
+        self.notes_on.discard(note)
+        if self._latched:
+            self._released_since_latch = True
+            if not self.notes_on:
+                self._latched = False
+            return
+        if not self.notes_on and self.attempt and self.last_release_time is None:
+            self.last_release_time = timestamp
+
+    def _submit(self) -> Set[int]:
+        attempt = set(self.attempt)
+        self.submitted_timing = (self.first_onset_time, self.last_onset_time)
+        self.attempt.clear()
+        self.first_onset_time = None
+        self.last_release_time = None
+        return attempt
@@ -0,0 +1,135 @@
+# chord_tracking.py
+from typing import List, Optional, Tuple
+
+from music_theory import recognize_chord_from_mask, get_chord_completions
+
+
+class ArpeggioRecognizer:
+    """
+    Reconnaît les accords arpégés (notes non simultanées) à partir d'un flux de notes.
+
+    Chaque classe de hauteur porte une énergie qui vaut 1 à l'attaque et décroît
+    exponentiellement avec le temps (demi-vie = `window`). Une classe de hauteur fait
+    partie de la fenêtre tant que son énergie dépasse 0.5 : une note isolée y reste donc
+    `window` secondes, une note répétée un peu plus longtemps.
+
+    La décroissance est calculée paresseusement à partir de l'horodatage de chaque
+    classe de hauteur : chaque événement coûte O(12) = O(1), quelle que soit la durée
+    de l'arpège.
+    """
+
+    THRESHOLD = 0.5
+
+    def __init__(self, window: float = 1.5):
+        self.window = window
+        self._energy = [0.0] * 12
+        self._stamp = [0.0] * 12
+        self._last_note = [0] * 12
+        self.mask = 0
+        self.bass_note: Optional[int] = None
+        self.recognized: Tuple[Optional[str], Optional[str]] = (None, None)
+
+    def reset(self):
+        """Vide la fenêtre."""
+        for pc in range(12):
+            self._energy[pc] = 0.0
+        self.mask = 0
+        self.bass_note = None
+        self.recognized = (None, None)
+
+    def add_note(self, note: int, timestamp: float) -> Tuple[Optional[str], Optional[str]]:
+        """Ajoute une attaque et retourne l'accord reconnu dans la fenêtre (nom, renversement)."""
+        pc = note % 12
+        self._energy[pc] = self._decayed(pc, timestamp) + 1.0
+        self._stamp[pc] = timestamp
+        self._last_note[pc] = note
+        return self.update(timestamp)
+
+    def update(self, timestamp: float) -> Tuple[Optional[str], Optional[str]]:
+        """Recalcule la fenêtre à l'instant donné (fait sortir les notes trop anciennes)."""
+        mask = 0
+        bass_note = None
+        for pc in range(12):
+            if self._energy[pc] and self._decayed(pc, timestamp) >= self.THRESHOLD:
+                mask |= 1 << pc
+                note = self._last_note[pc]
+                if bass_note is None or note < bass_note:
+                    bass_note = note
+        self.mask = mask
+        self.bass_note = bass_note
+        if bass_note is None:
+            self.recognized = (None, None)
+        else:
+            self.recognized = recognize_chord_from_mask(mask, bass_note % 12)
+        return self.recognized
+
+    def pitch_classes(self) -> List[int]:
+        """Classes de hauteur présentes dans la fenêtre, par ordre croissant."""
+        return [pc for pc in range(12) if self.mask & (1 << pc)]
+
+    def note_count(self) -> int:
+        """Nombre de classes de hauteur présentes dans la fenêtre."""
+        return bin(self.mask).count("1")
+
+    def _decayed(self, pc: int, timestamp: float) -> float:
+        elapsed = max(0.0, timestamp - self._stamp[pc])
+        return self._energy[pc] * 0.5 ** (elapsed / self.window)
+
+
+class HeldChordTracker:
+    """
+    Suit les touches enfoncées et l'accord qu'elles forment, mis à jour à chaque
+    note_on / note_off sans attendre le relâchement.
+
+    Le masque des classes de hauteur est maintenu incrémentalement (compteur par
+    classe de hauteur) ; la reconnaissance et les complétions sont des consultations
+    de tables précalculées.
+    """
+
+    def __init__(self, max_completions: int = 5):
+        self.max_completions = max_completions
+        self.held_notes = set()
+        self._pc_count = [0] * 12
+        self.mask = 0
+        self.result = (None, None, ())
+
+    def reset(self):
+        self.held_notes.clear()
+        for pc in range(12):
+            self._pc_count[pc] = 0
+        self.mask = 0
+        self.result = (None, None, ())
+
+    def feed(self, msg) -> bool:
+        """Traite un message MIDI. Retourne True si l'accord affiché doit changer."""
+        if msg.type == 'note_on' and msg.velocity > 0:
+            if msg.note in self.held_notes:
+                return False
+            self.held_notes.add(msg.note)
+            pc = msg.note % 12
+            if self._pc_count[pc] == 0:
+                self.mask |= 1 << pc
+            self._pc_count[pc] += 1
+        elif msg.type == 'note_off':
+            if msg.note not in self.held_notes:
+                return False
+            self.held_notes.discard(msg.note)
+            pc = msg.note % 12
+            self._pc_count[pc] -= 1
+            if self._pc_count[pc] == 0:
+                self.mask &= ~(1 << pc)
+        else:
+            return False
+        return self._refresh()
+
+    def _refresh(self) -> bool:
+        if self.held_notes:
+            name, inversion = recognize_chord_from_mask(self.mask, min(self.held_notes) % 12)
+            completions = get_chord_completions(self.mask, self.max_completions) if len(self.held_notes) >= 2 else ()
+            result = (name, inversion, completions)
+        else:
+            result = (None, None, ())
+        if result == self.result:
+            return False
+        self.result = result
+        return True
@@ -0,0 +1,102 @@
+# clock.py
+import heapq
+import itertools
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+
+class MonotonicClock:
+    """Horloge réelle : temps monotone (insensible aux changements de l'heure système)."""
+
+    virtual = False
+
+    def now(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class VirtualClock:
+    """
+    Horloge de simulation : le temps n'avance que lorsque le programme attend.
+
+    sleep(s) avance l'horloge de s secondes et retourne immédiatement : les pauses des
+    modes (retour visuel, lecture d'un accord, attente d'une touche) ne coûtent rien, et
+    une session de plusieurs minutes est simulée en quelques millisecondes avec la même
+    logique qu'en temps réel.
+
+    call_at(t, callback) programme un rappel à l'instant virtuel t (ex: arrivée d'un
+    message MIDI rejoué) ; les rappels dus sont exécutés dans l'ordre pendant l'avance,
+    l'horloge indiquant leur instant. L'horloge n'est pas partagée entre threads : elle
+    est avancée par le thread du mode.
+    """
+
+    virtual = True
+
+    def __init__(self, start: float = 0.0):
+        self._now = start
+        self._timers = []
+        self._sequence = itertools.count()
+
+    def now(self) -> float:
+        return self._now
+
+    def sleep(self, seconds: float) -> None:
+        self.advance(max(0.0, seconds))
+
+    def advance(self, seconds: float) -> None:
+        """Avance l'horloge en exécutant les rappels dus entre-temps."""
+        target = self._now + seconds
+        while self._timers and self._timers[0][0] <= target:
+            when, _, callback = heapq.heappop(self._timers)
+            self._now = max(self._now, when)
+            callback()
+        self._now = max(self._now, target)
+
+    def call_at(self, when: float, callback: Callable[[], None]) -> None:
+        heapq.heappush(self._timers, (when, next(self._sequence), callback))
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> None:
+        self.call_at(self._now + max(0.0, delay), callback)
+
+    @property
+    def pending_timers(self) -> int:
+        return len(self._timers)
+
+
+# Horloge utilisée par les modes, l'entrée MIDI et le clavier
+_clock = MonotonicClock()
+
+
+def get_clock():
+    return _clock
+
+
+def set_clock(clock) -> object:
+    """Remplace l'horloge active et retourne la précédente."""
+    global _clock
+    previous, _clock = _clock, clock
+    return previous
+
+
+@contextmanager
+def using_clock(clock):
+    """Utilise `clock` le temps d'un bloc (ex: simulation sur VirtualClock)."""
+    previous = set_clock(clock)
+    try:
+        yield clock
+    finally:
+        set_clock(previous)
+
+
+def now() -> float:
+    """Instant courant de l'horloge active, en secondes (origine arbitraire)."""
+    return _clock.now()
+
+
+def sleep(seconds: float) -> None:
+    """Pause sur l'horloge active (instantanée sur une horloge virtuelle)."""
+    _clock.sleep(seconds)
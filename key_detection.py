@@ -0,0 +1,145 @@
+# key_detection.py
+from typing import Optional
+
+from music_theory import get_note_name, get_chord_type_from_name
+
+# Profils de tonalité de Krumhansl-Kessler (poids de chaque degré chromatique à partir de la tonique)
+MAJOR_PROFILE = [6.35, 2.23, 3.48, 2.33, 4.38, 4.09, 2.52, 5.19, 2.39, 3.66, 2.29, 2.88]
+MINOR_PROFILE = [6.33, 2.68, 3.52, 5.38, 2.60, 3.53, 2.54, 4.75, 3.98, 2.69, 3.34, 3.17]
+
+# Degrés chromatiques (demi-tons depuis la tonique) -> chiffre romain
+MAJOR_DEGREES = ['I', 'bII', 'II', 'bIII', 'III', 'IV', '#IV', 'V', 'bVI', 'VI', 'bVII', 'VII']
+MINOR_DEGREES = ['I', 'bII', 'II', 'III', '#III', 'IV', '#IV', 'V', 'VI', '#VI', 'VII', '#VII']
+
+
+def _centered_rotations(profile):
+    """Précalcule les 12 rotations centrées d'un profil et leur norme."""
+    mean = sum(profile) / 12.0
+    centered = [p - mean for p in profile]
+    norm = sum(c * c for c in centered) ** 0.5
+    return [[centered[(pc - tonic) % 12] for pc in range(12)] for tonic in range(12)], norm
+
+
+_MAJOR_KEYS, _MAJOR_NORM = _centered_rotations(MAJOR_PROFILE)
+_MINOR_KEYS, _MINOR_NORM = _centered_rotations(MINOR_PROFILE)
+
+
+class KeyEstimator:
+    """
+    Estimation en continu de la tonalité à partir des notes jouées.
+
+    Tient un histogramme des classes de hauteur à décroissance exponentielle
+    (demi-vie `half_life` secondes), mis à jour en O(12) à chaque note, puis le corrèle
+    (coefficient de Pearson) avec les 24 profils de Krumhansl-Kessler précalculés.
+    Aucune structure n'est allouée par événement : l'histogramme est modifié en place.
+    """
+
+    def __init__(self, half_life: float = 8.0, min_energy: float = 3.0):
+        self.half_life = half_life
+        # Énergie totale minimale avant de proposer une tonalité
+        self.min_energy = min_energy
+        self._histogram = [0.0] * 12
+        self._last_time: Optional[float] = None
+        self.tonic_pc: Optional[int] = None
+        self.is_minor = False
+        self.confidence = 0.0
+
+    def reset(self):
+        for pc in range(12):
+            self._histogram[pc] = 0.0
+        self._last_time = None
+        self.tonic_pc = None
+        self.is_minor = False
+        self.confidence = 0.0
+
+    def add_note(self, note: int, timestamp: float, weight: float = 1.0) -> bool:
+        """Ajoute une note. Retourne True si la tonalité estimée a changé."""
+        histogram = self._histogram
+        if self._last_time is not None and timestamp > self._last_time:
+            decay = 0.5 ** ((timestamp - self._last_time) / self.half_life)
+            for pc in range(12):
+                histogram[pc] *= decay
+        self._last_time = timestamp
+        histogram[note % 12] += weight
+        return self._estimate()
+
+    def _estimate(self) -> bool:
+        histogram = self._histogram
+        total = 0.0
+        for value in histogram:
+            total += value
+        if total < self.min_energy:
+            return False
+
+        mean = total / 12.0
+        variance = 0.0
+        for value in histogram:
+            variance += (value - mean) * (value - mean)
+        if variance <= 0.0:
+            return False
+        hist_norm = variance ** 0.5
+
+        best_score = -2.0
+        best_tonic = None
+        best_minor = False
+        for tonic in range(12):
+            major = _MAJOR_KEYS[tonic]
+            minor = _MINOR_KEYS[tonic]
+            major_score = 0.0
+            minor_score = 0.0
+            # Les profils étant centrés, la moyenne de l'histogramme n'intervient pas au numérateur
+            for pc in range(12):
+                major_score += histogram[pc] * major[pc]
+                minor_score += histogram[pc] * minor[pc]
+            major_score /= hist_norm * _MAJOR_NORM
+            minor_score /= hist_norm * _MINOR_NORM
+            if major_score > best_score:
+                best_score, best_tonic, best_minor = major_score, tonic, False
+            if minor_score > best_score:
+                best_score, best_tonic, best_minor = minor_score, tonic, True
+
+        changed = (best_tonic != self.tonic_pc or best_minor != self.is_minor)
+        self.tonic_pc = best_tonic
+        self.is_minor = best_minor
+        self.confidence = best_score
+        return changed
+
+    def key_name(self) -> Optional[str]:
+        """Nom de la tonalité estimée (ex: 'Sol majeur'), ou None si pas encore assez de notes."""
+        if self.tonic_pc is None:
+            return None
+        return f"{get_note_name(self.tonic_pc)} {'mineur' if self.is_minor else 'majeur'}"
+
+    def roman_degree(self, chord_name: str) -> Optional[str]:
+        """Chiffre romain de l'accord dans la tonalité estimée."""
+        if self.tonic_pc is None:
+            return None
+        return roman_degree(chord_name, self.tonic_pc, self.is_minor)
+
+
+def roman_degree(chord_name: str, tonic_pc: int, is_minor: bool) -> Optional[str]:
+    """
+    Retourne le degré de l'accord dans la tonalité (ex: 'V7', 'ii', 'vii°').
+    Majuscules pour les accords majeurs et de septième de dominante, minuscules pour
+    les accords mineurs et diminués.
+    """
+    from data.chords import all_chords
+    if chord_name not in all_chords:
+        return None
+    root_pc = min(all_chords[chord_name]) % 12
+    degrees = MINOR_DEGREES if is_minor else MAJOR_DEGREES
+    numeral = degrees[(root_pc - tonic_pc) % 12]
+
+    chord_type = get_chord_type_from_name(chord_name)
+    if chord_type in ("Mineur", "Diminué"):
+        # Ne mettre en minuscules que le chiffre, pas l'altération
+        numeral = numeral[:-len(numeral.lstrip('b#'))] + numeral.lstrip('b#').lower()
+    if chord_type == "Diminué":
+        numeral += "°"
+    if "7ème" in chord_name:
+        numeral += "7"
+    elif chord_type == "6ème":
+        numeral += "6"
+    elif chord_type == "4ème":
+        numeral += "sus4"
+    return numeral
@@ -1,15 +1,65 @@
 import sys
-import time
+import atexit
+from collections import deque
+from contextlib import contextmanager
 
 from rich.console import Console
 from rich.prompt import Prompt
 
+import clock
+
 console = Console()
 
+# Session terminal actuellement propriétaire du terminal (voir TerminalSession)
+_active_session = None
+
+# Commandes injectées hors terminal (touches MIDI réservées, scripts), lues avant le clavier
+_pending_commands = deque()
+# Lecture du terminal : désactivée automatiquement si l'entrée standard n'est pas un terminal
+_terminal_polling = sys.stdin.isatty()
+
+
+def push_command(command):
+    """Injecte une commande ('q', 'r', 'n', ...) comme si elle avait été tapée au clavier."""
+    _pending_commands.append(command)
+
+
+def set_terminal_polling(enabled):
+    """Active ou désactive la lecture du terminal (les commandes injectées restent lues)."""
+    global _terminal_polling
+    _terminal_polling = enabled
+
+
+def is_terminal_polling():
+    """Indique si le terminal est lu par wait_for_input."""
+    return _terminal_polling
+
+
+def clear_commands():
+    """Oublie les commandes injectées non encore lues."""
+    _pending_commands.clear()
+
+
+def has_pending_commands():
+    """Indique s'il reste des commandes injectées non lues."""
+    return bool(_pending_commands)
+
+
+def _pop_command():
+    return _pending_commands.popleft() if _pending_commands else None
+
 if sys.platform == 'win32':
     import msvcrt
 
     # ---------- Gestion du mode raw permanent (Windows) ----------
+    def _enter_session_mode():
+        """Non applicable sur Windows."""
+        return None
+
+    def _leave_session_mode(saved_settings):
+        """Non applicable sur Windows."""
+        pass
+
     def enable_raw_mode():
         """Non applicable sur Windows."""
         pass
@@ -21,7 +71,13 @@ if sys.platform == 'win32':
     # ---------- Fonctions de lecture clavier (Windows) ----------
     def wait_for_input(timeout=0.05):
         """Saisie de caractère non-bloquante pour Windows."""
-        start_time = time.time()
+        command = _pop_command()
+        if command is not None:
+            return command
+        if not _terminal_polling:
+            clock.sleep(timeout)
+            return _pop_command()
+        start_time = clock.now()
         while True:
             if msvcrt.kbhit():
                 ch = msvcrt.getch()
@@ -37,9 +93,9 @@ if sys.platform == 'win32':
                 except UnicodeDecodeError:
                     return None # Ignorer les caractères non décodables
 
-            if time.time() - start_time > timeout:
+            if clock.now() - start_time > timeout:
                 return None
-            time.sleep(0.01)
+            clock.sleep(0.01)
 
 else:
     # Pour les systèmes Unix (Linux, macOS)
@@ -51,9 +107,37 @@ else:
     _fd = sys.stdin.fileno()
     _old_settings = None
 
+    def _enter_session_mode():
+        """
+        Désactive écho et mode ligne en conservant le post-traitement de sortie,
+        pour que les rendus Rich restent corrects. Retourne les réglages à restaurer.
+        """
+        try:
+            saved_settings = termios.tcgetattr(_fd)
+            new_settings = termios.tcgetattr(_fd)
+            new_settings[3] &= ~(termios.ECHO | termios.ICANON)
+            new_settings[6][termios.VMIN] = 1
+            new_settings[6][termios.VTIME] = 0
+            termios.tcsetattr(_fd, termios.TCSADRAIN, new_settings)
+            return saved_settings
+        except termios.error:
+            # Pas dans un vrai TTY (ex: exécution dans un IDE)
+            return None
+
+    def _leave_session_mode(saved_settings):
+        """Restaure les réglages sauvegardés par _enter_session_mode."""
+        if saved_settings:
+            try:
+                termios.tcsetattr(_fd, termios.TCSADRAIN, saved_settings)
+            except termios.error:
+                pass
+
     def enable_raw_mode():
         """Passe le terminal en mode raw permanent (désactive écho et mode ligne)."""
         global _old_settings
+        if _active_session is not None:
+            # Une session terminal détient déjà le terminal
+            return
         try:
             _old_settings = termios.tcgetattr(_fd)
             tty.setraw(_fd)
@@ -66,12 +150,20 @@ else:
 
     def disable_raw_mode():
         """Restaure le mode normal du terminal."""
+        if _active_session is not None:
+            return
         if _old_settings:
             termios.tcsetattr(_fd, termios.TCSADRAIN, _old_settings)
 
     # ---------- Fonctions de lecture clavier (Unix) ----------
     def wait_for_input(timeout=0.05):
         """Saisie de caractère non-bloquante sans affichage et sans saut de ligne."""
+        command = _pop_command()
+        if command is not None:
+            return command
+        if not _terminal_polling:
+            clock.sleep(timeout)
+            return _pop_command()
         rlist, _, _ = select.select([sys.stdin], [], [], timeout)
         if rlist:
             ch = sys.stdin.read(1)
@@ -80,6 +172,67 @@ else:
             return ch
         return None
 
+# ---------- Session terminal ----------
+class TerminalSession:
+    """
+    Session terminal d'un mode : le terminal passe en saisie directe une seule fois
+    à l'entrée et n'est restauré qu'une seule fois à la sortie, y compris en cas d'erreur.
+
+    Les rendus (Live, print) sont écrits directement sans quitter la session.
+    Les entrées imbriquées (`with session:` dans une session active) sont sans effet.
+    """
+
+    def __init__(self):
+        self._saved_settings = None
+        self._depth = 0
+        self._owns_terminal = False
+
+    @property
+    def active(self):
+        return self._owns_terminal
+
+    def __enter__(self):
+        global _active_session
+        self._depth += 1
+        if self._depth == 1 and _active_session is None:
+            self._saved_settings = _enter_session_mode()
+            self._owns_terminal = True
+            _active_session = self
+            # Filet de sécurité si le processus se termine sans passer par __exit__
+            atexit.register(self.restore)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._depth = max(0, self._depth - 1)
+        if self._depth == 0:
+            self.restore()
+        return False
+
+    def restore(self):
+        """Restaure le terminal. Idempotent : seul le premier appel a un effet."""
+        global _active_session
+        if not self._owns_terminal:
+            return
+        self._owns_terminal = False
+        if _active_session is self:
+            _active_session = None
+        atexit.unregister(self.restore)
+        _leave_session_mode(self._saved_settings)
+        self._saved_settings = None
+
+    @contextmanager
+    def suspended(self):
+        """Rend temporairement le terminal en mode normal (ex: pour un Prompt.ask)."""
+        if not self._owns_terminal:
+            yield
+            return
+        _leave_session_mode(self._saved_settings)
+        try:
+            yield
+        finally:
+            self._saved_settings = _enter_session_mode()
+
+
 # ---------- Fonctions communes ----------
 def wait_for_any_key(inport):
     """Attend n'importe quelle touche du clavier (non bloquant sur le MIDI)."""
@@ -0,0 +1,106 @@
+# latency_sketch.py
+import math
+from typing import Any, Dict, Iterable, Optional
+
+DEFAULT_RELATIVE_ACCURACY = 0.02
+# Nombre maximal de classes : au-delà, les plus petites valeurs sont regroupées
+DEFAULT_MAX_BINS = 512
+
+
+class DDSketch:
+    """
+    Esquisse de quantiles DDSketch (erreur relative garantie sur les quantiles).
+
+    Une valeur x > 0 tombe dans la classe ceil(log_gamma(x)), avec
+    gamma = (1 + alpha) / (1 - alpha) : tout quantile est restitué à alpha près (2 %
+    par défaut). L'ajout d'une valeur est en O(1), deux esquisses de même précision se
+    fusionnent en additionnant leurs classes.
+
+    L'état est un dictionnaire sérialisable en JSON, modifié en place : une esquisse
+    construite sur un dictionnaire de stats.json met directement à jour ce dictionnaire.
+    """
+
+    def __init__(self, state: Optional[Dict[str, Any]] = None,
+                 relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY, max_bins: int = DEFAULT_MAX_BINS):
+        if state is None:
+            state = {}
+        if not state:
+            state.update({
+                "alpha": relative_accuracy,
+                "max_bins": max_bins,
+                "count": 0,
+                "zero": 0,
+                "min": None,
+                "max": None,
+                "bins": {},
+            })
+        self.state = state
+        alpha = state["alpha"]
+        self._gamma = (1.0 + alpha) / (1.0 - alpha)
+        self._log_gamma = math.log(self._gamma)
+
+    @property
+    def count(self) -> int:
+        return self.state["count"]
+
+    def add(self, value: float, weight: int = 1) -> None:
+        """Ajoute une valeur (secondes, >= 0)."""
+        state = self.state
+        state["count"] += weight
+        state["min"] = value if state["min"] is None else min(state["min"], value)
+        state["max"] = value if state["max"] is None else max(state["max"], value)
+        if value <= 0.0:
+            state["zero"] += weight
+            return
+        key = str(math.ceil(math.log(value) / self._log_gamma))
+        bins = state["bins"]
+        if key in bins:
+            bins[key] += weight
+        else:
+            bins[key] = weight
+            if len(bins) > state["max_bins"]:
+                self._collapse_lowest()
+
+    def _collapse_lowest(self):
+        # Regroupe les deux plus petites classes (rare : seulement à la création d'une classe)
+        bins = self.state["bins"]
+        lowest, second = sorted(bins, key=int)[:2]
+        bins[second] += bins.pop(lowest)
+
+    def merge(self, other: "DDSketch") -> None:
+        """Ajoute le contenu d'une autre esquisse de même précision."""
+        if other.state["alpha"] != self.state["alpha"]:
+            raise ValueError("Impossible de fusionner des esquisses de précisions différentes")
+        if not other.count:
+            return
+        state, other_state = self.state, other.state
+        state["count"] += other_state["count"]
+        state["zero"] += other_state["zero"]
+        for bound, pick in (("min", min), ("max", max)):
+            if other_state[bound] is not None:
+                state[bound] = other_state[bound] if state[bound] is None else pick(state[bound], other_state[bound])
+        bins = state["bins"]
+        for key, count in other_state["bins"].items():
+            bins[key] = bins.get(key, 0) + count
+        while len(bins) > state["max_bins"]:
+            self._collapse_lowest()
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Quantile q (0 <= q <= 1), ou None si l'esquisse est vide."""
+        state = self.state
+        if not state["count"]:
+            return None
+        rank = q * (state["count"] - 1)
+        if rank < state["zero"]:
+            return 0.0
+        seen = state["zero"]
+        for key in sorted(state["bins"], key=int):
+            seen += state["bins"][key]
+            if seen > rank:
+                # Milieu (relatif) de la classe [gamma^(k-1), gamma^k]
+                value = 2.0 * self._gamma ** int(key) / (1.0 + self._gamma)
+                return min(max(value, state["min"]), state["max"])
+        return state["max"]
+
+    def quantiles(self, qs: Iterable[float] = (0.5, 0.9, 0.99)) -> Dict[float, Optional[float]]:
+        return {q: self.quantile(q) for q in qs}
@@ -1,6 +1,5 @@
 # coding=utf-8
 import mido
-import time
 import random
 import os
 import sys
@@ -23,10 +22,19 @@ from rich.table import Table
 from rich.errors import MarkupError
 from rich.live import Live
 
+import clock
 from data.chords import all_chords, chord_aliases, enharmonic_map, three_note_chords, gammes_majeures, cadences, DEGREE_MAP, progression_examples, pop_rock_progressions, tonal_progressions
 from ui import get_colored_notes_string, display_stats, display_stats_fixed
 from midi_handler import *
 from screen_handler import clear_screen
+from settings import app_settings
+from midi_input import MidiInputNormalizer, MergedMidiInput
+from midi_commands import MidiCommandRouter
+from midi_watcher import MidiPortWatcher, ReconnectingOutput
+from keyboard_handler import set_terminal_polling
+from profiles import select_profile, profile_dir
+from midi_recorder import RecordingInput, session_recording_path
+import virtual_midi
 
 from modes.single_chord_mode import single_chord_mode
 from modes.listen_and_reveal_mode import listen_and_reveal_mode
@@ -43,6 +51,7 @@ from modes.tonal_progression_mode import tonal_progression_mode
 from modes.reversed_chords_mode import reversed_chords_mode
 from modes.chord_transitions_mode import chord_transitions_mode
 from modes.missing_chord_mode import missing_chord_mode
+from modes.arpeggio_mode import arpeggio_mode
 
 #TODO : voir si supprimable une fois tout refactorisé
 console = Console()
@@ -96,6 +105,31 @@ def display_degrees_table(tonalite, gammes_filtrees):
 
     console.print(table)
 
+def apply_input_settings(inport):
+    """Applique les paramètres de normalisation MIDI courants au port d'entrée."""
+    inport.configure(
+        channels=app_settings.midi_channels,
+        sustain=app_settings.sustain_pedal,
+        min_velocity=app_settings.ghost_min_velocity,
+        min_duration=app_settings.ghost_min_duration,
+    )
+
+def apply_navigation_settings(router, progression_selection_mode):
+    """Active la navigation au clavier MIDI si la sélection de progression est 'midi'."""
+    router.set_bindings(app_settings.midi_bindings, app_settings.midi_selection_base)
+    router.enabled = progression_selection_mode == 'midi'
+    # Sans navigation MIDI, le clavier d'ordinateur reste le seul moyen de quitter
+    set_terminal_polling(sys.stdin.isatty() and (app_settings.terminal_polling or not router.enabled))
+
+def apply_recording_settings(recording_input, profile_name):
+    """Démarre ou arrête l'enregistrement MIDI de la session (dossier recordings/ du profil)."""
+    if app_settings.record_sessions and not recording_input.recording:
+        path = session_recording_path(os.path.join(profile_dir(profile_name), "recordings"))
+        recording_input.start_recording(path)
+        console.print(f"Enregistrement de la session : [bold green]{path}[/bold green]")
+    elif not app_settings.record_sessions and recording_input.recording:
+        recording_input.stop_recording()
+
 def options_menu(use_timer, timer_duration, progression_selection_mode, play_progression_before_start, chord_set_choice):
     """Menu d'options pour configurer le programme."""
     while True:
@@ -122,6 +156,26 @@ def options_menu(use_timer, timer_duration, progression_selection_mode, play_pro
         panel_content.append(f"{progression_text}\n", style=progression_style)
         panel_content.append("[5] Accords autorisés: ", style="bold white")
         panel_content.append(f"{'Tous les accords' if chord_set_choice == 'all' else 'Majeurs/Mineurs'}\n", style="bold green")
+        panel_content.append("[6] Détection des accords: ", style="bold white")
+        if app_settings.chord_segmentation == 'onset':
+            panel_content.append(f"À l'attaque ({app_settings.onset_window * 1000:.0f} ms)\n", style="bold green")
+        else:
+            panel_content.append("Au relâchement\n", style="bold yellow")
+        panel_content.append("[7] Définir la fenêtre d'attaque\n", style="bold white")
+        panel_content.append("[8] Pédale de sustain: ", style="bold white")
+        panel_content.append("Prise en compte\n" if app_settings.sustain_pedal else "Ignorée\n", style="bold green" if app_settings.sustain_pedal else "bold red")
+        panel_content.append("[9] Canal MIDI d'entrée: ", style="bold white")
+        if app_settings.midi_channels is None:
+            panel_content.append("Tous\n", style="bold green")
+        else:
+            panel_content.append(f"{', '.join(str(c + 1) for c in sorted(app_settings.midi_channels))}\n", style="bold yellow")
+        panel_content.append("[10] Clavier d'ordinateur pendant les exercices: ", style="bold white")
+        if app_settings.terminal_polling or progression_selection_mode != 'midi':
+            panel_content.append("Lu\n", style="bold green")
+        else:
+            panel_content.append("Ignoré (navigation MIDI uniquement)\n", style="bold yellow")
+        panel_content.append("[11] Enregistrement MIDI des sessions: ", style="bold white")
+        panel_content.append("Activé\n" if app_settings.record_sessions else "Désactivé\n", style="bold green" if app_settings.record_sessions else "bold red")
         panel_content.append("[q] Retour au menu principal", style="bold white")
 
         panel = Panel(
@@ -131,7 +185,7 @@ def options_menu(use_timer, timer_duration, progression_selection_mode, play_pro
         )
         console.print(panel)
 
-        choice = Prompt.ask("Votre choix", choices=['1', '2', '3', '4', '5', 'q'], show_choices=False, console=console)
+        choice = Prompt.ask("Votre choix", choices=['1', '2', '3', '4', '5', '6', '7', '8', '9', '10', '11', 'q'], show_choices=False, console=console)
 
         if choice == '1':
             use_timer = not use_timer
@@ -142,13 +196,13 @@ def options_menu(use_timer, timer_duration, progression_selection_mode, play_pro
                 if new_duration > 0:
                     timer_duration = new_duration
                     console.print(f"Durée du minuteur mise à jour à [bold green]{timer_duration:.2f} secondes.[/bold green]")
-                    time.sleep(1)
+                    clock.sleep(1)
                 else:
                     console.print("[bold red]La durée doit être un nombre positif.[/bold red]")
-                    time.sleep(1)
+                    clock.sleep(1)
             except ValueError:
                 console.print("[bold red]Saisie invalide. Veuillez entrer un nombre.[/bold red]")
-                time.sleep(1)
+                clock.sleep(1)
         elif choice == '3':
             progression_selection_mode = 'midi' if progression_selection_mode == 'random' else 'random'
         elif choice == '4':
@@ -160,6 +214,37 @@ def options_menu(use_timer, timer_duration, progression_selection_mode, play_pro
                 play_progression_before_start = 'SHOW_AND_PLAY'
         elif choice == '5':
             chord_set_choice = 'all' if chord_set_choice == 'basic' else 'basic'
+        elif choice == '6':
+            app_settings.chord_segmentation = 'release' if app_settings.chord_segmentation == 'onset' else 'onset'
+        elif choice == '7':
+            try:
+                new_window = Prompt.ask("Nouvelle fenêtre d'attaque en millisecondes", default=str(int(app_settings.onset_window * 1000)), console=console)
+                new_window = float(new_window)
+                if new_window > 0:
+                    app_settings.onset_window = new_window / 1000.0
+                    console.print(f"Fenêtre d'attaque mise à jour à [bold green]{new_window:.0f} ms.[/bold green]")
+                    clock.sleep(1)
+                else:
+                    console.print("[bold red]La fenêtre doit être un nombre positif.[/bold red]")
+                    clock.sleep(1)
+            except ValueError:
+                console.print("[bold red]Saisie invalide. Veuillez entrer un nombre.[/bold red]")
+                clock.sleep(1)
+        elif choice == '8':
+            app_settings.sustain_pedal = not app_settings.sustain_pedal
+        elif choice == '9':
+            new_channel = Prompt.ask("Canal MIDI (1-16, ou 't' pour tous)", default="t", console=console)
+            if new_channel.lower() == 't':
+                app_settings.midi_channels = None
+            elif new_channel.isdigit() and 1 <= int(new_channel) <= 16:
+                app_settings.midi_channels = {int(new_channel) - 1}
+            else:
+                console.print("[bold red]Saisie invalide. Veuillez entrer un numéro de canal.[/bold red]")
+                clock.sleep(1)
+        elif choice == '10':
+            app_settings.terminal_polling = not app_settings.terminal_polling
+        elif choice == '11':
+            app_settings.record_sessions = not app_settings.record_sessions
         elif choice == 'q':
             return use_timer, timer_duration, progression_selection_mode, play_progression_before_start, chord_set_choice
     #return use_timer, timer_duration, progression_selection_mode, play_progression_before_start, chord_set_choice
@@ -180,8 +265,15 @@ def main():
         padding=(1, 4)
     ))
 
-    inport_name = select_midi_port("input")
-    if not inport_name:
+    # Chaque profil a ses propres stats (records, erreurs, historique)
+    profile_name = select_profile()
+    if not profile_name:
+        console.print("[bold red]Annulation de la sélection du profil. Arrêt du programme.[/bold red]")
+        return
+
+    # Plusieurs entrées possibles (clavier + pads, pédalier...) : fusionnées en un seul flux
+    inport_names = select_midi_ports("input")
+    if not inport_names:
         console.print("[bold red]Annulation de la sélection du port d'entrée. Arrêt du programme.[/bold red]")
         return
 
@@ -191,11 +283,25 @@ def main():
         return
 
     try:
-        with mido.open_input(inport_name) as inport, mido.open_output(outport_name) as outport:
+        with MergedMidiInput(inport_names, open_input=virtual_midi.open_input) as raw_inport, \
+                ReconnectingOutput(outport_name, open_output=virtual_midi.open_output) as outport, \
+                MidiPortWatcher(raw_inport, outport, get_input_names=virtual_midi.get_input_names,
+                                get_output_names=virtual_midi.get_output_names), \
+                RecordingInput(raw_inport) as recording_input:
+            # Le surveillant rouvre les ports débranchés puis rebranchés ; les modes se mettent en pause entre-temps
+            # Tous les modes lisent le flux normalisé (vélocité 0, sustain, canaux, notes fantômes) ;
+            # l'enregistrement éventuel se fait avant la normalisation, avec les horodatages d'arrivée
+            normalizer = MidiInputNormalizer(recording_input)
+            apply_input_settings(normalizer)
+            # Les touches réservées (navigation MIDI) sont retirées du flux et converties en commandes
+            inport = MidiCommandRouter(normalizer)
+            apply_navigation_settings(inport, progression_selection_mode)
             clear_screen()
-            console.print(f"Port d'entrée MIDI sélectionné : [bold green]{inport.name}[/bold green]")
+            console.print(f"Port(s) d'entrée MIDI sélectionné(s) : [bold green]{', '.join(raw_inport.port_names)}[/bold green]")
             console.print(f"Port de sortie MIDI sélectionné : [bold green]{outport.name}[/bold green]")
-            time.sleep(2)
+            console.print(f"Profil : [bold green]{profile_name}[/bold green]")
+            apply_recording_settings(recording_input, profile_name)
+            clock.sleep(2)
 
             while True:
                 current_chord_set = all_chords if chord_set_choice == 'all' else three_note_chords
@@ -219,8 +325,9 @@ def main():
                 menu_options.append("[13] Renversements d'accords (aléatoires)\n", style="bold blue_violet")
                 menu_options.append("[14] Passage d'accords\n", style="bold purple")
                 menu_options.append("[15] Trouve l'accord manquant\n", style="bold green_yellow")
+                menu_options.append("[16] Arpèges\n", style="bold bright_cyan")
                 menu_options.append("--- Configuration ---\n", style="dim")
-                menu_options.append("[16] Options\n", style="bold white")
+                menu_options.append("[17] Options\n", style="bold white")
                 menu_options.append("[q] Quitter", style="bold white")
                 menu_panel = Panel(
                     menu_options,
@@ -230,7 +337,7 @@ def main():
                 console.print(menu_panel)
 
                 # MODIFIÉ: Mise à jour des choix possibles
-                mode_choice = Prompt.ask("Votre choix", choices=['1', '2', '3', '4', '5', '6', '7', '8', '9', '10', '11', '12', '13', '14', '15', '16', 'q'], show_choices=False, console=console)
+                mode_choice = Prompt.ask("Votre choix", choices=['1', '2', '3', '4', '5', '6', '7', '8', '9', '10', '11', '12', '13', '14', '15', '16', '17', 'q'], show_choices=False, console=console)
 
                 if mode_choice == '1':
                     chord_explorer_mode(outport)
@@ -263,7 +370,12 @@ def main():
                 elif mode_choice == '15':
                     missing_chord_mode(inport, outport, use_timer, timer_duration, progression_selection_mode, play_progression_before_start, current_chord_set)
                 elif mode_choice == '16':
+                    arpeggio_mode(inport, outport, current_chord_set)
+                elif mode_choice == '17':
                     use_timer, timer_duration, progression_selection_mode, play_progression_before_start, chord_set_choice = options_menu(use_timer, timer_duration, progression_selection_mode, play_progression_before_start, chord_set_choice)
+                    apply_input_settings(normalizer)
+                    apply_navigation_settings(inport, progression_selection_mode)
+                    apply_recording_settings(recording_input, profile_name)
                 elif mode_choice == 'q':
                     console.print("Arrêt du programme.", style="bold red")
                     break
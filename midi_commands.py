@@ -0,0 +1,96 @@
+# midi_commands.py
+from typing import Dict, Optional, Tuple
+
+from keyboard_handler import push_command
+
+# Commandes par défaut : les trois touches les plus graves d'un piano 88 touches
+DEFAULT_MIDI_BINDINGS: Dict[str, Tuple[str, int]] = {
+    'q': ('note', 21),  # La0 : quitter
+    'r': ('note', 22),  # La#0 : répéter
+    'n': ('note', 23),  # Si0 : suivant
+}
+# Sélection de progression : Do1 (24) = choix 1, Do#1 (25) = choix 2, ...
+DEFAULT_SELECTION_BASE: Tuple[str, int] = ('note', 24)
+SELECTION_SIZE = 12
+
+
+class MidiCommandRouter:
+    """
+    Étage du flux MIDI qui transforme des notes, pads ou contrôleurs réservés en commandes
+    de navigation ('q', 'r', 'n', numéro de progression).
+
+    Les messages réservés sont retirés du flux transmis aux modes et la commande est
+    injectée dans keyboard_handler : elle est lue par wait_for_input comme une touche,
+    sans aucune lecture du terminal. Le relâchement d'une note ou d'un contrôleur
+    réservé est également absorbé.
+
+    Une liaison est un couple (type, numéro) : ('note', 21) ou ('cc', 20).
+    Le canal n'est pas pris en compte.
+    """
+
+    def __init__(self, port, bindings: Optional[Dict[str, Tuple[str, int]]] = None,
+                 selection_base: Optional[Tuple[str, int]] = DEFAULT_SELECTION_BASE,
+                 enabled: bool = False):
+        self._port = port
+        self.enabled = enabled
+        self.set_bindings(bindings, selection_base)
+
+    def set_bindings(self, bindings: Optional[Dict[str, Tuple[str, int]]] = None,
+                  selection_base: Optional[Tuple[str, int]] = DEFAULT_SELECTION_BASE):
+        """Met à jour les liaisons (table (type, numéro) -> commande, consultée en O(1))."""
+        self.bindings = dict(bindings if bindings is not None else DEFAULT_MIDI_BINDINGS)
+        self.selection_base = selection_base
+        self._lookup = {binding: command for command, binding in self.bindings.items()}
+        if selection_base is not None:
+            kind, first = selection_base
+            for index in range(SELECTION_SIZE):
+                self._lookup.setdefault((kind, first + index), str(index + 1))
+
+    # ---------- Interface de port mido ----------
+    @property
+    def name(self):
+        return getattr(self._port, "name", "")
+
+    @property
+    def closed(self):
+        return getattr(self._port, "closed", False)
+
+    def iter_pending(self):
+        for msg in self._port.iter_pending():
+            if self.enabled and self._route(msg):
+                continue
+            yield msg
+
+    def poll(self):
+        for msg in self.iter_pending():
+            return msg
+        return None
+
+    def close(self):
+        self._port.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def __getattr__(self, attr):
+        # Délègue le reste de l'interface (configure de la normalisation, ...) à l'étage précédent
+        return getattr(self._port, attr)
+
+    # ---------- Routage ----------
+    def _route(self, msg) -> bool:
+        """Retourne True si le message est réservé (et donc retiré du flux)."""
+        if msg.type in ('note_on', 'note_off'):
+            command = self._lookup.get(('note', msg.note))
+            if command is not None and msg.type == 'note_on' and msg.velocity > 0:
+                push_command(command)
+            return command is not None
+        if msg.type == 'control_change':
+            command = self._lookup.get(('cc', msg.control))
+            if command is not None and msg.value >= 64:
+                push_command(command)
+            return command is not None
+        return False
@@ -1,12 +1,13 @@
 # midi_handler.py
-import time
 import mido
 
 from rich.console import Console
 from rich.table import Table
 from rich.prompt import Prompt
 
+import clock
 from data.chords import all_chords
+import virtual_midi
 
 console = Console()
 
@@ -15,7 +16,7 @@ def play_chord(outport, chord_notes, velocity=100, duration=0.5):
     for note in chord_notes:
         msg = mido.Message('note_on', note=note, velocity=velocity)
         outport.send(msg)
-    time.sleep(duration)
+    clock.sleep(duration)
     for note in chord_notes:
         msg = mido.Message('note_off', note=note, velocity=0)
         outport.send(msg)
@@ -71,14 +72,15 @@ def play_progression_sequence(outport, progression, chord_set, duration=0.8):
             
             play_chord(outport, transposed_notes, duration=duration)
             last_played_notes = transposed_notes
-            time.sleep(0.5)
+            clock.sleep(0.5)
         else:
             console.print(f"[bold red]L'accord {chord_name} n'a pas pu être joué (non trouvé dans le set sélectionné).[/bold red]")
 
 
-def select_midi_port(port_type):
-    """Permet à l'utilisateur de choisir un port MIDI parmi la liste disponible."""
-    ports = mido.get_input_names() if port_type == "input" else mido.get_output_names()
+def _show_midi_ports(port_type):
+    """Affiche les ports MIDI disponibles et retourne leur liste (None si aucun port)."""
+    # Ports système et ports virtuels (bouclage en mémoire, utilisable sans matériel)
+    ports = virtual_midi.get_input_names() if port_type == "input" else virtual_midi.get_output_names()
     
     if not ports:
         console.print(f"[bold red]Aucun port {port_type} MIDI trouvé. Assurez-vous que votre périphérique est connecté.[/bold red]")
@@ -93,6 +95,13 @@ def select_midi_port(port_type):
     table.add_row("[q]", "Quitter")
     
     console.print(table)
+    return ports
+
+def select_midi_port(port_type):
+    """Permet à l'utilisateur de choisir un port MIDI parmi la liste disponible."""
+    ports = _show_midi_ports(port_type)
+    if not ports:
+        return None
     
     while True:
         choice = Prompt.ask(f"Veuillez choisir un port {port_type} (1-{len(ports)}) ou 'q' pour quitter", console=console)
@@ -107,10 +116,33 @@ def select_midi_port(port_type):
         except ValueError:
             console.print("[bold red]Sélection invalide. Veuillez entrer un numéro.[/bold red]")
 
+def select_midi_ports(port_type):
+    """
+    Permet de choisir un ou plusieurs ports MIDI (ex: '1,3').
+    Retourne la liste des noms choisis, ou None en cas d'annulation.
+    """
+    ports = _show_midi_ports(port_type)
+    if not ports:
+        return None
+
+    while True:
+        choice = Prompt.ask(f"Veuillez choisir un ou plusieurs ports {port_type} (ex: 1 ou 1,3) ou 'q' pour quitter", console=console)
+        if choice.lower() == 'q':
+            return None
+        try:
+            indices = [int(part) - 1 for part in choice.replace(' ', '').split(',') if part]
+        except ValueError:
+            console.print("[bold red]Sélection invalide. Veuillez entrer des numéros séparés par des virgules.[/bold red]")
+            continue
+        if indices and all(0 <= index < len(ports) for index in indices):
+            # Conserver l'ordre de saisie en ignorant les doublons
+            return list(dict.fromkeys(ports[index] for index in indices))
+        console.print(f"[bold red]Sélection invalide. Veuillez entrer des numéros valides.[/bold red]")
+
 def play_note_sequence(outport, notes, velocity=64, duration=0.3, pause=0.1):
     """Joue une séquence de notes individuellement."""
     for note in notes:
         outport.send(mido.Message('note_on', note=note, velocity=velocity))
-        time.sleep(duration)
+        clock.sleep(duration)
         outport.send(mido.Message('note_off', note=note, velocity=velocity))
-        time.sleep(pause)
\ No newline at end of file
+        clock.sleep(pause)
\ No newline at end of file
@@ -0,0 +1,269 @@
+# midi_input.py
+import heapq
+import itertools
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+import mido
+
+import clock
+
+SUSTAIN_CC = 64
+
+
+class MidiInputNormalizer:
+    """
+    Étage de normalisation unique entre le port d'entrée MIDI et les modes.
+
+    Les modes lisent ce port comme un port mido (iter_pending, poll, close) et
+    reçoivent un flux propre :
+    - un note_on de vélocité 0 (running status des claviers) devient un note_off ;
+    - pédale de sustain (CC64) : pédale enfoncée, les note_off sont différés jusqu'au
+      relâchement de la pédale (sauf si la touche est rejouée entre-temps) ;
+    - seuls les canaux de `channels` sont conservés (None = tous les canaux) ;
+    - les notes fantômes sont ignorées : vélocité inférieure à `min_velocity`, ou
+      durée inférieure à `min_duration` secondes. Dans ce dernier cas le note_on est
+      retenu `min_duration` secondes avant d'être transmis (latence ajoutée).
+
+    Chaque message transmis porte dans `time` son horodatage d'arrivée (clock.now()).
+    Si le port source horodate déjà ses messages (attribut `stamps_arrival_time`),
+    ces horodatages sont conservés.
+    """
+
+    def __init__(self, port, channels: Optional[Iterable[int]] = None, sustain: bool = True,
+                 min_velocity: int = 1, min_duration: float = 0.0):
+        self._port = port
+        self._pending = deque()
+        self._held = {}           # (canal, note) -> note_on retenu (filtre de durée)
+        self._ghosts = set()      # (canal, note) dont le note_off doit être ignoré
+        self._sustained = {}      # (canal, note) -> note_off différé par la pédale
+        self._pedal_down = set()  # canaux dont la pédale est enfoncée
+        self.configure(channels, sustain, min_velocity, min_duration)
+
+    def configure(self, channels: Optional[Iterable[int]] = None, sustain: bool = True,
+                  min_velocity: int = 1, min_duration: float = 0.0):
+        """Met à jour les paramètres de normalisation."""
+        self.channels = frozenset(channels) if channels is not None else None
+        self.sustain = sustain
+        self.min_velocity = max(1, min_velocity)
+        self.min_duration = max(0.0, min_duration)
+        if not self.sustain:
+            self._release_pedal(None, clock.now())
+
+    # ---------- Interface de port mido ----------
+    @property
+    def name(self):
+        return getattr(self._port, "name", "")
+
+    @property
+    def closed(self):
+        return getattr(self._port, "closed", False)
+
+    def iter_pending(self):
+        """Transmet les messages normalisés en attente (non bloquant)."""
+        now = clock.now()
+        for msg in self._port.iter_pending():
+            self._process(msg, now)
+        self._release_held(now)
+        while self._pending:
+            yield self._pending.popleft()
+
+    def poll(self):
+        for msg in self.iter_pending():
+            # Les messages suivants restent en file pour le prochain appel
+            return msg
+        return None
+
+    def close(self):
+        self._port.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    # ---------- Normalisation ----------
+    def _process(self, msg, now):
+        if not getattr(self._port, "stamps_arrival_time", False):
+            msg = msg.copy(time=now)
+
+        channel = getattr(msg, "channel", None)
+        if channel is not None and self.channels is not None and channel not in self.channels:
+            return
+
+        if msg.type == 'note_on' and msg.velocity == 0:
+            msg = mido.Message('note_off', channel=msg.channel, note=msg.note, velocity=64, time=msg.time)
+
+        if msg.type == 'note_on':
+            self._note_on(msg)
+        elif msg.type == 'note_off':
+            self._note_off(msg)
+        elif msg.type == 'control_change' and msg.control == SUSTAIN_CC and self.sustain:
+            if msg.value >= 64:
+                self._pedal_down.add(msg.channel)
+            else:
+                self._release_pedal(msg.channel, msg.time)
+            self._pending.append(msg)
+        else:
+            self._pending.append(msg)
+
+    def _note_on(self, msg):
+        key = (msg.channel, msg.note)
+        if msg.velocity < self.min_velocity:
+            self._ghosts.add(key)
+            return
+        self._ghosts.discard(key)
+        if key in self._sustained:
+            # Touche rejouée pendant qu'elle est tenue par la pédale : elle reste enfoncée
+            del self._sustained[key]
+            self._pending.append(msg)
+            return
+        if self.min_duration > 0:
+            self._held[key] = msg
+        else:
+            self._pending.append(msg)
+
+    def _note_off(self, msg):
+        key = (msg.channel, msg.note)
+        if key in self._ghosts:
+            self._ghosts.discard(key)
+            return
+        held = self._held.pop(key, None)
+        if held is not None:
+            if msg.time - held.time < self.min_duration:
+                # Note trop brève : ni attaque ni relâchement transmis
+                return
+            self._pending.append(held)
+        if self.sustain and msg.channel in self._pedal_down:
+            self._sustained[key] = msg
+            return
+        self._pending.append(msg)
+
+    def _release_pedal(self, channel, timestamp):
+        """Relâche la pédale (d'un canal, ou de tous si channel est None)."""
+        if channel is None:
+            self._pedal_down.clear()
+        else:
+            self._pedal_down.discard(channel)
+        for key in [k for k in self._sustained if channel is None or k[0] == channel]:
+            note_off = self._sustained.pop(key)
+            self._pending.append(note_off.copy(time=timestamp))
+
+    def _release_held(self, now):
+        """Transmet les note_on retenus dont la durée minimale est atteinte."""
+        if not self._held:
+            return
+        for key in [k for k, m in self._held.items() if now - m.time >= self.min_duration]:
+            self._pending.append(self._held.pop(key))
+
+
+class MergedMidiInput:
+    """
+    Plusieurs ports d'entrée MIDI (clavier, pads, pédalier...) fusionnés en un seul flux.
+
+    Chaque port est ouvert avec un callback : les messages sont horodatés à leur arrivée
+    et insérés dans un tas (heapq) trié par horodatage, sans lecture périodique des ports.
+    iter_pending vide le tas dans l'ordre chronologique, quel que soit le nombre de
+    périphériques. iter_pending_tagged donne aussi le nom du port d'origine.
+
+    Les messages portent déjà leur horodatage d'arrivée dans `time` (stamps_arrival_time).
+    """
+
+    stamps_arrival_time = True
+
+    def __init__(self, port_names: Iterable[str], open_input=None):
+        self._open_input = open_input or mido.open_input
+        self._heap = []
+        self._lock = threading.Lock()
+        # Départage des messages de même horodatage : ordre d'arrivée
+        self._sequence = itertools.count()
+        # Nom demandé -> port ouvert (None si le périphérique est déconnecté)
+        self._ports = {}
+        try:
+            for port_name in port_names:
+                self._ports[port_name] = None
+                self.reopen_port(port_name)
+        except Exception:
+            self.close()
+            raise
+
+    def _make_callback(self, port_name):
+        def on_message(msg):
+            msg = msg.copy(time=clock.now())
+            with self._lock:
+                heapq.heappush(self._heap, (msg.time, next(self._sequence), port_name, msg))
+        return on_message
+
+    # ---------- Connexion / déconnexion (voir midi_watcher.MidiPortWatcher) ----------
+    def reopen_port(self, port_name: str, system_name: Optional[str] = None):
+        """(Ré)ouvre le port `port_name`, éventuellement sous un autre nom système."""
+        self.drop_port(port_name)
+        self._ports[port_name] = self._open_input(system_name or port_name, callback=self._make_callback(port_name))
+
+    def drop_port(self, port_name: str):
+        """Ferme le port d'un périphérique déconnecté (il reste attendu)."""
+        port = self._ports.get(port_name)
+        self._ports[port_name] = None
+        if port is not None and not port.closed:
+            try:
+                port.close()
+            except Exception:
+                # Le périphérique a déjà disparu
+                pass
+
+    def missing_ports(self) -> List[str]:
+        return [name for name, port in self._ports.items() if port is None]
+
+    def open_system_names(self) -> Dict[str, str]:
+        """Nom demandé -> nom système du port ouvert (ports connectés uniquement)."""
+        return {name: port.name for name, port in self._ports.items() if port is not None}
+
+    # ---------- Interface de port mido ----------
+    @property
+    def name(self):
+        return " + ".join(self._ports)
+
+    @property
+    def port_names(self) -> List[str]:
+        return list(self._ports)
+
+    @property
+    def closed(self):
+        return all(port is None or port.closed for port in self._ports.values())
+
+    def iter_pending_tagged(self):
+        """
+        Transmet les messages en attente sous forme (nom du port, message), par ordre d'arrivée.
+        Les messages sont retirés un par un : si l'appelant s'arrête avant la fin, les
+        suivants restent en file.
+        """
+        while True:
+            with self._lock:
+                if not self._heap:
+                    return
+                _, _, port_name, msg = heapq.heappop(self._heap)
+            yield port_name, msg
+
+    def iter_pending(self):
+        for _, msg in self.iter_pending_tagged():
+            yield msg
+
+    def poll(self):
+        with self._lock:
+            if not self._heap:
+                return None
+            return heapq.heappop(self._heap)[3]
+
+    def close(self):
+        for port_name in self._ports:
+            self.drop_port(port_name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
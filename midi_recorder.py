@@ -0,0 +1,213 @@
+# midi_recorder.py
+import os
+import queue
+import struct
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+import mido
+from mido.midifiles.meta import encode_variable_int
+
+import clock
+
+# Résolution du fichier : 480 ticks par noire à 120 bpm, soit 960 ticks par seconde
+TICKS_PER_BEAT = 480
+TEMPO = 500000  # microsecondes par noire
+# Nombre maximal d'événements encodés par écriture, et délai maximal avant écriture (secondes)
+CHUNK_SIZE = 512
+CHUNK_DELAY = 0.5
+
+# Messages système temps réel et communs : non enregistrables dans un fichier MIDI standard
+_UNRECORDED_TYPES = {'clock', 'start', 'stop', 'continue', 'active_sensing', 'reset',
+                     'songpos', 'song_select', 'tune_request', 'quarter_frame'}
+
+# Enregistreur actif (marqueurs posés par les modes)
+_active_recorder = None
+
+
+def get_session_recorder():
+    """Retourne l'enregistreur de session actif, ou None."""
+    return _active_recorder
+
+
+class SessionRecorder:
+    """
+    Enregistre une session dans un fichier MIDI standard (format 0, une piste).
+
+    record() et marker() placent l'événement horodaté dans une file et retournent
+    immédiatement ; un thread d'écriture l'encode et l'ajoute au fichier par blocs
+    (au plus CHUNK_SIZE événements, au plus CHUNK_DELAY secondes d'attente). La longueur
+    de la piste est mise à jour après chaque bloc : le fichier reste lisible par
+    mido.MidiFile même si le programme s'arrête brutalement.
+
+    Les marqueurs (consigne, résultat d'une tentative...) sont des méta-événements
+    'marker' de la piste.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "w+b")
+        # En-tête : format 0, une piste ; longueur de la piste mise à jour au fil de l'eau
+        self._file.write(b"MThd" + struct.pack(">IHHH", 6, 0, 1, TICKS_PER_BEAT))
+        self._track_length_offset = self._file.tell() + 4
+        self._file.write(b"MTrk" + struct.pack(">I", 0))
+        self._track_length = 0
+        self._start_time = clock.now()
+        self._last_tick = 0
+        self._queue = queue.Queue()
+        self._closed = False
+        self._write_chunk([self._event(self._start_time, mido.MetaMessage('set_tempo', tempo=TEMPO))])
+        self._writer = threading.Thread(target=self._run_writer, name="midi-recorder", daemon=True)
+        self._writer.start()
+
+    # ---------- Enregistrement (non bloquant) ----------
+    def record(self, msg, timestamp: Optional[float] = None):
+        """Enregistre un message MIDI reçu à l'instant `timestamp` (clock.now() par défaut)."""
+        if msg.type not in _UNRECORDED_TYPES:
+            self._queue.put((timestamp if timestamp is not None else clock.now(), msg))
+
+    def marker(self, text: str, timestamp: Optional[float] = None):
+        """Pose un marqueur (méta-événement) dans l'enregistrement."""
+        self._queue.put((timestamp if timestamp is not None else clock.now(),
+                         mido.MetaMessage('marker', text=text)))
+
+    # ---------- Thread d'écriture ----------
+    def _run_writer(self):
+        while True:
+            item = self._queue.get()
+            stop = item is None
+            batch = [] if stop else [item]
+            deadline = time.time() + CHUNK_DELAY
+            while not stop and len(batch) < CHUNK_SIZE:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.time()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                else:
+                    batch.append(item)
+            if batch:
+                self._write_chunk([self._event(timestamp, msg) for timestamp, msg in batch])
+            if stop:
+                return
+
+    def _event(self, timestamp: float, msg) -> bytes:
+        # Messages arrivés avant le début de l'enregistrement : placés au début
+        tick = max(self._last_tick, round((timestamp - self._start_time) * TICKS_PER_BEAT * 1e6 / TEMPO))
+        delta, self._last_tick = tick - self._last_tick, tick
+        if msg.type == 'sysex':
+            # Dans un fichier MIDI : F0, longueur, puis les données et F7
+            data = bytes(msg.bytes()[1:])
+            payload = b"\xf0" + bytes(encode_variable_int(len(data))) + data
+        else:
+            payload = bytes(msg.bytes())
+        return bytes(encode_variable_int(delta)) + payload
+
+    def _write_chunk(self, events):
+        chunk = b"".join(events)
+        self._file.seek(0, os.SEEK_END)
+        self._file.write(chunk)
+        self._track_length += len(chunk)
+        self._file.seek(self._track_length_offset)
+        self._file.write(struct.pack(">I", self._track_length))
+        self._file.flush()
+
+    def close(self):
+        """Écrit les événements en attente et termine la piste."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+        self._write_chunk([bytes(encode_variable_int(0)) + bytes(mido.MetaMessage('end_of_track').bytes())])
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class RecordingInput:
+    """
+    Étage du flux MIDI qui enregistre tout ce qui le traverse, sans rien modifier.
+
+    Placé juste après l'entrée brute : les messages sont enregistrés avec leur heure
+    d'arrivée (horodatage de MergedMidiInput) avant toute normalisation. Sans
+    enregistrement en cours, l'étage se contente de transmettre les messages.
+    """
+
+    def __init__(self, port):
+        self._port = port
+        self.recorder: Optional[SessionRecorder] = None
+
+    def start_recording(self, path: str) -> SessionRecorder:
+        global _active_recorder
+        self.stop_recording()
+        self.recorder = SessionRecorder(path)
+        _active_recorder = self.recorder
+        return self.recorder
+
+    def stop_recording(self):
+        global _active_recorder
+        recorder, self.recorder = self.recorder, None
+        if recorder is not None:
+            if _active_recorder is recorder:
+                _active_recorder = None
+            recorder.close()
+
+    @property
+    def recording(self) -> bool:
+        return self.recorder is not None
+
+    # ---------- Interface de port mido ----------
+    @property
+    def name(self):
+        return getattr(self._port, "name", "")
+
+    @property
+    def closed(self):
+        return getattr(self._port, "closed", False)
+
+    def iter_pending(self):
+        stamped = getattr(self._port, "stamps_arrival_time", False)
+        for msg in self._port.iter_pending():
+            recorder = self.recorder
+            if recorder is not None:
+                recorder.record(msg, msg.time if stamped else None)
+            yield msg
+
+    def poll(self):
+        msg = self._port.poll()
+        recorder = self.recorder
+        if msg is not None and recorder is not None:
+            recorder.record(msg, msg.time if getattr(self._port, "stamps_arrival_time", False) else None)
+        return msg
+
+    def close(self):
+        self.stop_recording()
+        self._port.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def __getattr__(self, attr):
+        # Délègue le reste de l'interface (port_names, stamps_arrival_time, ...) à l'étage précédent
+        return getattr(self._port, attr)
+
+
+def session_recording_path(directory: str) -> str:
+    """Chemin d'un nouvel enregistrement : <dossier>/session-AAAAMMJJ-HHMMSS.mid."""
+    return os.path.join(directory, f"session-{datetime.now().strftime('%Y%m%d-%H%M%S')}.mid")
@@ -0,0 +1,337 @@
+# midi_replay.py
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+from typing import Iterable, List, Optional, Tuple
+
+import mido
+
+import attempt_store
+import clock
+import stats_manager
+from data.chords import all_chords, three_note_chords
+from keyboard_handler import push_command, has_pending_commands, set_terminal_polling, is_terminal_polling
+from midi_commands import MidiCommandRouter
+from midi_input import MidiInputNormalizer
+from profiles import activate_profile
+from settings import app_settings
+from modes.single_note_mode import single_note_mode
+from modes.progression_scale_mode import progression_scale_mode
+from modes.single_chord_mode import single_chord_mode
+from modes.listen_and_reveal_mode import listen_and_reveal_mode
+from modes.progression_mode import progression_mode
+from modes.degrees_mode import degrees_mode
+from modes.all_degrees_mode import all_degrees_mode
+from modes.cadence_mode import cadence_mode
+from modes.pop_rock_mode import pop_rock_mode
+from modes.reverse_chord_mode import reverse_chord_mode
+from modes.tonal_progression_mode import tonal_progression_mode
+from modes.reversed_chords_mode import reversed_chords_mode
+from modes.chord_transitions_mode import chord_transitions_mode
+from modes.missing_chord_mode import missing_chord_mode
+from modes.arpeggio_mode import arpeggio_mode
+
+# Délai entre la première lecture du port et le début du rejeu (le mode vide ses tampons en démarrant)
+LEAD_IN = 0.2
+# Fin du rejeu : 'q' est injecté à cet intervalle tant que le mode ne s'est pas arrêté
+QUIT_INTERVAL = 0.5
+
+# Un événement de la chronologie : (secondes depuis le début, message MIDI ou None, commande clavier ou None)
+TimelineEvent = Tuple[float, Optional[mido.Message], Optional[str]]
+
+
+# ---------- Chargement ----------
+def load_midi_file(path: str) -> List[TimelineEvent]:
+    """Messages d'un fichier .mid (ex: enregistrement de session) ; les méta-événements sont ignorés."""
+    timeline = []
+    offset = 0.0
+    for msg in mido.MidiFile(path):
+        offset += msg.time
+        if not msg.is_meta:
+            timeline.append((offset, msg.copy(time=0), None))
+    return timeline
+
+
+def load_event_log(path: str) -> List[TimelineEvent]:
+    """
+    Journal d'événements JSON, un par ligne :
+    {"t": 0.5, "msg": "note_on channel=0 note=60 velocity=80 time=0"} ou {"t": 2.0, "key": "n"}.
+    """
+    timeline = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            msg = mido.Message.from_str(entry["msg"]) if "msg" in entry else None
+            timeline.append((float(entry["t"]), msg, entry.get("key")))
+    return timeline
+
+
+def load_script(path: str) -> List[TimelineEvent]:
+    """Script de commandes clavier : une ligne '<secondes> <touche>' par commande ('#' : commentaire)."""
+    timeline = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                offset, key = line.split(None, 1)
+                timeline.append((float(offset), None, key.strip()))
+    return timeline
+
+
+def load_timeline(path: str) -> List[TimelineEvent]:
+    if os.path.splitext(path)[1].lower() in (".mid", ".midi"):
+        return load_midi_file(path)
+    return load_event_log(path)
+
+
+# ---------- Ports ----------
+class ReplayInput:
+    """
+    Port d'entrée MIDI qui rejoue une chronologie (fichier .mid, journal d'événements) à la
+    place d'un clavier, avec les commandes clavier d'un script.
+
+    Les messages MIDI dus sont mis à disposition de iter_pending, horodatés comme par
+    MergedMidiInput (stamps_arrival_time), et les commandes sont injectées dans
+    keyboard_handler comme des touches tapées. Le rythme d'origine est respecté
+    (divisé par `speed`), sur l'horloge active (voir clock) :
+    - horloge réelle : un thread de lecture suit la chronologie ;
+    - horloge virtuelle : chaque événement est programmé sur l'horloge et délivré quand le
+      mode attend jusqu'à son instant ; le rejeu ne prend alors aucun temps réel.
+    Le rejeu commence LEAD_IN secondes après la première lecture du port. En fin de
+    chronologie, si quit_at_end, 'q' est injecté jusqu'à l'arrêt du mode.
+    """
+
+    stamps_arrival_time = True
+
+    def __init__(self, timeline: Iterable[TimelineEvent], speed: float = 1.0,
+                 quit_at_end: bool = True, name: str = "Rejeu"):
+        self._timeline = sorted(timeline, key=lambda event: event[0])
+        self.speed = max(speed, 1e-6)
+        self.quit_at_end = quit_at_end
+        self._name = name
+        self._pending = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.finished = threading.Event()
+        self._started = False
+
+    def _ensure_started(self):
+        if self._started:
+            return
+        self._started = True
+        active_clock = clock.get_clock()
+        if active_clock.virtual:
+            self._schedule(active_clock)
+        else:
+            threading.Thread(target=self._run, name="midi-replay", daemon=True).start()
+
+    def _deliver(self, event, timestamp):
+        _, msg, key = event
+        if msg is not None:
+            with self._lock:
+                self._pending.append(msg.copy(time=timestamp))
+        if key is not None:
+            push_command(key)
+
+    def _quit_if_idle(self):
+        if not has_pending_commands():
+            push_command('q')
+
+    # ---------- Horloge virtuelle ----------
+    def _schedule(self, virtual_clock):
+        start = virtual_clock.now() + LEAD_IN
+        for event in self._timeline:
+            due = start + event[0] / self.speed
+            virtual_clock.call_at(due, lambda event=event, due=due: self._deliver(event, due))
+        end = start + (self._timeline[-1][0] / self.speed if self._timeline else 0.0)
+        virtual_clock.call_at(end, self.finished.set)
+        if self.quit_at_end:
+            def quit_tick():
+                if not self._stop.is_set():
+                    self._quit_if_idle()
+                    virtual_clock.call_later(QUIT_INTERVAL, quit_tick)
+            virtual_clock.call_at(end + QUIT_INTERVAL, quit_tick)
+
+    # ---------- Horloge réelle ----------
+    def _run(self):
+        if self._stop.wait(LEAD_IN):
+            return
+        start = clock.now()
+        for event in self._timeline:
+            due = start + event[0] / self.speed
+            if self._stop.wait(max(0.0, due - clock.now())):
+                return
+            self._deliver(event, due)
+        self.finished.set()
+        while self.quit_at_end and not self._stop.wait(QUIT_INTERVAL):
+            self._quit_if_idle()
+
+    # ---------- Interface de port mido ----------
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def closed(self):
+        return self._stop.is_set()
+
+    def iter_pending(self):
+        self._ensure_started()
+        with self._lock:
+            pending, self._pending = self._pending, []
+        yield from pending
+
+    def poll(self):
+        self._ensure_started()
+        with self._lock:
+            return self._pending.pop(0) if self._pending else None
+
+    def close(self):
+        self._stop.set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class NullOutput:
+    """Port de sortie qui ne joue rien ; les messages envoyés sont conservés dans `sent`."""
+
+    def __init__(self, name: str = "Sortie muette"):
+        self.name = name
+        self.closed = False
+        self.sent = []
+
+    def send(self, msg):
+        self.sent.append(msg)
+
+    def reset(self):
+        pass
+
+    def panic(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+# ---------- Exécution sans matériel ----------
+def _mode_table():
+    # Nom -> (fonction d'entrée, signature : 'ports', 'chord_set' ou 'progression')
+    return {
+        'single_note': (single_note_mode, 'ports'),
+        'scales': (progression_scale_mode, 'ports'),
+        'single_chord': (single_chord_mode, 'chord_set'),
+        'listen_and_reveal': (listen_and_reveal_mode, 'chord_set'),
+        'progression': (progression_mode, 'progression'),
+        'degrees': (degrees_mode, 'progression'),
+        'all_degrees': (all_degrees_mode, 'progression'),
+        'cadence': (cadence_mode, 'progression'),
+        'pop_rock': (pop_rock_mode, 'progression'),
+        'reverse_chord': (reverse_chord_mode, 'chord_set'),
+        'tonal_progression': (tonal_progression_mode, 'progression'),
+        'reversed_chords': (reversed_chords_mode, 'chord_set'),
+        'chord_transitions': (chord_transitions_mode, 'progression'),
+        'missing_chord': (missing_chord_mode, 'progression'),
+        'arpeggio': (arpeggio_mode, 'chord_set'),
+    }
+
+
+def run_headless(mode_name: str, timeline: Iterable[TimelineEvent], speed: float = 1.0,
+                 chord_set=None, use_timer: bool = False, timer_duration: float = 30.0,
+                 play_progression_before_start: str = 'NONE', replay_clock=None) -> NullOutput:
+    """
+    Exécute un mode avec une chronologie rejouée à la place du clavier MIDI et du terminal.
+    `replay_clock` (ex: clock.VirtualClock()) remplace l'horloge active pendant le rejeu.
+    Retourne la sortie muette (messages que le mode a joués).
+    """
+    entry, signature = _mode_table()[mode_name]
+    chord_set = chord_set if chord_set is not None else three_note_chords
+    terminal_polling = is_terminal_polling()
+    set_terminal_polling(False)
+    try:
+        with clock.using_clock(replay_clock or clock.get_clock()), \
+                ReplayInput(timeline, speed=speed) as replay, NullOutput() as outport:
+            # Même chaîne que main : normalisation puis commandes MIDI réservées (désactivées)
+            normalizer = MidiInputNormalizer(replay)
+            normalizer.configure(
+                channels=app_settings.midi_channels,
+                sustain=app_settings.sustain_pedal,
+                min_velocity=app_settings.ghost_min_velocity,
+                min_duration=app_settings.ghost_min_duration,
+            )
+            inport = MidiCommandRouter(normalizer)
+            if signature == 'ports':
+                entry(inport, outport)
+            elif signature == 'chord_set':
+                entry(inport, outport, chord_set)
+            else:
+                # Sélection 'midi' : les choix sont lus par wait_for_selection (commandes du script), jamais par un Prompt
+                entry(inport, outport, use_timer, timer_duration, 'midi', play_progression_before_start, chord_set)
+    finally:
+        set_terminal_polling(terminal_polling)
+    return outport
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Rejoue un fichier MIDI ou un journal d'événements dans un mode, sans matériel.")
+    parser.add_argument("file", help="fichier .mid ou journal d'événements JSON (une ligne par événement)")
+    parser.add_argument("--mode", required=True, choices=sorted(_mode_table()))
+    parser.add_argument("--script", help="commandes clavier : une ligne '<secondes> <touche>'")
+    parser.add_argument("--fast", action="store_true", help="horloge virtuelle : rejeu instantané, même déroulement")
+    parser.add_argument("--speed", type=float, default=1.0, help="facteur de vitesse du rejeu")
+    parser.add_argument("--seed", type=int, help="graine du générateur aléatoire (exécution reproductible)")
+    parser.add_argument("--chords", choices=("basic", "all"), default="basic")
+    parser.add_argument("--profile", help="profil dont les stats sont mises à jour (défaut : stats temporaires)")
+    args = parser.parse_args(argv)
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    timeline = load_timeline(args.file)
+    if args.script:
+        timeline += load_script(args.script)
+
+    if args.profile:
+        activate_profile(args.profile)
+        temporary = None
+    else:
+        # Les stats du rejeu ne doivent pas se mêler à celles d'un utilisateur
+        temporary = tempfile.TemporaryDirectory(prefix="replay-")
+        stats_manager.set_stats_path(os.path.join(temporary.name, "stats.json"))
+        attempt_store.set_attempts_path(os.path.join(temporary.name, "attempts.sqlite3"))
+
+    replay_clock = clock.VirtualClock() if args.fast else None
+    try:
+        outport = run_headless(args.mode, timeline, speed=args.speed,
+                               chord_set=all_chords if args.chords == "all" else three_note_chords,
+                               replay_clock=replay_clock)
+    finally:
+        stats_manager.flush_stats()
+        attempt_store.close_attempt_store()
+        if temporary is not None:
+            temporary.cleanup()
+    print(f"Rejeu terminé : {len(timeline)} événements, {len(outport.sent)} messages envoyés par le mode.")
+    if replay_clock is not None:
+        print(f"Durée simulée : {replay_clock.now():.1f} s.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+# midi_watcher.py
+import re
+import threading
+from typing import Iterable, List, Optional, Tuple
+
+import mido
+
+# Surveillant actif (consulté par les modes pour se mettre en pause)
+_active_watcher = None
+
+
+def get_port_watcher():
+    """Retourne le surveillant de ports actif, ou None."""
+    return _active_watcher
+
+
+def _base_name(port_name: str) -> str:
+    """
+    Nom d'un port sans ses numéros système, qui peuvent changer à la reconnexion
+    (ex: 'Clavier:Clavier MIDI 1 20:0' -> 'Clavier:Clavier MIDI', 'Clavier 2' -> 'Clavier').
+    """
+    return re.sub(r"(\s+\d+(:\d+)?)+$", "", port_name).strip()
+
+
+def _port_index(port_name: str) -> Tuple[str, ...]:
+    """
+    Numéros d'un port qui restent stables à la reconnexion : tous les numéros finaux,
+    sauf le numéro de client ALSA (ex: 'Clavier MIDI 1 20:0' -> ('1', '0'), 'Clavier 2' -> ('2',)).
+    """
+    suffix = port_name[len(_base_name(port_name)):]
+    return tuple(token.split(":")[-1] for token in suffix.split())
+
+
+def resolve_port_name(wanted: str, available: Iterable[str], exclude: Iterable[str] = ()) -> Optional[str]:
+    """
+    Retrouve un port parmi les ports disponibles : nom exact, sinon un port de même nom de
+    base qui n'est pas dans `exclude` (ports déjà ouverts). Parmi ceux-ci, le port de même
+    index est préféré ; le nom exact n'est abandonné que si le candidat est unique, pour ne
+    jamais rouvrir un autre périphérique (ou un autre port du même périphérique).
+    """
+    available = list(available)
+    if wanted in available:
+        return wanted
+    base = _base_name(wanted)
+    exclude = set(exclude)
+    candidates = [name for name in available if name not in exclude and _base_name(name) == base]
+    same_index = [name for name in candidates if _port_index(name) == _port_index(wanted)]
+    if len(same_index) == 1:
+        return same_index[0]
+    if not same_index and len(candidates) == 1:
+        return candidates[0]
+    return None
+
+
+class ReconnectingOutput:
+    """
+    Port de sortie MIDI qui survit à la déconnexion du périphérique.
+
+    Tant que le périphérique est absent, les messages envoyés sont ignorés au lieu de
+    lever une exception ; le surveillant de ports rouvre le port à son retour.
+    """
+
+    def __init__(self, port_name: str, open_output=None):
+        self._open_output = open_output or mido.open_output
+        self.port_name = port_name
+        self._lock = threading.Lock()
+        self._port = self._open_output(port_name)
+
+    @property
+    def name(self):
+        return self.port_name
+
+    @property
+    def connected(self):
+        return self._port is not None
+
+    @property
+    def closed(self):
+        return self._port is None or self._port.closed
+
+    def send(self, msg):
+        with self._lock:
+            if self._port is None:
+                return
+            try:
+                self._port.send(msg)
+            except Exception:
+                # Périphérique débranché entre deux passages du surveillant
+                self._drop()
+
+    def reopen(self, system_name: Optional[str] = None):
+        with self._lock:
+            self._drop()
+            self._port = self._open_output(system_name or self.port_name)
+
+    def drop(self):
+        with self._lock:
+            self._drop()
+
+    def _drop(self):
+        port, self._port = self._port, None
+        if port is not None and not port.closed:
+            try:
+                port.close()
+            except Exception:
+                pass
+
+    def close(self):
+        self.drop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class MidiPortWatcher:
+    """
+    Surveille la liste des ports MIDI dans un thread d'arrière-plan.
+
+    Toutes les `interval` secondes, les noms des ports système sont comparés aux ports
+    utilisés : un port disparu est fermé (le mode en cours se met en pause, voir
+    ChordModeBase.wait_while_disconnected) et il est rouvert sous le même nom dès que le
+    périphérique réapparaît.
+    """
+
+    def __init__(self, inport, outport: Optional[ReconnectingOutput] = None, interval: float = 1.0,
+                 get_input_names=None, get_output_names=None):
+        # inport : MergedMidiInput (reopen_port / drop_port / missing_ports)
+        self.inport = inport
+        self.outport = outport
+        self.interval = interval
+        self._get_input_names = get_input_names or mido.get_input_names
+        self._get_output_names = get_output_names or mido.get_output_names
+        self._stop = threading.Event()
+        self._connected = threading.Event()
+        self._connected.set()
+        self._thread = None
+
+    # ---------- État ----------
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+
+    def wait_until_connected(self, timeout: Optional[float] = None) -> bool:
+        return self._connected.wait(timeout)
+
+    def missing_ports(self) -> List[str]:
+        missing = list(self.inport.missing_ports())
+        if self.outport is not None and not self.outport.connected:
+            missing.append(self.outport.name)
+        return missing
+
+    # ---------- Thread ----------
+    def start(self):
+        global _active_watcher
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="midi-port-watcher", daemon=True)
+            self._thread.start()
+        _active_watcher = self
+        return self
+
+    def stop(self):
+        global _active_watcher
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1.0)
+            self._thread = None
+        if _active_watcher is self:
+            _active_watcher = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception:
+                # Énumération momentanément indisponible : nouvel essai au prochain passage
+                continue
+
+    def check(self):
+        """Un passage de surveillance : ferme les ports disparus, rouvre ceux revenus."""
+        input_names = self._get_input_names()
+        missing = set(self.inport.missing_ports())
+        open_names = self.inport.open_system_names()
+        for port_name in self.inport.port_names:
+            current = open_names.get(port_name)
+            if current in input_names:
+                system_name = current
+            else:
+                # Un port déjà ouvert pour une autre entrée ne peut pas la remplacer
+                taken = [name for other, name in open_names.items() if other != port_name]
+                system_name = resolve_port_name(port_name, input_names, exclude=taken)
+            if system_name is None:
+                if port_name not in missing:
+                    self.inport.drop_port(port_name)
+            elif port_name in missing:
+                try:
+                    self.inport.reopen_port(port_name, system_name)
+                except Exception:
+                    pass
+
+        if self.outport is not None:
+            system_name = resolve_port_name(self.outport.port_name, self._get_output_names())
+            if system_name is None:
+                if self.outport.connected:
+                    self.outport.drop()
+            elif not self.outport.connected:
+                try:
+                    self.outport.reopen(system_name)
+                except Exception:
+                    pass
+
+        if self.missing_ports():
+            self._connected.clear()
+        else:
+            self._connected.set()
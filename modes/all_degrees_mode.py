@@ -1,11 +1,11 @@
 # modes/all_degrees_mode.py
-import random
 
 from rich.table import Table
 
 from .chord_mode_base import ChordModeBase
 from data.chords import gammes_majeures
 from screen_handler import int_to_roman
+from sampler import WeightedSampler
 
 class AllDegreesMode(ChordModeBase):
     def __init__(self, inport, outport, use_timer, timer_duration, progression_selection_mode, play_progression_before_start, chord_set):
@@ -28,11 +28,11 @@ class AllDegreesMode(ChordModeBase):
         self.console.print(table)
 
     def run(self):
+        tonalites = WeightedSampler(gammes_majeures)
         last_tonalite = None
         while not self.exit_flag:
-            tonalite, gammes = random.choice(list(gammes_majeures.items()))
-            while tonalite == last_tonalite:
-                tonalite, gammes = random.choice(list(gammes_majeures.items()))
+            tonalite = tonalites.sample(exclude=(last_tonalite,))
+            gammes = gammes_majeures[tonalite]
             last_tonalite = tonalite
 
             gammes_filtrees = [g for g in gammes if g in self.chord_set]
@@ -67,4 +67,4 @@ class AllDegreesMode(ChordModeBase):
 
 def all_degrees_mode(inport, outport, use_timer, timer_duration, progression_selection_mode, play_progression_before_start, chord_set):
     mode = AllDegreesMode(inport, outport, use_timer, timer_duration, progression_selection_mode, play_progression_before_start, chord_set)
-    mode.run()
\ No newline at end of file
+    mode.start()
\ No newline at end of file
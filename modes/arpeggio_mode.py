@@ -0,0 +1,122 @@
+# modes/arpeggio_mode.py
+from typing import Literal
+
+from rich.live import Live
+from rich.panel import Panel
+from rich.text import Text
+
+from .chord_mode_base import ChordModeBase
+import clock
+from chord_tracking import ArpeggioRecognizer
+from midi_handler import play_note_sequence
+from keyboard_handler import wait_for_input
+from music_theory import get_note_name, pitch_class_mask
+from sampler import WeightedSampler
+
+
+class ArpeggioMode(ChordModeBase):
+    def __init__(self, inport, outport, chord_set):
+        super().__init__(inport, outport, chord_set)
+        self.last_chord_name = None
+        self.current_chord_notes = None
+        self.recognizer = ArpeggioRecognizer()
+
+    def _handle_repeat(self) -> Literal['repeat', False]:
+        if self.current_chord_notes is not None:
+            play_note_sequence(self.outport, sorted(self.current_chord_notes))
+            return False
+        return 'repeat'
+
+    def _build_panel(self, chord_name, feedback=None):
+        content = Text.from_markup(f"Arpégez l'accord : [bold yellow]{chord_name}[/bold yellow]\n")
+        window_pcs = self.recognizer.pitch_classes()
+        notes_str = ", ".join(get_note_name(pc) for pc in window_pcs) if window_pcs else "-"
+        content.append(Text.from_markup(f"Notes dans la fenêtre : [cyan]{notes_str}[/cyan]\n"))
+        recognized_name, recognized_inversion = self.recognizer.recognized
+        if recognized_name:
+            content.append(Text.from_markup(f"Reconnu : [bold]{recognized_name}[/bold] ({recognized_inversion})"))
+        if feedback:
+            content.append("\n\n")
+            content.append(Text.from_markup(feedback))
+        return Panel(content, title="Arpège", border_style="bright_cyan")
+
+    def run(self):
+        self.display_header("Arpèges", "Mode Arpèges", "bright_cyan")
+        self.console.print("Jouez les notes de l'accord l'une après l'autre, dans n'importe quel ordre.")
+        self.console.print("Appuyez sur 'q' pour quitter, 'r' pour écouter l'arpège, 'n' pour passer au suivant.")
+
+        chords = WeightedSampler(self.chord_set)
+        with self.terminal, Live(console=self.console, screen=False, auto_refresh=False) as live:
+            while not self.exit_flag:
+                self.clear_midi_buffer()
+
+                chord_name = chords.sample(exclude=(self.last_chord_name,))
+                chord_notes = self.chord_set[chord_name]
+                self.last_chord_name = chord_name
+                self.current_chord_notes = chord_notes
+
+                target_mask = pitch_class_mask(chord_notes)
+                target_size = bin(target_mask).count("1")
+                self.recognizer.reset()
+                first_attempt = True
+                feedback = None
+                self.prompt_started_at = clock.now()
+                live.update(self._build_panel(chord_name), refresh=True)
+
+                while not self.exit_flag:
+                    if self.wait_while_disconnected(live):
+                        self.recognizer.reset()
+                        live.update(self._build_panel(chord_name, feedback), refresh=True)
+                        continue
+
+                    char = wait_for_input(timeout=0.01)
+                    if char:
+                        action = self.handle_keyboard_input(char)
+                        if action == 'next' or action is True:
+                            break
+
+                    changed = False
+                    for msg in self.inport.iter_pending():
+                        if msg.type == 'note_on' and msg.velocity > 0:
+                            self.recognizer.add_note(msg.note, msg.time)
+                            changed = True
+
+                    if not changed:
+                        clock.sleep(0.01)
+                        continue
+
+                    if self.recognizer.mask == target_mask:
+                        self.session_total_attempts += 1
+                        if first_attempt:
+                            self.session_correct_count += 1
+                        self.record_attempt('chord', chord_name, True, self.recognizer.pitch_classes(), {n % 12 for n in chord_notes})
+                        _, recognized_inversion = self.recognizer.recognized
+                        feedback = f"[bold green]Correct ! {chord_name} ({recognized_inversion})[/bold green]"
+                        live.update(self._build_panel(chord_name, feedback), refresh=True)
+                        clock.sleep(1.5)
+                        break
+
+                    if self.recognizer.note_count() >= target_size:
+                        # Assez de notes dans la fenêtre, mais pas les bonnes : tentative ratée
+                        self.session_total_attempts += 1
+                        first_attempt = False
+                        self.record_attempt('chord', chord_name, False, self.recognizer.pitch_classes(), {n % 12 for n in chord_notes},
+                                            recognized=self.recognizer.recognized[0])
+                        recognized_name, recognized_inversion = self.recognizer.recognized
+                        played_info = f"{recognized_name} ({recognized_inversion})" if recognized_name else "Accord non reconnu"
+                        feedback = f"[bold red]Incorrect.[/bold red] Vous avez joué : {played_info}"
+                        live.update(self._build_panel(chord_name, feedback), refresh=True)
+                        self.recognizer.reset()
+                        continue
+
+                    live.update(self._build_panel(chord_name, feedback), refresh=True)
+
+                self.session_total_count += 1
+                self.current_chord_notes = None
+
+        self.show_overall_stats_and_wait()
+
+
+def arpeggio_mode(inport, outport, chord_set):
+    mode = ArpeggioMode(inport, outport, chord_set)
+    mode.start()
@@ -1,9 +1,8 @@
 # modes/cadence_mode.py
-import random
 from rich.table import Table
 
 from .chord_mode_base import ChordModeBase
-from stats_manager import get_chord_errors
+from scheduler import ReviewScheduler
 from screen_handler import int_to_roman
 from data.chords import gammes_majeures, cadences, DEGREE_MAP
 
@@ -60,31 +59,22 @@ class CadenceMode(ChordModeBase):
             self.console.print("[bold red]Aucune cadence valide trouvée pour le set d'accords sélectionné.[/bold red]")
             return
 
-        last_cadence_info = None
-        while not self.exit_flag:
-            chord_errors = get_chord_errors()
-
-            # Recalculate weights in each iteration
-            for cadence in valid_cadences:
-                cadence['weight'] = 1 + sum(chord_errors.get(chord, 0) ** 2 for chord in cadence['progression'])
-
-            # Select a weighted random cadence
-            cadence_weights = [c['weight'] for c in valid_cadences]
+        chord_errors = self.error_weights('chord')
+        # Priorité initiale : 1 + somme des carrés des erreurs des accords de la cadence
+        weights = {i: 1 + sum(chord_errors.get(chord, 0) ** 2 for chord in c['progression']) for i, c in enumerate(valid_cadences)}
+        scheduler = ReviewScheduler(range(len(valid_cadences)), weights)
 
+        last_cadence_index = None
+        while not self.exit_flag:
             # --- DEBUG DISPLAY ---
-            debug_info = "\n[bold dim]-- Debug: Top 5 Weighted Cadences --[/bold dim]\n"
-            weighted_cadences = sorted(valid_cadences, key=lambda x: x['weight'], reverse=True)
-            for c in weighted_cadences[:5]:
-                if c['weight'] > 1:
-                    debug_info += f"[dim] - {c['tonalite']} {c['nom_cadence']}: {c['weight']}[/dim]\n"
+            debug_info = "\n[bold dim]-- Debug: Prochaines cadences à réviser --[/bold dim]\n"
+            for i in scheduler.priorities(5):
+                debug_info += f"[dim] - {valid_cadences[i]['tonalite']} {valid_cadences[i]['nom_cadence']}[/dim]\n"
             # --- END DEBUG ---
 
-            selected_cadence = random.choices(valid_cadences, weights=cadence_weights, k=1)[0]
-
-            while (selected_cadence['tonalite'], selected_cadence['nom_cadence']) == last_cadence_info:
-                selected_cadence = random.choices(valid_cadences, weights=cadence_weights, k=1)[0]
-
-            last_cadence_info = (selected_cadence['tonalite'], selected_cadence['nom_cadence'])
+            cadence_index = scheduler.next(avoid=[last_cadence_index])
+            last_cadence_index = cadence_index
+            selected_cadence = valid_cadences[cadence_index]
 
             self.current_tonalite = selected_cadence['tonalite']
             self.current_cadence_name = selected_cadence['nom_cadence']
@@ -116,6 +106,10 @@ class CadenceMode(ChordModeBase):
                 key_name=self.current_tonalite
             )
 
+            outcome = self.progression_result(self.current_progression)
+            if outcome is not None:
+                scheduler.record(cadence_index, outcome)
+
             if result == 'exit':
                 break
             # 'skipped' ou 'done' → simplement boucler vers une nouvelle cadence
@@ -125,4 +119,4 @@ class CadenceMode(ChordModeBase):
 
 def cadence_mode(inport, outport, use_timer, timer_duration, progression_selection_mode, play_progression_before_start, chord_set):
     mode = CadenceMode(inport, outport, use_timer, timer_duration, progression_selection_mode, play_progression_before_start, chord_set)
-    mode.run()
+    mode.start()
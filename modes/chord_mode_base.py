@@ -1,19 +1,31 @@
 # Base class for chord modes
 import random
-import time
-from typing import Callable, List, Optional, Literal
+from typing import Callable, Dict, List, Optional, Literal
 
 from rich.console import Console
 from rich.text import Text
 from rich.panel import Panel
 from rich.live import Live
 
+import clock
 from ui import get_colored_notes_string, display_stats, display_stats_fixed
-from stats_manager import update_mode_record, update_stopwatch_record, update_timer_remaining_record, update_chord_error, update_chord_success
+from stats_manager import (
+    record_latency, get_latency_quantiles, get_slowest_items, update_confusion, get_top_confusions,
+    update_mode_record, update_stopwatch_record, update_timer_remaining_record,
+    get_chord_errors, update_chord_error, update_chord_success,
+    get_note_errors, update_note_error, update_note_success,
+    get_scale_errors, update_scale_error, update_scale_success,
+)
+from attempt_store import get_attempt_store, record_attempt
 from screen_handler import clear_screen
-from keyboard_handler import wait_for_any_key, wait_for_input,enable_raw_mode, disable_raw_mode
+from keyboard_handler import wait_for_any_key, wait_for_input, clear_commands, TerminalSession
 from midi_handler import play_chord, play_progression_sequence
 from data.chords import all_chords
+from settings import app_settings
+from chord_segmenter import ChordSegmenter
+from progression_engine import ProgressionEngine
+from midi_watcher import get_port_watcher
+from midi_recorder import get_session_recorder
 from music_theory import recognize_chord, are_chord_names_enharmonically_equivalent, get_chord_type_from_name, get_note_name
 
 class ChordModeBase:
@@ -29,6 +41,11 @@ class ChordModeBase:
         self.use_voice_leading = False
 
         self.wait_for_input = wait_for_input
+        # Session terminal : saisie directe activée une seule fois pour toute la durée du mode
+        self.terminal = TerminalSession()
+        # Segmentation des accords : à l'attaque ('onset') ou au relâchement ('release')
+        self.chord_segmentation = app_settings.chord_segmentation
+        self.onset_window = app_settings.onset_window
 
         # Compteurs de session (utilisés par les modes de progression)
         self.session_correct_count = 0
@@ -40,11 +57,165 @@ class ChordModeBase:
         # Chronomètre de session (actif quand le compte à rebours n'est pas utilisé)
         self.session_stopwatch_start_time = None
         self.session_max_remaining_time = None
+        # Instant où l'élément courant a été proposé (temps de réponse des tentatives)
+        self.prompt_started_at = None
+        # (première note, accord complet) de la dernière tentative, posé par le segmenteur
+        self.attempt_timing = (None, None)
+        # Éléments joués pendant la session (synthèse des temps de réponse)
+        self.session_items = set()
+        self.last_progression_results = {}
+
+    def start(self):
+        """Exécute le mode dans une session terminal unique, restaurée à la sortie."""
+        # Les touches MIDI réservées jouées depuis le menu ne doivent pas agir sur le mode
+        self.clear_midi_buffer()
+        clear_commands()
+        self.mark(f"mode {self.__class__.__name__}")
+        with self.terminal:
+            self.run()
+
+    def mark(self, text: str):
+        """Pose un marqueur dans l'enregistrement MIDI de la session, s'il est actif."""
+        recorder = get_session_recorder()
+        if recorder is not None:
+            recorder.marker(text)
 
     def clear_midi_buffer(self):
         for _ in self.inport.iter_pending():
             pass
 
+    def wait_for_command(self, timeout: float = 0.05):
+        """
+        Attend une touche du clavier ou une touche MIDI réservée (q, r, n, sélection).
+        Le port MIDI est lu d'abord : le routeur de commandes ne convertit les touches
+        réservées qu'à la lecture du port. À utiliser dans toute boucle d'attente qui ne
+        lit pas elle-même le port.
+        """
+        self.clear_midi_buffer()
+        return wait_for_input(timeout=timeout)
+
+    def wait_for_selection(self, choices):
+        """
+        Attend un choix joué au clavier MIDI (touches de sélection) ou tapé au clavier.
+        Retourne le choix, ou 'q' pour quitter.
+        """
+        with self.terminal:
+            while True:
+                char = self.wait_for_command(timeout=0.01)
+                if char and char.lower() == 'q':
+                    return 'q'
+                if char in choices:
+                    return char
+
+    _STATS_UPDATERS = {
+        'chord': (update_chord_success, update_chord_error),
+        'note': (update_note_success, update_note_error),
+        'scale': (update_scale_success, update_scale_error),
+    }
+    _STATS_GETTERS = {'chord': get_chord_errors, 'note': get_note_errors, 'scale': get_scale_errors}
+
+    def record_attempt(self, kind: str, item: str, correct: bool, played=None, expected=None,
+                       recognized: Optional[str] = None):
+        """
+        Comptabilise une tentative ('chord', 'note' ou 'scale') : solde d'erreurs de stats.json
+        (pondération des tirages), historique détaillé (attempt_store), esquisses de quantiles
+        des temps de réponse pour une réussite, matrice de confusion pour une erreur dont
+        l'élément joué (`recognized`) est connu.
+        """
+        on_success, on_error = self._STATS_UPDATERS[kind]
+        (on_success if correct else on_error)(item)
+        if (not correct and recognized and recognized != item
+                and not are_chord_names_enharmonically_equivalent(recognized, item)):
+            update_confusion(kind, item, recognized)
+
+        first_note_time, complete_time = self.attempt_timing
+        self.attempt_timing = (None, None)
+        reaction = completion = None
+        if self.prompt_started_at is not None:
+            completion = (complete_time or clock.now()) - self.prompt_started_at
+            if first_note_time is not None:
+                reaction = first_note_time - self.prompt_started_at
+
+        mode_key = self.__class__.__name__
+        record_attempt(mode_key, kind, item, correct, played, expected, completion)
+        self.mark(f"{kind} {item} : {'ok' if correct else 'erreur'}")
+        self.session_items.add((kind, item))
+        if correct:
+            record_latency(kind, item, mode_key, reaction, completion)
+
+    def top_errors(self, kind: str, limit: int = 5):
+        """
+        Éléments à travailler [(élément, solde d'erreurs)] : requête indexée sur l'historique
+        des tentatives, ou compteurs de stats.json si l'historique est vide ou indisponible.
+        """
+        store = get_attempt_store()
+        top = []
+        if store is not None:
+            store.flush()
+            top = store.top_errors(kind, limit)
+        if not top:
+            counters = self._STATS_GETTERS[kind]()
+            top = sorted(counters.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return top
+
+    def error_weights(self, kind: str) -> Dict[str, int]:
+        """
+        Solde d'erreurs par élément (pondération des tirages) : requête indexée sur l'historique
+        des tentatives, ou compteurs de stats.json si l'historique est vide ou indisponible.
+        """
+        store = get_attempt_store()
+        weights = {}
+        if store is not None:
+            store.flush()
+            weights = store.error_weights(kind)
+        return weights or self._STATS_GETTERS[kind]()
+
+    def progression_result(self, progression_accords) -> Optional[bool]:
+        """
+        Bilan au premier essai de la dernière progression : False si un accord a été raté,
+        True si tous ont été réussis, None si elle a été interrompue avant la fin.
+        """
+        results = self.last_progression_results
+        if not all(results.values()):
+            return False
+        if all(chord.split(" #")[0] in results for chord in progression_accords):
+            return True
+        return None
+
+    def wait_while_disconnected(self, live: Optional[Live] = None) -> float:
+        """
+        Met le mode en pause tant qu'un périphérique MIDI est déconnecté (voir MidiPortWatcher).
+        Retourne la durée de la pause en secondes (0 si aucun périphérique n'était absent),
+        à reporter sur les chronomètres. 'q' permet de quitter pendant la pause.
+        """
+        watcher = get_port_watcher()
+        if watcher is None or watcher.connected:
+            return 0.0
+
+        pause_start = clock.now()
+        message = (f"[bold red]Périphérique MIDI déconnecté : {', '.join(watcher.missing_ports())}[/bold red]\n"
+                   "En pause jusqu'à sa reconnexion... ('q' pour quitter)")
+        if live is not None:
+            live.update(Text.from_markup(message), refresh=True)
+        else:
+            self.console.print(message)
+
+        with self.terminal:
+            while not watcher.wait_until_connected(timeout=0.05):
+                char = self.wait_for_command(timeout=0.01)
+                if char and char.lower() == 'q':
+                    self.exit_flag = True
+                    break
+
+        # Les messages reçus pendant la reconnexion ne font pas partie d'une tentative
+        self.clear_midi_buffer()
+        paused = clock.now() - pause_start
+        if self.session_stopwatch_start_time is not None:
+            self.session_stopwatch_start_time += paused
+        if not self.exit_flag and live is None:
+            self.console.print("[bold green]Périphérique reconnecté, reprise.[/bold green]")
+        return paused
+
     def display_header(self, mode_title, mode_name, border_style):
         clear_screen()
         self.console.print(Panel(
@@ -108,27 +279,39 @@ class ChordModeBase:
     def wait_for_end_choice(self) -> str:
         """Attend une saisie instantanée pour continuer ou quitter."""
         self.console.print("\n[bold green]Progression terminée ![/bold green] Appuyez sur une touche pour continuer ou 'q' pour quitter...")
-        enable_raw_mode()
-        try:
+        with self.terminal:
             while not self.exit_flag:
-                char = wait_for_input(timeout=0.05)
+                char = self.wait_for_command(timeout=0.05)
                 if char:
                     if char.lower() == 'q':
                         self.exit_flag = True
                         return 'quit'
                     return 'continue'
-                time.sleep(0.01)
-        finally:
-            disable_raw_mode()
+                clock.sleep(0.01)
         return 'continue'
     
-    def _collect_input_logic(self, collection_mode: Literal['single', 'chord'] = 'chord', release_timeout: float = 0.3):
-        notes_currently_on = set()
-        attempt_notes = set()
+    def create_segmenter(self, expected_size: Optional[int] = None, release_timeout: float = 0.3) -> ChordSegmenter:
+        """Crée un segmenteur d'accords selon les paramètres du mode."""
+        return ChordSegmenter(
+            mode=self.chord_segmentation,
+            onset_window=self.onset_window,
+            release_timeout=release_timeout,
+            expected_size=expected_size,
+        )
+
+    def _collect_input_logic(self, collection_mode: Literal['single', 'chord'] = 'chord', release_timeout: float = 0.3, expected_size: Optional[int] = None):
+        # En mode 'single', la première note suffit : soumission dès l'attaque
+        segmenter = self.create_segmenter(1 if collection_mode == 'single' else expected_size, release_timeout)
         first_note = None
-        last_note_off_time = None
+        self.prompt_started_at = clock.now()
 
         while not self.exit_flag:
+            if self.wait_while_disconnected():
+                # Tentative interrompue par la déconnexion : on repart de zéro
+                segmenter.reset(forget_held=True)
+                first_note = None
+                continue
+
             char = wait_for_input(timeout=0.01)
             if char:
                 action = self.handle_keyboard_input(char)
@@ -142,41 +325,31 @@ class ChordModeBase:
                 # 'r' can also be handled by specific _handle_repeat, loop continues
 
             for msg in self.inport.iter_pending():
+                now = msg.time  # Horodatage d'arrivée posé par MidiInputNormalizer
                 if msg.type == 'note_on' and msg.velocity > 0:
-                    if not notes_currently_on: # First note of chord/sequence
+                    if not segmenter.notes_on: # First note of chord/sequence
                         if not getattr(self, "use_timer", False) and self.session_stopwatch_start_time is None:
-                            self.session_stopwatch_start_time = time.time()
+                            self.session_stopwatch_start_time = now
+                    if first_note is None:
+                        first_note = msg.note
 
-                    notes_currently_on.add(msg.note)
-                    if collection_mode == 'single':
-                        if first_note is None:
-                            first_note = msg.note
-                    else: # 'chord'
-                        attempt_notes.add(msg.note)
+                attempt_notes = segmenter.feed(msg, now)
+                if attempt_notes:
+                    self.attempt_timing = segmenter.submitted_timing
+                    return (first_note if collection_mode == 'single' else attempt_notes), True
 
-                    last_note_off_time = None
+            attempt_notes = segmenter.poll(clock.now())
+            if attempt_notes:
+                self.attempt_timing = segmenter.submitted_timing
+                return (first_note if collection_mode == 'single' else attempt_notes), True
 
-                elif msg.type == 'note_off':
-                    notes_currently_on.discard(msg.note)
-                    if not notes_currently_on and not last_note_off_time:
-                        last_note_off_time = time.time()
-
-            if last_note_off_time and time.time() - last_note_off_time > release_timeout:
-                if collection_mode == 'single':
-                    return first_note, True
-                else:
-                    return attempt_notes, True
-
-            time.sleep(0.01)
+            clock.sleep(0.01)
 
         return None, False # Return if loop is exited by self.exit_flag
 
-    def collect_user_input(self, collection_mode: Literal['single', 'chord'] = 'chord', release_timeout: float = 0.3):
-        enable_raw_mode()
-        try:
-            return self._collect_input_logic(collection_mode, release_timeout)
-        finally:
-            disable_raw_mode()
+    def collect_user_input(self, collection_mode: Literal['single', 'chord'] = 'chord', release_timeout: float = 0.3, expected_size: Optional[int] = None):
+        with self.terminal:
+            return self._collect_input_logic(collection_mode, release_timeout, expected_size)
 
     def check_chord(self, attempt_notes, chord_name, chord_notes):
         if not attempt_notes:
@@ -246,6 +419,10 @@ class ChordModeBase:
                     else:
                         self.console.print(f"[bold bright_green]Premier record de temps ![/bold bright_green] {new_time:.2f}s.")
 
+        self._display_history_summary(base_mode_key)
+        self._display_latency_summary(base_mode_key)
+        self._display_confusion_summary()
+
         if extra_stats_callback:
             extra_stats_callback()
 
@@ -253,6 +430,53 @@ class ChordModeBase:
         self.clear_midi_buffer()
         wait_for_any_key(self.inport)
 
+    def _display_history_summary(self, mode_key: str):
+        """Bilan du jour et de la semaine pour ce mode (lu dans les agrégats, temps constant)."""
+        store = get_attempt_store()
+        if store is None:
+            return
+        store.flush()
+        lines = []
+        for period, label in (("day", "Aujourd'hui"), ("week", "Cette semaine")):
+            summary = store.period_summary(mode_key, period)
+            if not summary["attempts"]:
+                continue
+            accuracy = summary["correct"] / summary["attempts"] * 100.0
+            line = f"{label} : [bold cyan]{summary['attempts']}[/bold cyan] tentatives, [bold green]{accuracy:.1f}%[/bold green] de réussite"
+            if summary["mean_latency"] is not None:
+                line += f", temps de réponse moyen [bold magenta]{summary['mean_latency']:.2f}s[/bold magenta]"
+            lines.append(line)
+        if lines:
+            self.console.print("\n[bold]Historique :[/bold]")
+            for line in lines:
+                self.console.print(line)
+
+    def _display_latency_summary(self, mode_key: str):
+        """Quantiles des temps de réponse du mode et éléments les plus lents de la session."""
+        quantiles = get_latency_quantiles("mode", mode_key)
+        if not quantiles:
+            return
+        p50, p90, p99 = (quantiles[q] for q in (0.5, 0.9, 0.99))
+        self.console.print(f"\n[bold]Temps de réponse (réussites) :[/bold] médiane [bold cyan]{p50:.2f}s[/bold cyan], "
+                           f"p90 [bold yellow]{p90:.2f}s[/bold yellow], p99 [bold red]{p99:.2f}s[/bold red]")
+        for kind in sorted({kind for kind, _ in self.session_items}):
+            items = [item for item_kind, item in self.session_items if item_kind == kind]
+            slowest = get_slowest_items(kind, items, q=0.9, limit=3)
+            if len(slowest) > 1:
+                details = ", ".join(f"{item} ({seconds:.2f}s)" for item, seconds in slowest)
+                self.console.print(f"Les plus lents (p90) : {details}")
+
+    def _display_confusion_summary(self):
+        """Confusions les plus fréquentes parmi les éléments travaillés pendant la session."""
+        for kind in sorted({kind for kind, _ in self.session_items}):
+            items = [item for item_kind, item in self.session_items if item_kind == kind]
+            confusions = get_top_confusions(kind, limit=3, expected_items=items)
+            if not confusions:
+                continue
+            self.console.print("\n[bold]Confusions fréquentes :[/bold]")
+            for expected, recognized, count in confusions:
+                self.console.print(f"- [bold cyan]{expected}[/bold cyan] joué comme [bold red]{recognized}[/bold red] ({count} fois)")
+
     # ---------- Méthodes pour le guidage vocal (transitions) ----------
 
     def _get_inversions(self, notes):
@@ -345,6 +569,39 @@ class ChordModeBase:
 
 
     # ---------- Boucle commune pour les modes de progression ----------
+    def _apply_progression_actions(self, engine: ProgressionEngine, actions: list, live: Live):
+        """Exécute les actions du moteur de progression : affichage, lecture, enregistrement, pauses."""
+        total_chords = len(engine.chords)
+        for action in actions:
+            kind = action[0]
+            if kind in ('prompt', 'render'):
+                _, index, chord_name, time_info = action
+                live.update(self.create_live_display(chord_name, index, total_chords, time_info), refresh=True)
+                if kind == 'prompt':
+                    self.prompt_started_at = clock.now()
+                    self.mark(f"consigne {chord_name.split(' #')[0]}")
+            elif kind == 'attempt':
+                _, chord_name, correct, played, expected, recognized, timing = action
+                self.attempt_timing = timing
+                self.record_attempt('chord', chord_name, correct, played, expected, recognized=recognized)
+            elif kind == 'feedback':
+                _, correct, chord_name, played, expected, recognized_name, recognized_inversion = action
+                notes_info = f"Notes jouées : [{get_colored_notes_string(played, expected)}]"
+                if correct:
+                    live.update(f"[bold green]Correct ! {chord_name} ({recognized_inversion})[/bold green]\n{notes_info}", refresh=True)
+                else:
+                    played_chord_info = f"{recognized_name} ({recognized_inversion})" if recognized_name else "Accord non reconnu"
+                    live.update(f"[bold red]Incorrect.[/bold red] Vous avez joué : {played_chord_info}\n{notes_info}", refresh=True)
+            elif kind == 'pause':
+                clock.sleep(action[1])
+            elif kind == 'play':
+                while wait_for_input(timeout=0.001): pass
+                live.update("[bold cyan]Lecture de la progression...[/bold cyan]", refresh=True)
+                play_progression_sequence(self.outport, engine.chords, self.chord_set)
+                while wait_for_input(timeout=0.001): pass
+            elif kind == 'timeout':
+                live.update("[bold red]Temps écoulé ! Session terminée.[/bold red]", refresh=True)
+
     def run_progression(
         self,
         progression_accords: List[str],
@@ -366,6 +623,8 @@ class ChordModeBase:
 
         self.last_played_notes = None
         self.played_voicings_in_progression.clear()
+        # Résultat au premier essai de chaque accord joué (planificateur de révision)
+        self.last_progression_results = {}
 
         if pre_display:
             pre_display()
@@ -409,122 +668,63 @@ class ChordModeBase:
         if (play_mode == 'SHOW_AND_PLAY' or play_mode == 'PLAY_ONLY') and current_progression_chords:
             play_progression_sequence(self.outport, current_progression_chords, self.chord_set)
 
-        progression_correct_count = 0
-        progression_total_attempts = 0
-        is_progression_started = False
-        start_time = None
-        skip_progression = False
-        choice = 'continue'
-
-        with Live(console=self.console, screen=False, auto_refresh=False) as live:
-            prog_index = 0
-            while prog_index < len(current_progression_chords) and not self.exit_flag and not skip_progression:
-                chord_name = current_progression_chords[prog_index]
-                target_notes = self.chord_set[chord_name]
-                chord_attempts = 0
-                
-                time_info = ""
-                if getattr(self, "use_timer", False) and is_progression_started and start_time is not None:
-                    remaining_time = self.timer_duration - (time.time() - start_time)
-                    time_info = f"Temps restant : [bold magenta]{remaining_time:.1f}s[/bold magenta]"
-
-                live.update(self.create_live_display(chord_name, prog_index, len(current_progression_chords), time_info), refresh=True)
-
-                notes_currently_on = set()
-                attempt_notes = set()
-
-                enable_raw_mode()
-                try:
-                    while not self.exit_flag and not skip_progression:
-                        if getattr(self, "use_timer", False) and is_progression_started and start_time is not None:
-                            remaining_time = self.timer_duration - (time.time() - start_time)
-                            time_info = f"Temps restant : [bold magenta]{remaining_time:.1f}s[/bold magenta]"
-                            disable_raw_mode()
-                            live.update(self.create_live_display(chord_name, prog_index, len(current_progression_chords), time_info), refresh=True)
-                            enable_raw_mode()
-                            if remaining_time <= 0:
-                                disable_raw_mode()
-                                live.update("[bold red]Temps écoulé ! Session terminée.[/bold red]", refresh=True)
-                                enable_raw_mode()
-                                time.sleep(2)
-                                self.exit_flag = True
-                                break
-
-                        char = wait_for_input(timeout=0.01)
-                        if char:
-                            action = self.handle_keyboard_input(char)
-                            if action == 'repeat':
-                                while wait_for_input(timeout=0.001): pass
-                                disable_raw_mode()
-                                live.update("[bold cyan]Lecture de la progression...[/bold cyan]", refresh=True)
-                                play_progression_sequence(self.outport, current_progression_chords, self.chord_set)
-                                enable_raw_mode()
-                                while wait_for_input(timeout=0.001): pass
-                                disable_raw_mode()
-                                prog_index = 0
-                                chord_name = current_progression_chords[prog_index]
-                                target_notes = self.chord_set[chord_name]
-                                live.update(self.create_live_display(chord_name, prog_index, len(current_progression_chords)), refresh=True)
-                                enable_raw_mode()
-                                break
-                            elif action == 'next':
-                                skip_progression = True
-                                choice = 'skipped'
-                                break
-                            elif action is True:
-                                break
-
-                        for msg in self.inport.iter_pending():
-                            if msg.type == 'note_on' and msg.velocity > 0:
-                                notes_currently_on.add(msg.note)
-                                attempt_notes.add(msg.note)
-                            elif msg.type == 'note_off':
-                                notes_currently_on.discard(msg.note)
-
-                        if not notes_currently_on and attempt_notes:
-                            chord_attempts += 1
-                            progression_total_attempts += 1
-                            if not is_progression_started:
-                                is_progression_started = True
-                                start_time = time.time()
-                            is_correct, recognized_name, recognized_inversion = self.check_chord(attempt_notes, chord_name, target_notes)
-                            if is_correct:
-                                self.played_voicings_in_progression.append(attempt_notes.copy())
-                                update_chord_success(chord_name.split(" #")[0])
-                                base_chord_name = chord_name.split(" #")[0]
-                                success_msg = f"[bold green]Correct ! {base_chord_name} ({recognized_inversion})[/bold green]\nNotes jouées : [{get_colored_notes_string(attempt_notes, target_notes)}]"
-                                disable_raw_mode()
-                                live.update(success_msg, refresh=True)
-                                enable_raw_mode()
-                                time.sleep(2)
-                                if chord_attempts == 1:
-                                    progression_correct_count += 1
-                                prog_index += 1
-                                self.last_played_notes = attempt_notes
-                                break
-                            else:
-                                update_chord_error(chord_name.split(" #")[0])
-                                played_chord_info = f"{recognized_name} ({recognized_inversion})" if recognized_name else "Accord non reconnu"
-                                error_msg = f"[bold red]Incorrect.[/bold red] Vous avez joué : {played_chord_info}\nNotes jouées : [{get_colored_notes_string(attempt_notes, target_notes)}]"
-                                disable_raw_mode()
-                                live.update(error_msg, refresh=True)
-                                time.sleep(2)
-                                live.update(self.create_live_display(chord_name, prog_index, len(current_progression_chords)), refresh=True)
-                                enable_raw_mode()
-                                attempt_notes.clear()
-                        time.sleep(0.01)
-                finally:
-                    disable_raw_mode()
+        engine = ProgressionEngine(
+            current_progression_chords, self.chord_set, self.check_chord,
+            # Un seul segmenteur pour toute la progression, sans délai après relâchement
+            segmenter=self.create_segmenter(release_timeout=0.0),
+            use_timer=getattr(self, "use_timer", False),
+            timer_duration=getattr(self, "timer_duration", 30.0),
+        )
+
+        with self.terminal, Live(console=self.console, screen=False, auto_refresh=False) as live:
+            self._apply_progression_actions(engine, engine.start(clock.now()), live)
+            while engine.running and not self.exit_flag:
+                paused = self.wait_while_disconnected(live)
+                if paused:
+                    self._apply_progression_actions(engine, engine.resume(paused), live)
+                    continue
+
+                self._apply_progression_actions(engine, engine.tick(clock.now()), live)
+                if not engine.running:
+                    break
+
+                char = wait_for_input(timeout=0.01)
+                if char:
+                    action = self.handle_keyboard_input(char)
+                    command = 'quit' if action is True else action if action in ('repeat', 'next') else None
+                    if command:
+                        self._apply_progression_actions(engine, engine.command(command, clock.now()), live)
+                        if not engine.running:
+                            break
+
+                for msg in self.inport.iter_pending():
+                    actions = engine.note(msg, msg.time)
+                    if actions:
+                        # Les messages suivants restent en file jusqu'au prochain tour
+                        self._apply_progression_actions(engine, actions, live)
+                        break
+                clock.sleep(0.01)
+
+            self.played_voicings_in_progression.extend(engine.played_voicings)
+            self.last_progression_results = engine.results
+            if engine.last_played_notes is not None:
+                self.last_played_notes = engine.last_played_notes
+            if engine.status == 'exit':
+                self.exit_flag = True
             if self.exit_flag:
                 if temp_chord_set: self.chord_set = original_chord_set
                 return 'exit'
 
-        if skip_progression:
+        if engine.status == 'skipped':
             self.console.print("\n[bold yellow]Passage à la progression suivante.[/bold yellow]")
-            time.sleep(1)
+            clock.sleep(1)
             if temp_chord_set: self.chord_set = original_chord_set
             return 'skipped'
 
+        progression_correct_count = engine.correct_count
+        progression_total_attempts = engine.total_attempts
+        start_time = engine.start_time
+        choice = 'continue'
         self.session_correct_count += progression_correct_count
         self.session_total_attempts += progression_total_attempts
         self.session_total_count += len(progression_accords)
@@ -537,8 +737,8 @@ class ChordModeBase:
             if progression_total_attempts > 0:
                 accuracy = (progression_correct_count / progression_total_attempts) * 100
                 self.console.print(f"Précision : [bold cyan]{accuracy:.1f}%[/bold cyan]")
-            if is_progression_started and start_time is not None:
-                end_time = time.time()
+            if start_time is not None:
+                end_time = clock.now()
                 progression_elapsed = end_time - start_time
                 if getattr(self, "use_timer", False):
                     self.elapsed_time = progression_elapsed
@@ -607,7 +807,7 @@ class ChordModeBase:
     def display_final_stats(self):
         # Calculer le temps écoulé de session si chronomètre actif (sans compte à rebours)
         if not getattr(self, "use_timer", False) and getattr(self, "session_stopwatch_start_time", None) is not None:
-            self.elapsed_time = time.time() - self.session_stopwatch_start_time
+            self.elapsed_time = clock.now() - self.session_stopwatch_start_time
         display_stats(self.correct_count, self.total_attempts, self.elapsed_time if self.elapsed_time else None)
         self.console.print("\nAppuyez sur une touche pour retourner au menu principal.")
         self.clear_midi_buffer()
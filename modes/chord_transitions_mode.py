@@ -1,34 +1,12 @@
 # modes/chord_transitions_mode.py
 import random
-import time
 from typing import List, Tuple
 
 from .chord_mode_base import ChordModeBase
+import clock
 from data.chords import three_note_chords, gammes_majeures
-from stats_manager import get_chord_errors
-from keyboard_handler import wait_for_input, enable_raw_mode, disable_raw_mode
 from screen_handler import clear_screen
-
-def weighted_sample_without_replacement(population, weights, k=1):
-    """
-    Performs weighted sampling without replacement.
-    """
-    population = list(population)
-    weights = list(weights)
-
-    if len(population) < k:
-        return random.sample(population, k)
-
-    result = []
-    for _ in range(k):
-        if not population:
-            break
-        chosen_element = random.choices(population, weights=weights, k=1)[0]
-        chosen_index = population.index(chosen_element)
-        population.pop(chosen_index)
-        weights.pop(chosen_index)
-        result.append(chosen_element)
-    return result
+from sampler import WeightedSampler
 
 class ChordTransitionsMode(ChordModeBase):
     def __init__(self, inport, outport, chord_set):
@@ -39,14 +17,15 @@ class ChordTransitionsMode(ChordModeBase):
         self.use_timer: bool = False
         self.timer_duration: float = 30.0
         self.play_progression_before_start: str = 'SHOW_AND_PLAY'
+        self._keys = WeightedSampler(gammes_majeures)
+        self._last_key = None
 
     def wait_for_end_choice(self) -> str:
         """Overrides base method to add a 'replay' option."""
         self.console.print("\n[bold green]Progression terminée ![/bold green] Appuyez sur 'r' pour rejouer, 'q' pour quitter, ou une autre touche pour continuer...")
-        enable_raw_mode()
-        try:
+        with self.terminal:
             while not self.exit_flag:
-                char = wait_for_input(timeout=0.05)
+                char = self.wait_for_command(timeout=0.05)
                 if char:
                     if char.lower() == 'q':
                         self.exit_flag = True
@@ -55,24 +34,23 @@ class ChordTransitionsMode(ChordModeBase):
                         return 'repeat'
                     else:
                         return 'continue'
-                time.sleep(0.01)
-        finally:
-            disable_raw_mode()
+                clock.sleep(0.01)
         return 'continue' # Default action
 
     def _generate_progression(self) -> Tuple[List[str], str]:
         """Generates a musically coherent, weighted random progression."""
-        # 1. Pick a random key and its diatonic chords
-        random_key = random.choice(list(gammes_majeures.keys()))
+        # 1. Pick a random key (different from the previous one) and its diatonic chords
+        random_key = self._keys.sample(exclude=(self._last_key,))
+        self._last_key = random_key
         diatonic_chords = gammes_majeures[random_key]
 
         # 2. Get user stats and calculate weights for these chords
-        chord_errors = get_chord_errors()
-        weights = [1 + (chord_errors.get(chord, 0) ** 2) for chord in diatonic_chords]
+        chord_errors = self.error_weights('chord')
+        weights = {chord: 1 + (chord_errors.get(chord, 0) ** 2) for chord in diatonic_chords}
 
-        # 3. Generate a weighted random progression from the diatonic chords
+        # 3. Generate a weighted random progression from the diatonic chords (without replacement)
         prog_len = random.randint(self.progression_length[0], self.progression_length[1])
-        progression_names = weighted_sample_without_replacement(diatonic_chords, weights, k=prog_len)
+        progression_names = WeightedSampler(diatonic_chords, weights).sample_many(prog_len)
 
         # 4. Ensure the generated chords exist in the current chord set
         progression_names = [name for name in progression_names if name in self.chord_set]
@@ -117,4 +95,4 @@ def chord_transitions_mode(inport, outport, use_timer, timer_duration, progressi
     mode.use_timer = use_timer
     mode.timer_duration = timer_duration
     mode.play_progression_before_start = play_progression_before_start
-    mode.run()
+    mode.start()
@@ -4,7 +4,7 @@ import random
 from rich.table import Table
 
 from .chord_mode_base import ChordModeBase
-from stats_manager import get_chord_errors
+from scheduler import ReviewScheduler
 from data.chords import gammes_majeures
 from screen_handler import int_to_roman
 
@@ -33,23 +33,20 @@ class DegreesMode(ChordModeBase):
         active_degree_pos = None  # 0-based dans la liste filtrée
         last_tonalite = None
 
-        while not self.exit_flag:
-            chord_errors = get_chord_errors()
-            # Choisir une tonalité de manière pondérée
-            tonalites = list(gammes_majeures.keys())
-            weights = [1 + sum(chord_errors.get(chord, 0) ** 2 for chord in gammes_majeures[t]) for t in tonalites]
+        chord_errors = self.error_weights('chord')
+        # Priorité initiale des tonalités : 1 + somme des carrés des erreurs de leurs accords
+        tonalites = list(gammes_majeures.keys())
+        weights = {t: 1 + sum(chord_errors.get(chord, 0) ** 2 for chord in gammes_majeures[t]) for t in tonalites}
+        scheduler = ReviewScheduler(tonalites, weights)
 
+        while not self.exit_flag:
             # --- DEBUG DISPLAY ---
-            debug_info = "\n[bold dim]-- Debug: Top 5 Weighted Tonalites --[/bold dim]\n"
-            weighted_tonalites = sorted(zip(tonalites, weights), key=lambda x: x[1], reverse=True)
-            for t, w in weighted_tonalites[:5]:
-                if w > 1:
-                    debug_info += f"[dim] - {t}: {w}[/dim]\n"
+            debug_info = "\n[bold dim]-- Debug: Prochaines tonalités à réviser --[/bold dim]\n"
+            for t in scheduler.priorities(5):
+                debug_info += f"[dim] - {t}[/dim]\n"
             # --- END DEBUG ---
 
-            tonalite = random.choices(tonalites, weights=weights, k=1)[0]
-            while tonalite == last_tonalite:
-                tonalite = random.choices(tonalites, weights=weights, k=1)[0]
+            tonalite = scheduler.next(avoid=[last_tonalite])
             last_tonalite = tonalite
 
             gammes = gammes_majeures[tonalite]
@@ -89,6 +86,9 @@ class DegreesMode(ChordModeBase):
                 debug_info=debug_info
             )
 
+            if chord_name in self.last_progression_results:
+                scheduler.record(tonalite, self.last_progression_results[chord_name])
+
             if result == 'exit':
                 break
             # Sinon, on continue la boucle pour demander un nouvel accord du même degré actif dans une nouvelle tonalité
@@ -98,4 +98,4 @@ class DegreesMode(ChordModeBase):
 
 def degrees_mode(inport, outport, use_timer, timer_duration, progression_selection_mode, play_progression_before_start, chord_set):
     mode = DegreesMode(inport, outport, use_timer, timer_duration, progression_selection_mode, play_progression_before_start, chord_set)
-    mode.run()
\ No newline at end of file
+    mode.start()
\ No newline at end of file
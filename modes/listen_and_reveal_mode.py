@@ -1,5 +1,4 @@
 # modes/listen_and_reveal_mode.py
-import time
 import random
 from typing import Literal
 from rich.live import Live
@@ -7,11 +6,11 @@ from rich.panel import Panel
 from rich.text import Text
 
 from .chord_mode_base import ChordModeBase
-from stats_manager import update_chord_error, update_chord_success
+import clock
 from midi_handler import play_chord
 from screen_handler import clear_screen
 from music_theory import get_note_name, get_chord_type_from_name
-from keyboard_handler import enable_raw_mode, disable_raw_mode
+from sampler import WeightedSampler
 
 class ListenAndRevealMode(ChordModeBase):
     def __init__(self, inport, outport, chord_set):
@@ -29,13 +28,13 @@ class ListenAndRevealMode(ChordModeBase):
         self.console.print("Écoutez l'accord joué et essayez de le reproduire.")
         self.console.print("Appuyez sur 'q' pour quitter, 'r' pour répéter, 'n' pour passer au suivant.")
 
+        chords = WeightedSampler(self.chord_set)
         with Live(console=self.console, screen=False, auto_refresh=False) as live:
             while not self.exit_flag:
                 self.clear_midi_buffer()
 
-                new_chord_name, new_chord_notes = random.choice(list(self.chord_set.items()))
-                while new_chord_name == self.last_chord_name:
-                    new_chord_name, new_chord_notes = random.choice(list(self.chord_set.items()))
+                new_chord_name = chords.sample(exclude=(self.last_chord_name,))
+                new_chord_notes = self.chord_set[new_chord_name]
 
                 self.current_chord_name = new_chord_name
                 # The "correct" answer is always based on the root position notes
@@ -62,9 +61,7 @@ class ListenAndRevealMode(ChordModeBase):
                         prompt_text.append(feedback_text)
                     live.update(Panel(prompt_text, title="Action", border_style="green"), refresh=True)
 
-                    enable_raw_mode()
-                    attempt_notes, status = self._collect_input_logic(collection_mode='chord')
-                    disable_raw_mode()
+                    attempt_notes, status = self.collect_user_input(collection_mode='chord', expected_size=len(self.current_chord_notes))
 
                     if status == 'next':
                         break
@@ -79,16 +76,16 @@ class ListenAndRevealMode(ChordModeBase):
 
                     if is_correct:
                         if first_attempt: self.session_correct_count += 1
-                        update_chord_success(self.current_chord_name)
+                        self.record_attempt('chord', self.current_chord_name, True, attempt_notes, self.current_chord_notes)
                         # Display the expected chord name, but the inversion the user played.
                         success_feedback_text = f"Correct ! C'était bien {self.current_chord_name} ({recognized_inversion})."
                         success_feedback = Text.from_markup(f"[bold green]{success_feedback_text}[/bold green]")
                         live.update(Panel(success_feedback, title="Résultat", border_style="green"), refresh=True)
-                        time.sleep(1.5)
+                        clock.sleep(1.5)
                         break
                     else:
                         first_attempt = False
-                        update_chord_error(self.current_chord_name)
+                        self.record_attempt('chord', self.current_chord_name, False, attempt_notes, self.current_chord_notes, recognized=recognized_name)
                         incorrect_attempts += 1
 
                         played_chord_info = f"{recognized_name} ({recognized_inversion})" if recognized_name else "Accord non reconnu"
@@ -102,7 +99,7 @@ class ListenAndRevealMode(ChordModeBase):
                             revealed_type = get_chord_type_from_name(self.current_chord_name)
                             feedback_text.append(Text.from_markup(f"\n[bold magenta]La réponse était : {self.current_chord_name}[/bold magenta]"))
                             live.update(Panel(feedback_text, title="Réponse", border_style="magenta"), refresh=True)
-                            time.sleep(2.5)
+                            clock.sleep(2.5)
                             break
 
                 self.session_total_count += 1
@@ -119,4 +116,4 @@ class ListenAndRevealMode(ChordModeBase):
 
 def listen_and_reveal_mode(inport, outport, chord_set):
     mode = ListenAndRevealMode(inport, outport, chord_set)
-    mode.run()
\ No newline at end of file
+    mode.start()
\ No newline at end of file
@@ -1,12 +1,12 @@
 # modes/missing_chord_mode.py
 import random
-import time
 from typing import List, Tuple, Optional, Dict, Any, Set
 
 from rich.panel import Panel
 from rich.text import Text
 
 from .chord_mode_base import ChordModeBase
+import clock
 from data.chords import (
     all_chords,
     three_note_chords,
@@ -16,10 +16,9 @@ from data.chords import (
     pop_rock_progressions,
     DEGREE_MAP,
 )
-from stats_manager import get_chord_errors, update_chord_success, update_chord_error
 from midi_handler import play_chord
 from screen_handler import clear_screen
-from keyboard_handler import wait_for_input, enable_raw_mode, disable_raw_mode
+from keyboard_handler import wait_for_input
 from music_theory import get_note_name, get_note_name_with_octave
 
 
@@ -160,7 +159,7 @@ class MissingChordMode(ChordModeBase):
     def _play_gapped_progression(self, progression_chords: List[str], chord_set: Dict, voicings: List[Set[int]], missing_index: int):
         from music_theory import get_note_name_with_octave # Local import
         self.console.print("\nÉcoutez bien la progression ('r' pour réécouter)...")
-        time.sleep(1)
+        clock.sleep(1)
 
         chord_duration = 0.8
         pause_duration = 0.5
@@ -199,17 +198,17 @@ class MissingChordMode(ChordModeBase):
 
         for i, chord_name in enumerate(progression_chords):
             if i == missing_index:
-                time.sleep(chord_duration + pause_duration)
+                clock.sleep(chord_duration + pause_duration)
             else:
                 notes = chord_set.get(chord_name)
                 if notes:
                     play_chord(self.outport, notes, duration=chord_duration)
-                    time.sleep(pause_duration)
+                    clock.sleep(pause_duration)
         self.console.print()
 
     def _play_full_progression(self, progression_chords: List[str], chord_set: Dict, missing_index: int):
         self.console.print("\nVoici la progression complète :")
-        time.sleep(1)
+        clock.sleep(1)
 
         chord_duration = 0.8
         pause_duration = 0.5
@@ -235,29 +234,23 @@ class MissingChordMode(ChordModeBase):
             notes = chord_set.get(chord_name)
             if notes:
                 play_chord(self.outport, notes, duration=chord_duration)
-                time.sleep(pause_duration)
+                clock.sleep(pause_duration)
         self.console.print()
 
     def _collect_and_handle_input(self, prog_to_play, chord_set_to_use, voicings, missing_index) -> Tuple[Optional[Set[int]], str]:
-        notes_currently_on = set()
-        attempt_notes = set()
-        last_note_off_time = None
+        missing_chord_notes = chord_set_to_use[prog_to_play[missing_index]]
+        segmenter = self.create_segmenter(expected_size=len(missing_chord_notes))
 
-        enable_raw_mode()
-        try:
+        with self.terminal:
             while not self.exit_flag:
                 char = wait_for_input(timeout=0.01)
                 if char:
                     if char.lower() == 'r':
-                        disable_raw_mode()
                         clear_screen()
                         self.display_header("Trouve l'Accord Manquant", "Mode de Jeu", "bright_cyan")
                         self._play_gapped_progression(prog_to_play, chord_set_to_use, voicings, missing_index)
                         self.console.print("Quel était l'accord manquant ?")
-                        enable_raw_mode()
-                        attempt_notes.clear()
-                        notes_currently_on.clear()
-                        last_note_off_time = None
+                        segmenter = self.create_segmenter(expected_size=len(missing_chord_notes))
                         continue
                     elif char.lower() == 'n':
                         return None, 'next'
@@ -266,21 +259,15 @@ class MissingChordMode(ChordModeBase):
                         return None, 'quit'
 
                 for msg in self.inport.iter_pending():
-                    if msg.type == 'note_on' and msg.velocity > 0:
-                        notes_currently_on.add(msg.note)
-                        attempt_notes.add(msg.note)
-                        last_note_off_time = None
-                    elif msg.type == 'note_off':
-                        notes_currently_on.discard(msg.note)
-                        if not notes_currently_on:
-                            last_note_off_time = time.time()
-
-                if last_note_off_time and (time.time() - last_note_off_time > 0.3):
-                     return attempt_notes, 'attempt'
-
-                time.sleep(0.01)
-        finally:
-            disable_raw_mode()
+                    attempt_notes = segmenter.feed(msg, msg.time)
+                    if attempt_notes:
+                        return attempt_notes, 'attempt'
+
+                attempt_notes = segmenter.poll(clock.now())
+                if attempt_notes:
+                    return attempt_notes, 'attempt'
+
+                clock.sleep(0.01)
 
         return None, 'quit'
 
@@ -302,7 +289,7 @@ class MissingChordMode(ChordModeBase):
                     # We have a valid progression, break the generation loop
                     break
                 # Optional: Add a small sleep to prevent a tight loop if generation consistently fails
-                time.sleep(0.01)
+                clock.sleep(0.01)
 
             progression, source_type, source_detail = prog_data
 
@@ -341,7 +328,7 @@ class MissingChordMode(ChordModeBase):
                         if wrong_attempts == 0:
                             self.session_correct_count += 1
 
-                        update_chord_success(missing_chord_name.split(" #")[0])
+                        self.record_attempt('chord', missing_chord_name.split(" #")[0], True, attempt_notes, missing_chord_notes)
 
                         base_chord_name = missing_chord_name.split(' #')[0]
                         display_name = f"{base_chord_name} ({recognized_inversion})"
@@ -367,7 +354,7 @@ class MissingChordMode(ChordModeBase):
                         break
                     else:
                         wrong_attempts += 1
-                        update_chord_error(missing_chord_name.split(" #")[0])
+                        self.record_attempt('chord', missing_chord_name.split(" #")[0], False, attempt_notes, missing_chord_notes, recognized=recognized_name)
 
                         if recognized_name:
                             if recognized_name == last_incorrect_chord:
@@ -387,14 +374,11 @@ class MissingChordMode(ChordModeBase):
 
             if not self.exit_flag:
                 self.console.print("\nAppuyez sur 'n' pour la suite, 'q' pour quitter...")
-                enable_raw_mode()
-                try:
+                with self.terminal:
                     while True:
-                        char = wait_for_input()
+                        char = self.wait_for_command()
                         if char and char.lower() == 'n': break
                         if char and char.lower() == 'q': self.exit_flag = True; break
-                finally:
-                    disable_raw_mode()
 
         self.show_overall_stats_and_wait()
 
@@ -417,4 +401,4 @@ def missing_chord_mode(
         play_progression_before_start,
         chord_set,
     )
-    mode.run()
+    mode.start()
@@ -12,7 +12,7 @@ class PopRockMode(ChordModeBase):
         super().__init__(inport, outport, chord_set)
         self.use_timer = use_timer
         self.timer_duration = timer_duration
-        self.progression_selection_mode = progression_selection_mode  # conservé pour compat
+        self.progression_selection_mode = progression_selection_mode  # 'midi' : sélection au clavier MIDI
         self.play_progression_before_start = play_progression_before_start
         self.use_voice_leading = True
 
@@ -36,7 +36,12 @@ class PopRockMode(ChordModeBase):
 
             # Demander un choix à l'utilisateur
             choices = list(pop_rock_progressions.keys()) + ["q"]
-            choice = Prompt.ask("Choisissez une progression (numéro) ou 'q' pour quitter", choices=choices)
+            if self.progression_selection_mode == 'midi':
+                self.console.print("Jouez la touche de sélection de la progression (ou 'q' pour quitter)")
+                choice = self.wait_for_selection(choices)
+            else:
+                with self.terminal.suspended():
+                    choice = Prompt.ask("Choisissez une progression (numéro) ou 'q' pour quitter", choices=choices)
             if choice.lower() == "q":
                 break
 
@@ -75,4 +80,4 @@ class PopRockMode(ChordModeBase):
 
 def pop_rock_mode(inport, outport, use_timer, timer_duration, progression_selection_mode, play_progression_before_start, chord_set):
     mode = PopRockMode(inport, outport, use_timer, timer_duration, progression_selection_mode, play_progression_before_start, chord_set)
-    mode.run()
+    mode.start()
@@ -1,37 +1,7 @@
 # modes/progression_mode.py
 import random
 from .chord_mode_base import ChordModeBase
-from stats_manager import get_chord_errors
-
-def weighted_sample_without_replacement(population, weights, k=1):
-    """
-    Performs weighted sampling without replacement.
-    """
-    population = list(population)
-    weights = list(weights)
-
-    if len(population) < k:
-        # Not enough unique items to sample from. Return a simple random sample.
-        return random.sample(population, k)
-
-    result = []
-    for _ in range(k):
-        if not population: # Should not happen if len(population) >= k
-            break
-
-        # random.choices returns a list of size 1
-        chosen_element = random.choices(population, weights=weights, k=1)[0]
-
-        # find the index to remove
-        chosen_index = population.index(chosen_element)
-
-        # remove from population and weights
-        population.pop(chosen_index)
-        weights.pop(chosen_index)
-
-        result.append(chosen_element)
-
-    return result
+from scheduler import ReviewScheduler
 
 class ProgressionMode(ChordModeBase):
     def __init__(self, inport, outport, use_timer, timer_duration, progression_selection_mode, play_progression_before_start, chord_set):
@@ -43,31 +13,22 @@ class ProgressionMode(ChordModeBase):
         self.use_voice_leading = True
 
     def run(self):
-        last_progression = []
+        chord_errors = self.error_weights('chord')
+        all_chords = list(self.chord_set.keys())
+        # Priorité initiale de 1 pour chaque accord, plus le carré du nombre d'erreurs
+        scheduler = ReviewScheduler(all_chords, {chord: 1 + chord_errors.get(chord, 0) ** 2 for chord in all_chords})
 
         while not self.exit_flag:
-            chord_errors = get_chord_errors()
-            # Générer une progression aléatoire, différente de la précédente
+            # Générer une progression à partir des accords les plus urgents à réviser
             prog_len = random.randint(3, 5)
 
-            all_chords = list(self.chord_set.keys())
-            # Poids de base de 1 pour chaque accord, plus le carré du nombre d'erreurs
-            weights = [1 + (chord_errors.get(chord, 0) ** 2) for chord in all_chords]
-
             # --- DEBUG DISPLAY ---
-            debug_info = "\n[bold dim]-- Debug: Top 5 Weighted Chords --[/bold dim]\n"
-            weighted_chords = sorted(zip(all_chords, weights), key=lambda x: x[1], reverse=True)
-            for chord, weight in weighted_chords[:5]:
-                if weight > 1:
-                    debug_info += f"[dim] - {chord}: {weight}[/dim]\n"
+            debug_info = "\n[bold dim]-- Debug: Prochains accords à réviser --[/bold dim]\n"
+            for chord in scheduler.priorities(5):
+                debug_info += f"[dim] - {chord}[/dim]\n"
             # --- END DEBUG ---
 
-            progression_accords = weighted_sample_without_replacement(all_chords, weights, k=prog_len)
-
-            while progression_accords == last_progression:
-                progression_accords = weighted_sample_without_replacement(all_chords, weights, k=prog_len)
-
-            last_progression = progression_accords
+            progression_accords = scheduler.take(prog_len)
 
             result = self.run_progression(
                 progression_accords=progression_accords,
@@ -78,6 +39,9 @@ class ProgressionMode(ChordModeBase):
                 debug_info=debug_info
             )
 
+            for chord, correct in self.last_progression_results.items():
+                scheduler.record(chord, correct)
+
             if result == 'exit':
                 break
 
@@ -86,4 +50,4 @@ class ProgressionMode(ChordModeBase):
 
 def progression_mode(inport, outport, use_timer, timer_duration, progression_selection_mode, play_progression_before_start, chord_set):
     mode = ProgressionMode(inport, outport, use_timer, timer_duration, progression_selection_mode, play_progression_before_start, chord_set)
-    mode.run()
+    mode.start()
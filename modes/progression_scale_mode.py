@@ -1,13 +1,12 @@
 # modes/progression_scale_mode.py
-import time
-import random
 from typing import Literal
 
 from .chord_mode_base import ChordModeBase
+import clock
 from midi_handler import play_note_sequence
 from screen_handler import clear_screen
 from music_theory import get_note_name, generate_scale
-from stats_manager import get_scale_errors, update_scale_error, update_scale_success
+from scheduler import ReviewScheduler
 
 # MIDI note values for roots
 NOTE_MIDI_MAP = {
@@ -30,6 +29,7 @@ class ProgressionScaleMode(ChordModeBase):
         self.current_scale_name = None
         self.current_scale_notes = None
         self.last_scale_name = None
+        self.scheduler = None
 
         # Define the pool of scales to practice
         self.scale_pool = []
@@ -48,35 +48,31 @@ class ProgressionScaleMode(ChordModeBase):
         return 'repeat'
 
     def select_weighted_scale(self):
-        scale_errors = get_scale_errors()
-        weights = [1 + scale_errors.get(s['display_name'], 0) ** 2 for s in self.scale_pool]
-
-        selected_scale = random.choices(self.scale_pool, weights=weights, k=1)[0]
-        while selected_scale['display_name'] == self.last_scale_name:
-            selected_scale = random.choices(self.scale_pool, weights=weights, k=1)[0]
-
-        return selected_scale
+        if self.scheduler is None:
+            # Priorité initiale : 1 + carré du nombre d'erreurs de la gamme
+            scale_errors = self.error_weights('scale')
+            names = [s['display_name'] for s in self.scale_pool]
+            self.scheduler = ReviewScheduler(names, {name: 1 + scale_errors.get(name, 0) ** 2 for name in names})
+            self._scales_by_name = {s['display_name']: s for s in self.scale_pool}
+        name = self.scheduler.next(avoid=[self.last_scale_name])
+        return self._scales_by_name[name]
 
     def _display_top_scale_errors(self):
-        scale_errors = get_scale_errors()
-        if not scale_errors:
+        top_errors = self.top_errors('scale', 5)
+        if not top_errors:
             return
 
-        sorted_errors = sorted(scale_errors.items(), key=lambda item: item[1], reverse=True)
-
         self.console.print("\n[bold]Gammes à travailler :[/bold]")
-        for scale_name, count in sorted_errors[:5]: # Show top 5
+        for scale_name, count in top_errors:
             self.console.print(f"- [bold cyan]{scale_name}[/bold cyan]: {count} erreur{'s' if count > 1 else ''}")
 
     def _wait_for_end_choice(self):
         """Waits for the user to press 'n', 'r', or 'q' after a scale is played."""
-        from keyboard_handler import wait_for_input, enable_raw_mode, disable_raw_mode
         self.console.print("\nAppuyez sur [bold]n[/bold] pour la gamme suivante, [bold]r[/bold] pour répéter, ou [bold]q[/bold] pour quitter.")
 
-        enable_raw_mode()
-        try:
+        with self.terminal:
             while True:
-                char = wait_for_input(timeout=0.1)
+                char = self.wait_for_command(timeout=0.1)
                 if char:
                     if char.lower() == 'n':
                         return 'next'
@@ -85,8 +81,6 @@ class ProgressionScaleMode(ChordModeBase):
                     if char.lower() == 'q':
                         self.exit_flag = True
                         return 'quit'
-        finally:
-            disable_raw_mode()
 
     def run(self):
         self.display_header("Les Gammes", "Mode Gammes", "green")
@@ -105,7 +99,7 @@ class ProgressionScaleMode(ChordModeBase):
 
             if not self.current_scale_notes:
                 self.console.print(f"[bold red]Erreur: Impossible de générer la gamme {self.current_scale_name}[/bold red]")
-                time.sleep(2)
+                clock.sleep(2)
                 select_new_scale = True
                 continue
 
@@ -152,7 +146,7 @@ class ProgressionScaleMode(ChordModeBase):
 
                     if (attempt_note % 12) == (correct_note_for_step % 12):
                         self.console.print(f"[green]Correct ![/green]")
-                        time.sleep(0.5)
+                        clock.sleep(0.5)
                         break # Correct note played, exit inner loop
                     else:
                         scale_was_perfect = False
@@ -178,12 +172,13 @@ class ProgressionScaleMode(ChordModeBase):
             else:
                 # This block runs only if the user completed the whole scale
                 self.session_total_attempts += 1 # An attempt is a full, completed scale
+                self.scheduler.record(self.current_scale_name, scale_was_perfect)
                 if scale_was_perfect:
                     self.session_correct_count += 1
-                    update_scale_success(self.current_scale_name)
+                    self.record_attempt('scale', self.current_scale_name, True)
                     self.console.print(f"\n[bold green]Parfait ! Gamme de {self.current_scale_name} terminée.[/bold green]")
                 else:
-                    update_scale_error(self.current_scale_name)
+                    self.record_attempt('scale', self.current_scale_name, False)
                     self.console.print(f"\n[bold yellow]Gamme de {self.current_scale_name} terminée.[/bold yellow]")
 
                 choice = self._wait_for_end_choice()
@@ -201,4 +196,4 @@ class ProgressionScaleMode(ChordModeBase):
 def progression_scale_mode(inport, outport):
     """Entry point for the Progression Scale Mode."""
     mode = ProgressionScaleMode(inport, outport)
-    mode.run()
+    mode.start()
@@ -1,17 +1,46 @@
 # modes/reverse_chord_mode.py
-import time
 from rich.panel import Panel
 from rich.live import Live
+from rich.text import Text
 
 from .chord_mode_base import ChordModeBase
-from music_theory import recognize_chord, get_note_name
-from keyboard_handler import enable_raw_mode, disable_raw_mode
-from data.chords import enharmonic_map
-from music_theory import recognize_chord
+from chord_tracking import HeldChordTracker
+from key_detection import KeyEstimator
+from keyboard_handler import wait_for_input
 
 class ReverseChordMode(ChordModeBase):
     def __init__(self, inport, outport, chord_set):
         super().__init__(inport, outport, chord_set)
+        self.tracker = HeldChordTracker()
+        self.key_estimator = KeyEstimator()
+        self.last_recognized = None
+
+    def _build_panel(self):
+        recognized_name, recognized_inversion, completions = self.tracker.result
+        content = Text()
+        key_name = self.key_estimator.key_name()
+        if key_name:
+            content.append_text(Text.from_markup(f"Tonalité estimée : [bold magenta]{key_name}[/bold magenta]\n"))
+        else:
+            content.append("Tonalité estimée : (analyse en cours...)\n", style="dim")
+
+        if recognized_name:
+            content.append_text(Text.from_markup(f"[bold green]{recognized_name}[/bold green] ({recognized_inversion})"))
+            degree = self.key_estimator.roman_degree(recognized_name)
+            if degree:
+                content.append_text(Text.from_markup(f" - degré [bold magenta]{degree}[/bold magenta]"))
+        elif self.tracker.held_notes:
+            content.append_text(Text.from_markup("[bold red]Accord non reconnu[/bold red]"))
+        elif self.last_recognized:
+            name, inversion = self.last_recognized
+            content.append_text(Text.from_markup(f"Dernier accord : [bold]{name}[/bold] ({inversion})"))
+        else:
+            content.append("En attente de notes...", style="dim")
+
+        if completions:
+            content.append("\nCompléments possibles : ", style="default")
+            content.append(", ".join(completions), style="cyan")
+        return Panel(content, title="Accord joué", border_style="cyan")
 
     def run(self):
         def pre_display():
@@ -21,6 +50,7 @@ class ReverseChordMode(ChordModeBase):
                 "\nCe mode reconnaît les accords à 3 ou 4 notes en position fondamentale "
                 "ainsi qu'en 1er et 2ème (et 3ème) renversement, quelle que soit l'octave."
             )
+            self.console.print("L'accord est reconnu en temps réel, touches enfoncées, et la tonalité est estimée au fil du jeu.")
             self.console.print("---")
 
         # Affiche l'entête une première fois
@@ -31,25 +61,37 @@ class ReverseChordMode(ChordModeBase):
         )
         pre_display()
 
-        enable_raw_mode()
-        try:
-            with Live(console=self.console, screen=False, auto_refresh=False) as live:
-                while not self.exit_flag:
-                    self.clear_midi_buffer()
-                    attempt_notes, status = self._collect_input_logic(collection_mode='chord')
-                    if status == 'next' or status == 'repeat':
-                        continue
-                    if status is not True: # Now only catches 'quit' (False)
-                        break
-
-                    # Met à jour l'affichage avec le résultat
-                    recognized_name, recognized_inversion = recognize_chord(attempt_notes)  
-                                      
-                    self.display_feedback(True, attempt_notes, attempt_notes, recognized_name, recognized_inversion, True)
-                    #live.update(Panel, refresh=True)
-
-        finally:
-            disable_raw_mode()
+        self.clear_midi_buffer()
+        self.tracker.reset()
+        self.key_estimator.reset()
+        with self.terminal, Live(console=self.console, screen=False, auto_refresh=False) as live:
+            live.update(self._build_panel(), refresh=True)
+            while not self.exit_flag:
+                if self.wait_while_disconnected(live):
+                    # Les touches tenues avant la déconnexion ne seront jamais relâchées
+                    self.tracker.reset()
+                    live.update(self._build_panel(), refresh=True)
+                    continue
+
+                # Délai de sondage court : la lecture clavier sert d'attente pour la boucle MIDI
+                char = wait_for_input(timeout=0.002)
+                if char:
+                    self.handle_keyboard_input(char)
+
+                changed = False
+                for msg in self.inport.iter_pending():
+                    if msg.type == 'note_on' and msg.velocity > 0:
+                        if self.key_estimator.add_note(msg.note, msg.time):
+                            changed = True
+                    if self.tracker.feed(msg):
+                        changed = True
+                        recognized_name, recognized_inversion, _ = self.tracker.result
+                        if recognized_name:
+                            self.last_recognized = (recognized_name, recognized_inversion)
+
+                # Redessiner uniquement si le résultat a changé
+                if changed:
+                    live.update(self._build_panel(), refresh=True)
 
     def display_recognition_stats(self):
         pass
@@ -58,4 +100,4 @@ class ReverseChordMode(ChordModeBase):
 def reverse_chord_mode(inport, outport, chord_set):
     """Point d'entrée pour le mode reconnaissance d'accords"""
     mode = ReverseChordMode(inport, outport, chord_set)
-    mode.run()
+    mode.start()
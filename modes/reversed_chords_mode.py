@@ -1,13 +1,12 @@
 # modes/reversed_chords_mode.py
-import random
-import time
 from .chord_mode_base import ChordModeBase
-from stats_manager import update_chord_error, update_chord_success
+import clock
 from data.chords import three_note_chords, all_chords
 from music_theory import recognize_chord, are_chord_names_enharmonically_equivalent
 from ui import get_colored_notes_string
 from screen_handler import clear_screen
 from keyboard_handler import wait_for_any_key
+from sampler import WeightedSampler
 
 class ReversedChordsMode(ChordModeBase):
     def __init__(self, inport, outport, chord_set):
@@ -50,8 +49,9 @@ class ReversedChordsMode(ChordModeBase):
         self.display_header("Renversements d'accords", self.mode_name, "magenta")
         self.console.print("Jouez l'accord demandé dans toutes ses formes (renversements).")
         self.console.print("Appuyez sur 'q' pour quitter à tout moment.")
-        time.sleep(2)
+        clock.sleep(2)
 
+        chords = WeightedSampler(self.chord_set)
         last_chord_name = None
 
         while not self.exit_flag:
@@ -59,10 +59,7 @@ class ReversedChordsMode(ChordModeBase):
             self.display_header("Renversements d'accords", self.mode_name, "magenta")
 
             # --- Chord Selection ---
-            chord_name = random.choice(list(self.chord_set.keys()))
-            if len(self.chord_set) > 1:
-                while chord_name == last_chord_name:
-                    chord_name = random.choice(list(self.chord_set.keys()))
+            chord_name = chords.sample(exclude=(last_chord_name,))
             last_chord_name = chord_name
 
             target_notes = self.chord_set[chord_name]
@@ -75,7 +72,7 @@ class ReversedChordsMode(ChordModeBase):
                 inversions_to_play = ["position fondamentale", "1er renversement", "2ème renversement", "3ème renversement"]
             else:
                 self.console.print(f"L'accord [bold yellow]{chord_name}[/bold yellow] a {num_notes} notes et ne sera pas utilisé dans ce mode. Passage au suivant.")
-                time.sleep(2)
+                clock.sleep(2)
                 continue
 
             self.console.print(f"\nProchain accord : [bold yellow]{chord_name}[/bold yellow] ({num_notes} notes)")
@@ -88,7 +85,7 @@ class ReversedChordsMode(ChordModeBase):
                 inversion_attempts = 0
                 while not self.exit_flag:
                     # Get user input (MIDI notes)
-                    attempt_notes, status = self.collect_user_input(collection_mode='chord')
+                    attempt_notes, status = self.collect_user_input(collection_mode='chord', expected_size=num_notes)
 
                     if status == 'next':
                         skip_to_next_chord = True
@@ -112,14 +109,14 @@ class ReversedChordsMode(ChordModeBase):
                     self.console.print(f"Notes jouées : [{colored_notes}]")
 
                     if is_correct:
-                        update_chord_success(chord_name)
+                        self.record_attempt('chord', chord_name, True, attempt_notes, target_notes)
                         self.console.print(f"[bold green]Correct ! ({rec_name} - {rec_inv})[/bold green]\n")
                         if inversion_attempts == 1:
                             self.session_correct_count += 1
-                        time.sleep(1.5)
+                        clock.sleep(1.5)
                         break # Move to the next inversion
                     else:
-                        update_chord_error(chord_name)
+                        self.record_attempt('chord', chord_name, False, attempt_notes, target_notes, recognized=rec_name)
                         feedback = f"[bold red]Incorrect.[/bold red]"
                         if rec_name and are_chord_names_enharmonically_equivalent(rec_name, chord_name):
                              feedback += f" Bon accord ([bold yellow]{rec_name}[/bold yellow]), mais mauvais renversement."
@@ -150,4 +147,4 @@ class ReversedChordsMode(ChordModeBase):
 
 def reversed_chords_mode(inport, outport, chord_set):
     mode = ReversedChordsMode(inport, outport, chord_set)
-    mode.run()
+    mode.start()
@@ -1,6 +1,6 @@
 # modes/single_chord_mode.py
-import random
 from .chord_mode_base import ChordModeBase
+from sampler import WeightedSampler
 
 class SingleChordMode(ChordModeBase):
     def __init__(self, inport, outport, chord_set):
@@ -13,13 +13,11 @@ class SingleChordMode(ChordModeBase):
         self.suppress_progression_summary = True
 
     def run(self):
+        chords = WeightedSampler(self.chord_set)
         last_chord_name = None
         while not self.exit_flag:
             # Choisir un nouvel accord différent du précédent si possible
-            chord_name = random.choice(list(self.chord_set.keys()))
-            if len(self.chord_set) > 1:
-                while chord_name == last_chord_name:
-                    chord_name = random.choice(list(self.chord_set.keys()))
+            chord_name = chords.sample(exclude=(last_chord_name,))
             last_chord_name = chord_name
 
             def pre_display():
@@ -44,4 +42,4 @@ class SingleChordMode(ChordModeBase):
 
 def single_chord_mode(inport, outport, chord_set):
     mode = SingleChordMode(inport, outport, chord_set)
-    mode.run()
\ No newline at end of file
+    mode.start()
\ No newline at end of file
@@ -1,14 +1,13 @@
 # modes/single_note_mode.py
-import time
-import random
 from typing import Literal
 
 from .chord_mode_base import ChordModeBase
+import clock
 from midi_handler import play_chord
 from screen_handler import clear_screen
 from music_theory import get_note_name
 from keyboard_handler import wait_for_input
-from stats_manager import get_note_errors, update_note_error, update_note_success
+from scheduler import ReviewScheduler
 
 
 class SingleNoteMode(ChordModeBase):
@@ -18,6 +17,7 @@ class SingleNoteMode(ChordModeBase):
         self.last_note = None
         # Pool de notes C3 (48) à C5 (72)
         self.note_pool = list(range(48, 73))
+        self.scheduler = None
 
     def _handle_repeat(self) -> Literal['repeat', False]:
         if self.current_note is not None:
@@ -26,24 +26,21 @@ class SingleNoteMode(ChordModeBase):
         return 'repeat'
 
     def select_weighted_note(self):
-        note_errors = get_note_errors()
-        weights = [1 + note_errors.get(get_note_name(n), 0) ** 2 for n in self.note_pool]
-
-        new_note = random.choices(self.note_pool, weights=weights, k=1)[0]
-        while new_note == self.last_note:
-            new_note = random.choices(self.note_pool, weights=weights, k=1)[0]
-        return new_note
+        if self.scheduler is None:
+            # Priorité initiale : 1 + carré du nombre d'erreurs de la note
+            note_errors = self.error_weights('note')
+            weights = {n: 1 + note_errors.get(get_note_name(n), 0) ** 2 for n in self.note_pool}
+            self.scheduler = ReviewScheduler(self.note_pool, weights)
+        return self.scheduler.next(avoid=[self.last_note])
 
     def _display_top_note_errors(self):
         """Affiche les 3 notes avec le plus d'erreurs."""
-        note_errors = get_note_errors()
-        if not note_errors:
+        top_errors = self.top_errors('note', 3)
+        if not top_errors:
             return
 
-        sorted_errors = sorted(note_errors.items(), key=lambda item: item[1], reverse=True)
-
         self.console.print("\n[bold]Notes à travailler :[/bold]")
-        for note, count in sorted_errors[:3]:
+        for note, count in top_errors:
             self.console.print(f"- [bold cyan]{note}[/bold cyan]: {count} erreur{'s' if count > 1 else ''}")
 
     def run(self):
@@ -82,17 +79,20 @@ class SingleNoteMode(ChordModeBase):
                 self.session_total_attempts += 1
                 is_correct = (attempt_note % 12 == self.current_note % 12)
 
+                if first_attempt:
+                    self.scheduler.record(self.current_note, is_correct)
+
                 if is_correct:
                     if first_attempt:
                         self.session_correct_count += 1
-                    update_note_success(correct_note_name)
+                    self.record_attempt('note', correct_note_name, True, [attempt_note], [self.current_note])
                     self.console.print(f"[bold green]Correct ! C'était bien un {correct_note_name}.[/bold green]")
-                    time.sleep(1.5)
+                    clock.sleep(1.5)
                     break
                 else:
                     first_attempt = False
-                    update_note_error(correct_note_name)
                     played_note_name = get_note_name(attempt_note)
+                    self.record_attempt('note', correct_note_name, False, [attempt_note], [self.current_note], recognized=played_note_name)
                     self.console.print(f"[bold red]Incorrect.[/bold red] Vous avez joué un {played_note_name}.")
 
             self.session_total_count += 1
@@ -109,4 +109,4 @@ class SingleNoteMode(ChordModeBase):
 
 def single_note_mode(inport, outport):
     mode = SingleNoteMode(inport, outport)
-    mode.run()
+    mode.start()
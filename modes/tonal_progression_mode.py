@@ -1,7 +1,6 @@
 # modes/tonal_progression_mode.py
-import random
 from .chord_mode_base import ChordModeBase
-from stats_manager import get_chord_errors
+from scheduler import ReviewScheduler
 from data.chords import gammes_majeures, tonal_progressions, DEGREE_MAP
 
 class TonalProgressionMode(ChordModeBase):
@@ -48,29 +47,22 @@ class TonalProgressionMode(ChordModeBase):
             self.console.print("[bold red]Aucune progression tonale valide trouvée pour le set d'accords.[/bold red]")
             return
 
-        last_prog_info = None
-        while not self.exit_flag:
-            chord_errors = get_chord_errors()
-
-            for prog in valid_progressions:
-                prog['weight'] = 1 + sum(chord_errors.get(chord, 0) ** 2 for chord in prog['progression'])
-
-            prog_weights = [p['weight'] for p in valid_progressions]
+        chord_errors = self.error_weights('chord')
+        # Priorité initiale : 1 + somme des carrés des erreurs des accords de la progression
+        weights = {i: 1 + sum(chord_errors.get(chord, 0) ** 2 for chord in p['progression']) for i, p in enumerate(valid_progressions)}
+        scheduler = ReviewScheduler(range(len(valid_progressions)), weights)
 
+        last_prog_index = None
+        while not self.exit_flag:
             # --- DEBUG DISPLAY ---
-            debug_info = "\n[bold dim]-- Debug: Top 5 Weighted Tonal Progressions --[/bold dim]\n"
-            weighted_progs = sorted(valid_progressions, key=lambda x: x['weight'], reverse=True)
-            for p in weighted_progs[:5]:
-                if p['weight'] > 1:
-                    debug_info += f"[dim] - {p['tonalite']} {p['prog_name']}: {p['weight']}[/dim]\n"
+            debug_info = "\n[bold dim]-- Debug: Prochaines progressions tonales à réviser --[/bold dim]\n"
+            for i in scheduler.priorities(5):
+                debug_info += f"[dim] - {valid_progressions[i]['tonalite']} {valid_progressions[i]['prog_name']}[/dim]\n"
             # --- END DEBUG ---
 
-            selected_prog = random.choices(valid_progressions, weights=prog_weights, k=1)[0]
-
-            while (selected_prog['tonalite'], selected_prog['prog_name']) == last_prog_info:
-                selected_prog = random.choices(valid_progressions, weights=prog_weights, k=1)[0]
-
-            last_prog_info = (selected_prog['tonalite'], selected_prog['prog_name'])
+            prog_index = scheduler.next(avoid=[last_prog_index])
+            last_prog_index = prog_index
+            selected_prog = valid_progressions[prog_index]
 
             self.current_tonalite = selected_prog['tonalite']
             self.current_progression_name = selected_prog['prog_name']
@@ -87,6 +79,10 @@ class TonalProgressionMode(ChordModeBase):
                 key_name=self.current_tonalite
             )
 
+            outcome = self.progression_result(self.current_progression_accords)
+            if outcome is not None:
+                scheduler.record(prog_index, outcome)
+
             if result == 'exit':
                 break
 
@@ -95,4 +91,4 @@ class TonalProgressionMode(ChordModeBase):
 
 def tonal_progression_mode(inport, outport, use_timer, timer_duration, progression_selection_mode, play_progression_before_start, chord_set):
     mode = TonalProgressionMode(inport, outport, use_timer, timer_duration, progression_selection_mode, play_progression_before_start, chord_set)
-    mode.run()
\ No newline at end of file
+    mode.start()
\ No newline at end of file
@@ -158,3 +158,98 @@ def generate_scale(root_note: int, scale_type: str) -> list[int] | None:
         scale.append(current_note)
 
     return scale
+
+
+# --- Reconnaissance par masque de classes de hauteur ---
+# Un ensemble de classes de hauteur est codé sur 12 bits (bit i = classe de hauteur i),
+# ce qui permet une reconnaissance en O(1) par simple consultation de table.
+
+INVERSION_LABELS = ["position fondamentale", "1er renversement", "2ème renversement", "3ème renversement", "4ème renversement"]
+
+_chord_by_mask_and_bass = None
+_chord_masks = None
+
+
+def pitch_class_mask(notes):
+    """Retourne le masque 12 bits des classes de hauteur d'un ensemble de notes MIDI."""
+    mask = 0
+    for note in notes:
+        mask |= 1 << (note % 12)
+    return mask
+
+
+def _inversion_label(inversion_index):
+    if 0 <= inversion_index < len(INVERSION_LABELS):
+        return INVERSION_LABELS[inversion_index]
+    return f"{inversion_index + 1}ème renversement"
+
+
+def _build_chord_mask_tables():
+    """
+    Construit une fois pour toutes les tables (masque, basse) -> (accord, renversement)
+    et masque -> accord, avec les mêmes règles de priorité que recognize_chord.
+    """
+    global _chord_by_mask_and_bass, _chord_masks
+    from data.chords import all_chords
+
+    by_mask_and_bass = {}
+    best_inversion = {}
+    masks = {}
+    for chord_name, ref_notes in all_chords.items():
+        mask = pitch_class_mask(ref_notes)
+        masks.setdefault(mask, chord_name)
+
+        root_pc = min(ref_notes) % 12
+        sorted_pcs = sorted({n % 12 for n in ref_notes})
+        root_index = sorted_pcs.index(root_pc)
+        ordered_pcs = sorted_pcs[root_index:] + sorted_pcs[:root_index]
+        for inversion_index, bass_pc in enumerate(ordered_pcs):
+            key = (mask, bass_pc)
+            # Garder l'accord avec le renversement le plus bas (premier rencontré en cas d'égalité)
+            if key not in best_inversion or inversion_index < best_inversion[key]:
+                best_inversion[key] = inversion_index
+                by_mask_and_bass[key] = (chord_name, _inversion_label(inversion_index))
+
+    _chord_by_mask_and_bass = by_mask_and_bass
+    _chord_masks = masks
+
+
+def recognize_chord_from_mask(mask, bass_pc):
+    """
+    Équivalent de recognize_chord à partir d'un masque de classes de hauteur et de la
+    classe de hauteur de la basse. Retourne (nom, renversement) ou (None, None).
+    """
+    if _chord_by_mask_and_bass is None:
+        _build_chord_mask_tables()
+    return _chord_by_mask_and_bass.get((mask, bass_pc), (None, None))
+
+
+def get_chord_masks():
+    """Retourne le dictionnaire masque -> nom d'accord (premier nom rencontré)."""
+    if _chord_masks is None:
+        _build_chord_mask_tables()
+    return _chord_masks
+
+
+_completions_cache = {}
+
+
+def get_chord_completions(mask, max_results=5):
+    """
+    Retourne les accords qui contiennent toutes les classes de hauteur du masque,
+    du plus petit au plus grand (notes manquantes les moins nombreuses d'abord).
+    Résultat mis en cache par masque (au plus 4096 masques possibles).
+    """
+    key = (mask, max_results)
+    cached = _completions_cache.get(key)
+    if cached is not None:
+        return cached
+    candidates = [
+        (bin(chord_mask).count("1"), chord_name)
+        for chord_mask, chord_name in get_chord_masks().items()
+        if chord_mask != mask and chord_mask & mask == mask
+    ]
+    candidates.sort(key=lambda item: item[0])
+    result = tuple(name for _, name in candidates[:max_results])
+    _completions_cache[key] = result
+    return result
@@ -0,0 +1,118 @@
+# profiles.py
+import os
+import re
+from typing import List, Optional
+
+from rich.console import Console
+from rich.prompt import Prompt
+from rich.table import Table
+
+import attempt_store
+import stats_manager
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+# Un dossier par profil : data/profiles/<nom>/stats.json et attempts.sqlite3
+PROFILES_DIR = os.path.join(DATA_DIR, "profiles")
+DEFAULT_PROFILE = "default"
+STATS_FILE_NAME = "stats.json"
+ATTEMPTS_FILE_NAME = "attempts.sqlite3"
+
+_PROFILE_NAME_RE = re.compile(r"^[\w][\w \-]{0,39}$")
+
+console = Console()
+
+_active_profile: Optional[str] = None
+
+
+def is_valid_profile_name(name: str) -> bool:
+    """Nom utilisable comme nom de dossier (lettres, chiffres, espaces, '-' et '_', 40 caractères max)."""
+    return bool(_PROFILE_NAME_RE.match(name or "")) and name == name.strip()
+
+
+def list_profiles() -> List[str]:
+    """Profils existants. Seul le dossier des profils est listé : aucun fichier de stats n'est lu."""
+    try:
+        with os.scandir(PROFILES_DIR) as entries:
+            return sorted(entry.name for entry in entries if entry.is_dir() and not entry.name.startswith("."))
+    except FileNotFoundError:
+        return []
+
+
+def profile_dir(name: str) -> str:
+    return os.path.join(PROFILES_DIR, name)
+
+
+def get_active_profile() -> Optional[str]:
+    return _active_profile
+
+
+def _migrate_legacy_files(directory: str) -> None:
+    """Les stats d'avant les profils (data/stats.json, data/attempts.sqlite3) deviennent celles du profil par défaut."""
+    moves = [(STATS_FILE_NAME, "")] + [(ATTEMPTS_FILE_NAME, suffix) for suffix in ("", "-wal", "-shm")]
+    for file_name, suffix in moves:
+        legacy = os.path.join(DATA_DIR, file_name + suffix)
+        target = os.path.join(directory, file_name + suffix)
+        if os.path.exists(legacy) and not os.path.exists(target):
+            os.replace(legacy, target)
+
+
+def activate_profile(name: str) -> str:
+    """
+    Rend un profil actif (créé s'il n'existe pas) et retourne son dossier.
+
+    Les stats et l'historique des tentatives sont redirigés vers le dossier du profil ;
+    ils ne sont lus qu'au premier accès, et seulement pour ce profil.
+    """
+    global _active_profile
+    if not is_valid_profile_name(name):
+        raise ValueError(f"Nom de profil invalide : {name!r}")
+    directory = profile_dir(name)
+    os.makedirs(directory, exist_ok=True)
+    if name == DEFAULT_PROFILE:
+        _migrate_legacy_files(directory)
+    stats_manager.set_stats_path(os.path.join(directory, STATS_FILE_NAME))
+    attempt_store.set_attempts_path(os.path.join(directory, ATTEMPTS_FILE_NAME))
+    _active_profile = name
+    return directory
+
+
+def select_profile() -> Optional[str]:
+    """
+    Permet de choisir (ou de créer) le profil de l'utilisateur au démarrage.
+    Retourne le nom du profil activé, ou None en cas d'annulation.
+    """
+    profiles = list_profiles()
+    if not profiles:
+        profiles = [DEFAULT_PROFILE]
+
+    table = Table(title="Profils")
+    table.add_column("Numéro", style="cyan")
+    table.add_column("Nom", style="magenta")
+    for i, name in enumerate(profiles, start=1):
+        table.add_row(str(i), name)
+    console.print(table)
+
+    while True:
+        choice = Prompt.ask(
+            f"Choisissez un profil (1-{len(profiles)}), 'n' pour en créer un ou 'q' pour quitter",
+            default="1", console=console,
+        ).strip()
+        if choice.lower() == 'q':
+            return None
+        if choice.lower() == 'n':
+            name = Prompt.ask("Nom du nouveau profil", console=console).strip()
+            if not is_valid_profile_name(name):
+                console.print("[bold red]Nom invalide (lettres, chiffres, espaces, '-' et '_', 40 caractères max).[/bold red]")
+                continue
+        else:
+            try:
+                choice_index = int(choice) - 1
+            except ValueError:
+                console.print("[bold red]Sélection invalide. Veuillez entrer un numéro.[/bold red]")
+                continue
+            if not 0 <= choice_index < len(profiles):
+                console.print("[bold red]Sélection invalide. Veuillez entrer un numéro valide.[/bold red]")
+                continue
+            name = profiles[choice_index]
+        activate_profile(name)
+        return name
@@ -0,0 +1,179 @@
+# progression_engine.py
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from chord_segmenter import ChordSegmenter
+
+# Pause après le retour visuel d'une tentative ou la fin du temps (secondes)
+FEEDBACK_PAUSE = 2.0
+
+# Résultat de check_chord : (correct, accord reconnu, renversement reconnu)
+ChordCheck = Callable[[Set[int], str, Set[int]], Tuple[bool, Optional[str], Optional[str]]]
+
+
+class ProgressionEngine:
+    """
+    Machine à états d'une progression d'accords, sans terminal ni MIDI.
+
+    Le moteur reçoit des événements et retourne la liste des actions à exécuter :
+    - start(now) : début de la progression ;
+    - note(msg, timestamp) : message MIDI horodaté (note_on / note_off) ;
+    - command(name, now) : 'repeat', 'next' ou 'quit' (touches déjà interprétées) ;
+    - tick(now) : passage du temps (minuteur, détection des accords au relâchement) ;
+    - resume(paused) : reprise après une pause de `paused` secondes (déconnexion).
+
+    Les actions sont des tuples dont le premier élément est le type :
+    - ('prompt', index, accord, info) : nouvel accord demandé ;
+    - ('render', index, accord, info) : réaffichage de l'accord demandé (minuteur, après une erreur) ;
+    - ('attempt', accord, correct, notes jouées, notes attendues, accord reconnu, (première note, accord complet)) ;
+    - ('feedback', correct, accord, notes jouées, notes attendues, accord reconnu, renversement) ;
+    - ('pause', secondes) : le retour visuel reste affiché ;
+    - ('play',) : rejouer la progression ;
+    - ('timeout',) : temps écoulé.
+    L'état final est dans `status` : 'running', 'done', 'skipped' ou 'exit'.
+
+    Le moteur ne lit jamais l'horloge : les instants sont fournis par l'appelant (voir
+    clock), ce qui permet de le faire tourner sans attente dans les tests et mesures.
+    """
+
+    def __init__(self, chords: List[str], chord_set: Dict[str, Set[int]], check_chord: ChordCheck,
+                 segmenter: Optional[ChordSegmenter] = None, use_timer: bool = False,
+                 timer_duration: float = 30.0):
+        self.chords = chords
+        self.chord_set = chord_set
+        self.check_chord = check_chord
+        # Pas de délai après relâchement : les touches encore tenues après un accord
+        # soumis à l'attaque restent suivies d'un accord à l'autre
+        self.segmenter = segmenter or ChordSegmenter(release_timeout=0.0)
+        self.use_timer = use_timer
+        self.timer_duration = timer_duration
+
+        self.status = 'running'
+        self.index = 0
+        self.chord_attempts = 0
+        self.correct_count = 0
+        self.total_attempts = 0
+        # Début de la progression : première tentative (None tant qu'elle n'a pas commencé)
+        self.start_time: Optional[float] = None
+        self.time_info = ""
+        # Résultat au premier essai de chaque accord, voicings réussis, dernier accord réussi
+        self.results: Dict[str, bool] = {}
+        self.played_voicings: List[Set[int]] = []
+        self.last_played_notes: Optional[Set[int]] = None
+
+    @property
+    def running(self) -> bool:
+        return self.status == 'running'
+
+    @property
+    def current_chord(self) -> str:
+        return self.chords[self.index]
+
+    # ---------- Événements ----------
+    def start(self, now: float) -> list:
+        if not self.chords:
+            self.status = 'done'
+            return []
+        return self._prompt(now)
+
+    def note(self, msg, timestamp: float) -> list:
+        if not self.running:
+            return []
+        attempt_notes = self.segmenter.feed(msg, timestamp)
+        return self._attempt(attempt_notes, timestamp) if attempt_notes else []
+
+    def tick(self, now: float) -> list:
+        if not self.running:
+            return []
+        actions = self._update_timer(now)
+        if self.running:
+            attempt_notes = self.segmenter.poll(now)
+            if attempt_notes:
+                actions += self._attempt(attempt_notes, now)
+        return actions
+
+    def command(self, name: str, now: float) -> list:
+        if not self.running:
+            return []
+        if name == 'quit':
+            self.status = 'exit'
+            return []
+        if name == 'next':
+            self.status = 'skipped'
+            return []
+        if name == 'repeat':
+            # La progression est rejouée puis reprend au premier accord
+            self.index = 0
+            return [('play',)] + self._prompt(now)
+        return []
+
+    def resume(self, paused: float) -> list:
+        """Reprise après une pause : le minuteur ne tourne pas, la tentative en cours est abandonnée."""
+        if not self.running:
+            return []
+        if self.start_time is not None:
+            self.start_time += paused
+        self.segmenter.reset(expected_size=len(self._target_notes()), forget_held=True)
+        return [self._render('render')]
+
+    # ---------- Transitions ----------
+    def _target_notes(self) -> Set[int]:
+        return self.chord_set[self.current_chord]
+
+    def _render(self, kind: str) -> tuple:
+        return (kind, self.index, self.current_chord, self.time_info)
+
+    def _prompt(self, now: float) -> list:
+        self.chord_attempts = 0
+        self.time_info = self._timer_info(now) if self.start_time is not None else ""
+        self.segmenter.reset(expected_size=len(self._target_notes()))
+        return [self._render('prompt')]
+
+    def _timer_info(self, now: float) -> str:
+        if not self.use_timer:
+            return ""
+        return f"Temps restant : [bold magenta]{self.timer_duration - (now - self.start_time):.1f}s[/bold magenta]"
+
+    def _update_timer(self, now: float) -> list:
+        if not self.use_timer or self.start_time is None:
+            return []
+        remaining_time = self.timer_duration - (now - self.start_time)
+        if remaining_time <= 0:
+            self.status = 'exit'
+            return [('timeout',), ('pause', FEEDBACK_PAUSE)]
+        # Ne redessiner que si l'affichage change (dixième de seconde)
+        time_info = self._timer_info(now)
+        if time_info == self.time_info:
+            return []
+        self.time_info = time_info
+        return [self._render('render')]
+
+    def _attempt(self, attempt_notes: Set[int], now: float) -> list:
+        chord_name = self.current_chord
+        target_notes = self._target_notes()
+        base_chord_name = chord_name.split(" #")[0]
+        self.chord_attempts += 1
+        self.total_attempts += 1
+        if self.start_time is None:
+            self.start_time = now
+
+        is_correct, recognized_name, recognized_inversion = self.check_chord(attempt_notes, chord_name, target_notes)
+        self.results.setdefault(base_chord_name, bool(is_correct))
+        actions = [
+            ('attempt', base_chord_name, bool(is_correct), attempt_notes, target_notes,
+             None if is_correct else recognized_name, self.segmenter.submitted_timing),
+            ('feedback', bool(is_correct), base_chord_name, attempt_notes, target_notes,
+             recognized_name, recognized_inversion),
+            ('pause', FEEDBACK_PAUSE),
+        ]
+        if not is_correct:
+            return actions + [self._render('render')]
+
+        self.played_voicings.append(set(attempt_notes))
+        self.last_played_notes = attempt_notes
+        if self.chord_attempts == 1:
+            self.correct_count += 1
+        self.index += 1
+        if self.index >= len(self.chords):
+            self.status = 'done'
+            return actions
+        return actions + self._prompt(now + FEEDBACK_PAUSE)
@@ -0,0 +1,132 @@
+# sampler.py
+import random
+from typing import Dict, Hashable, Iterable, List, Optional
+
+
+class WeightedSampler:
+    """
+    Tirage pondéré sur un ensemble fixe d'éléments, à l'aide d'un arbre de Fenwick.
+
+    Les poids sont rangés dans un arbre de sommes préfixes : un tirage est une
+    descente dans l'arbre en O(log n), et la modification d'un poids est aussi en
+    O(log n) (pas de reconstruction de la liste des poids à chaque tirage).
+
+    - sample(exclude) : tire un élément en écartant ceux de `exclude` (ex: l'accord
+      précédent) ; leur poids est mis à zéro le temps du tirage.
+    - sample_many(k, exclude) : tire k éléments distincts (tirage sans remise).
+    Si tous les éléments restants sont exclus, l'exclusion est ignorée plutôt que de
+    ne rien retourner.
+    """
+
+    def __init__(self, items: Iterable[Hashable], weights: Optional[Dict[Hashable, float]] = None,
+                 rng: Optional[random.Random] = None):
+        self._rng = rng or random
+        self._items: List[Hashable] = list(items)
+        self._index: Dict[Hashable, int] = {item: i for i, item in enumerate(self._items)}
+        self._weights: List[float] = [
+            max(0.0, float(weights.get(item, 1.0) if weights else 1.0)) for item in self._items
+        ]
+        size = len(self._items)
+        # Construction en O(n) : chaque nœud transmet sa somme à son parent
+        self._tree = [0.0] * (size + 1)
+        for i, weight in enumerate(self._weights, start=1):
+            self._tree[i] += weight
+            parent = i + (i & -i)
+            if parent <= size:
+                self._tree[parent] += self._tree[i]
+        self._top_bit = 1 << (size.bit_length() - 1) if size else 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, item):
+        return item in self._index
+
+    @property
+    def total(self) -> float:
+        return self._prefix_sum(len(self._items))
+
+    def weight(self, item: Hashable) -> float:
+        return self._weights[self._index[item]]
+
+    def set_weight(self, item: Hashable, weight: float) -> None:
+        """Modifie le poids d'un élément en O(log n)."""
+        index = self._index[item]
+        weight = max(0.0, float(weight))
+        delta = weight - self._weights[index]
+        if delta:
+            self._weights[index] = weight
+            self._add(index + 1, delta)
+
+    # ---------- Arbre de Fenwick ----------
+    def _add(self, position: int, delta: float):
+        size = len(self._items)
+        while position <= size:
+            self._tree[position] += delta
+            position += position & -position
+
+    def _prefix_sum(self, position: int) -> float:
+        total = 0.0
+        while position > 0:
+            total += self._tree[position]
+            position -= position & -position
+        return total
+
+    def _find(self, target: float) -> int:
+        """Plus petit indice dont la somme préfixe dépasse `target`."""
+        position = 0
+        step = self._top_bit
+        size = len(self._items)
+        while step:
+            following = position + step
+            if following <= size and self._tree[following] <= target:
+                position = following
+                target -= self._tree[following]
+            step >>= 1
+        return position
+
+    def _draw(self) -> Optional[Hashable]:
+        total = self.total
+        if total <= 0.0:
+            return None
+        index = self._find(self._rng.random() * total)
+        # Arrondis flottants : ne jamais tomber sur un élément de poids nul
+        while index < len(self._items) and self._weights[index] <= 0.0:
+            index += 1
+        if index >= len(self._items):
+            index = max(i for i, weight in enumerate(self._weights) if weight > 0.0)
+        return self._items[index]
+
+    # ---------- Tirages ----------
+    def sample(self, exclude: Iterable[Hashable] = ()) -> Optional[Hashable]:
+        """Tire un élément selon les poids, hors `exclude` si possible (None si tout est à zéro)."""
+        return next(iter(self.sample_many(1, exclude)), None)
+
+    def sample_many(self, count: int, exclude: Iterable[Hashable] = ()) -> List[Hashable]:
+        """Tire jusqu'à `count` éléments distincts (sans remise), hors `exclude` si possible."""
+        suspended = {}
+        for item in exclude:
+            if item in self._index and item not in suspended:
+                suspended[item] = self.weight(item)
+                self.set_weight(item, 0.0)
+
+        chosen: List[Hashable] = []
+        try:
+            for _ in range(count):
+                item = self._draw()
+                if item is None and suspended:
+                    # Ne restent que des éléments exclus : on lève l'exclusion
+                    for held, weight in suspended.items():
+                        if held not in chosen:
+                            self.set_weight(held, weight)
+                    item = self._draw()
+                if item is None:
+                    break
+                chosen.append(item)
+                if item not in suspended:
+                    suspended[item] = self.weight(item)
+                self.set_weight(item, 0.0)
+        finally:
+            for item, weight in suspended.items():
+                self.set_weight(item, weight)
+        return chosen
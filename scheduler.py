@@ -0,0 +1,134 @@
+# scheduler.py
+import heapq
+import itertools
+import random
+from typing import Dict, Hashable, Iterable, List, Optional
+
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+MAX_EASE = 3.0
+# Intervalle (en tirages) après un échec : l'élément revient vite, mais pas immédiatement
+RELEARN_INTERVAL = 3.0
+
+
+class ReviewScheduler:
+    """
+    Planificateur de révision espacée pour le choix des exercices.
+
+    Chaque élément a une échéance (en nombre de tirages), un intervalle et un facteur de
+    facilité. Les échéances sont rangées dans un tas : le prochain élément dû est obtenu
+    en O(log n), et la mise à jour après une tentative est aussi en O(log n).
+
+    - Réussite : l'intervalle est multiplié par la facilité, qui augmente un peu.
+    - Échec : l'élément revient après RELEARN_INTERVAL tirages, et sa facilité diminue.
+    L'intervalle initial vaut la moitié de la taille du pool, et l'intervalle maximal le
+    double : même bien maîtrisé, un élément revient au moins une fois tous les 2n tirages.
+
+    Les priorités initiales (`weights`, ex: 1 + erreurs²) avancent l'échéance des éléments
+    difficiles : un élément de poids w est dû en moyenne w fois plus tôt.
+    Les entrées périmées du tas sont ignorées au dépilement (invalidation paresseuse).
+    """
+
+    def __init__(self, items: Iterable[Hashable], weights: Optional[Dict[Hashable, float]] = None,
+                 rng: Optional[random.Random] = None):
+        self._rng = rng or random
+        self._sequence = itertools.count()
+        self._state: Dict[Hashable, list] = {}  # élément -> [facilité, intervalle, numéro de l'entrée valide]
+        self._heap = []
+        self.step = 0
+
+        items = list(items)
+        spread = float(len(items))
+        initial_interval = max(1.0, spread / 2.0)
+        self._max_interval = max(RELEARN_INTERVAL, 2.0 * spread)
+        for item in items:
+            weight = weights.get(item, 1.0) if weights else 1.0
+            due = self._rng.uniform(0.0, spread) / max(weight, 1e-9)
+            seq = next(self._sequence)
+            self._state[item] = [DEFAULT_EASE, initial_interval, seq]
+            self._heap.append((due, seq, item))
+        heapq.heapify(self._heap)
+
+    def __len__(self):
+        return len(self._state)
+
+    def _push(self, item, due):
+        seq = next(self._sequence)
+        self._state[item][2] = seq
+        heapq.heappush(self._heap, (due, seq, item))
+
+    def _pop_valid(self):
+        while self._heap:
+            due, seq, item = heapq.heappop(self._heap)
+            if self._state[item][2] == seq:
+                return due, seq, item
+        return None
+
+    def next(self, avoid: Iterable[Hashable] = ()) -> Optional[Hashable]:
+        """
+        Retourne l'élément dont l'échéance est la plus proche, hors `avoid` (sauf s'il n'y
+        a rien d'autre). L'élément est reprogrammé provisoirement à son intervalle
+        courant ; record() remplace cette échéance une fois le résultat connu.
+        """
+        avoid = set(avoid)
+        held = []
+        chosen = None
+        while True:
+            entry = self._pop_valid()
+            if entry is None:
+                break
+            if entry[2] in avoid:
+                held.append(entry)
+                continue
+            chosen = entry[2]
+            break
+        if chosen is None and held:
+            # Seuls des éléments à éviter restent : prendre le plus urgent
+            chosen = held.pop(0)[2]
+        for entry in held:
+            heapq.heappush(self._heap, entry)
+        if chosen is None:
+            return None
+
+        self.step += 1
+        self._push(chosen, self.step + self._state[chosen][1])
+        return chosen
+
+    def take(self, count: int, avoid: Iterable[Hashable] = ()) -> List[Hashable]:
+        """Tire `count` éléments distincts (moins si le pool est trop petit)."""
+        taken: List[Hashable] = []
+        avoid = set(avoid)
+        for _ in range(min(count, len(self._state))):
+            item = self.next(avoid=avoid | set(taken))
+            if item is None or item in taken:
+                break
+            taken.append(item)
+        return taken
+
+    def record(self, item: Hashable, correct: bool) -> None:
+        """Met à jour l'élément après une tentative et le reprogramme."""
+        state = self._state.get(item)
+        if state is None:
+            return
+        ease, interval, _ = state
+        if correct:
+            interval = min(self._max_interval, max(1.0, interval * ease))
+            ease = min(MAX_EASE, ease + 0.1)
+        else:
+            interval = min(interval, RELEARN_INTERVAL)
+            ease = max(MIN_EASE, ease - 0.2)
+        state[0], state[1] = ease, interval
+        # Légère variation pour que les éléments de même intervalle ne reviennent pas en bloc
+        self._push(item, self.step + interval * self._rng.uniform(0.8, 1.2))
+
+    def priorities(self, limit: int = 5) -> List[Hashable]:
+        """Éléments dont l'échéance est la plus proche (affichage de débogage), en O(limit log n)."""
+        entries = []
+        while len(entries) < limit:
+            entry = self._pop_valid()
+            if entry is None:
+                break
+            entries.append(entry)
+        for entry in entries:
+            heapq.heappush(self._heap, entry)
+        return [item for _, _, item in entries]
@@ -5,4 +5,22 @@ class Settings:
         self.use_timer = False
         self.timer_duration = 30.0
         self.play_progression_before_start = 'SHOW_AND_PLAY' # 'SHOW_AND_PLAY', 'PLAY_ONLY', 'NONE'
-        self.chord_set_choice = 'basic' # 'basic' ou 'all'
\ No newline at end of file
+        self.chord_set_choice = 'basic' # 'basic' ou 'all'
+        self.chord_segmentation = 'onset' # 'onset' (à l'attaque) ou 'release' (au relâchement)
+        self.onset_window = 0.08 # Fenêtre d'attaque en secondes pour la segmentation 'onset'
+        # Normalisation de l'entrée MIDI (voir midi_input.MidiInputNormalizer)
+        self.midi_channels = None # None = tous les canaux, sinon ensemble de canaux (0-15)
+        self.sustain_pedal = True # Appliquer la pédale de sustain (CC64)
+        self.ghost_min_velocity = 5 # Vélocité minimale d'une note (en dessous : note fantôme)
+        self.ghost_min_duration = 0.0 # Durée minimale d'une note en secondes (0 = désactivé)
+        # Navigation MIDI (voir midi_commands.MidiCommandRouter), active si la sélection de progression est 'midi'
+        self.midi_bindings = {'q': ('note', 21), 'r': ('note', 22), 'n': ('note', 23)} # Commande -> ('note'|'cc', numéro)
+        self.midi_selection_base = ('note', 24) # Touche du choix 1 (les suivantes : choix 2, 3, ...)
+        self.terminal_polling = True # Lire le clavier d'ordinateur (False = navigation uniquement au clavier MIDI)
+        self.record_sessions = False # Enregistrer le jeu dans un fichier .mid par session (voir midi_recorder)
+        # Port de bouclage virtuel (voir virtual_midi) : latence et gigue en secondes
+        self.virtual_midi_latency = 0.0
+        self.virtual_midi_jitter = 0.0
+
+# Paramètres partagés par les modes (modifiés depuis le menu Options)
+app_settings = Settings()
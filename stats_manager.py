@@ -1,55 +1,325 @@
+import atexit
 import json
 import os
+import shutil
+import sys
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, Any, Optional, Tuple
+from typing import Callable, Dict, Any, Iterable, List, Optional, Tuple
+
+from latency_sketch import DDSketch
+
+if sys.platform == 'win32':
+    import msvcrt
+
+    def _lock_file(handle):
+        handle.seek(0)
+        while True:
+            try:
+                msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                # LK_LOCK abandonne au bout de 10 s : un autre processus écrit encore
+                continue
+
+    def _unlock_file(handle):
+        handle.seek(0)
+        msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _lock_file(handle):
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+
+    def _unlock_file(handle):
+        fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
 
 # Détermine un chemin stable vers le fichier de stats dans le dossier data/
 STATS_FILE_PATH = os.path.join(os.path.dirname(__file__), "data", "stats.json")
 
+# Délai maximal entre une mise à jour et son écriture sur disque (secondes)
+FLUSH_INTERVAL = 2.0
+
+# Version du format de stats.json (voir _MIGRATIONS)
+SCHEMA_VERSION = 2
+
 
-def _ensure_stats_dir_exists() -> None:
-    stats_dir = os.path.dirname(STATS_FILE_PATH)
+def _ensure_stats_dir_exists(path: str) -> None:
+    stats_dir = os.path.dirname(path)
     if not os.path.isdir(stats_dir):
         os.makedirs(stats_dir, exist_ok=True)
 
 
-def load_stats() -> Dict[str, Any]:
-    """Charge le fichier de statistiques persistant. Retourne un dict vide si absent/corrompu."""
+def _migrate_v1_to_v2(stats: Dict[str, Any]) -> None:
+    """v1 : records de chaque mode à la racine ('CadenceMode_PLAY_ONLY': {...}) ; v2 : regroupés sous 'modes'."""
+    modes = stats.setdefault("modes", {})
+    record_keys = [key for key, value in stats.items()
+                   if isinstance(value, dict) and any(name.startswith("best_") for name in value)]
+    for key in record_keys:
+        modes[key] = stats.pop(key)
+
+
+# Chaîne de migrations : version de départ -> migration (en place) vers la version suivante
+_MIGRATIONS = {
+    1: _migrate_v1_to_v2,
+}
+
+
+def _quarantine_stats_file(path: str) -> None:
+    """Met de côté un fichier illisible (stats.json.corrupt-<date>) au lieu de l'écraser."""
     try:
-        if not os.path.isfile(STATS_FILE_PATH):
-            return {}
-        with open(STATS_FILE_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        # En cas de problème de lecture/JSON, repartir d'un dictionnaire vide
-        return {}
+        os.replace(path, f"{path}.corrupt-{datetime.now().strftime('%Y%m%d-%H%M%S')}")
+    except OSError:
+        # Déjà mis de côté par un autre processus
+        pass
 
 
-def save_stats(stats: Dict[str, Any]) -> None:
-    """Écrit le dictionnaire de stats complet sur disque, de manière robuste."""
+def _read_stats_file(path: str) -> Dict[str, Any]:
+    """
+    Lit le fichier de stats et le met à la version SCHEMA_VERSION.
+    Un fichier illisible est mis en quarantaine ; avant une migration, l'original est
+    sauvegardé (stats.json.v<version>.bak).
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            stats = json.load(f)
+    except FileNotFoundError:
+        return {"schema_version": SCHEMA_VERSION}
+    except ValueError:
+        # JSON invalide (écriture interrompue, modification manuelle...)
+        _quarantine_stats_file(path)
+        return {"schema_version": SCHEMA_VERSION}
+    except OSError:
+        # Fichier momentanément inaccessible : repartir d'un dictionnaire vide
+        return {"schema_version": SCHEMA_VERSION}
+    if not isinstance(stats, dict):
+        _quarantine_stats_file(path)
+        return {"schema_version": SCHEMA_VERSION}
+
+    # Fichiers antérieurs à la numérotation : version 1
+    version = stats.get("schema_version", 1)
+    if type(version) is not int or not 1 <= version <= SCHEMA_VERSION:
+        # Version invalide, ou d'une version plus récente de l'application : ne pas l'écraser
+        _quarantine_stats_file(path)
+        return {"schema_version": SCHEMA_VERSION}
+    if version < SCHEMA_VERSION:
+        backup_path = f"{path}.v{version}.bak"
+        if not os.path.exists(backup_path):
+            try:
+                shutil.copy2(path, backup_path)
+            except OSError:
+                pass
+        try:
+            while version < SCHEMA_VERSION:
+                _MIGRATIONS[version](stats)
+                version += 1
+        except Exception:
+            # Contenu inattendu pour cette version : fichier mis de côté (l'original reste dans la sauvegarde)
+            _quarantine_stats_file(path)
+            return {"schema_version": SCHEMA_VERSION}
+        stats["schema_version"] = version
+    return stats
+
+
+def _write_stats_file(path: str, payload: str) -> bool:
     try:
-        _ensure_stats_dir_exists()
-        tmp_path = STATS_FILE_PATH + ".tmp"
+        _ensure_stats_dir_exists(path)
+        tmp_path = path + ".tmp"
         with open(tmp_path, "w", encoding="utf-8") as f:
-            json.dump(stats, f, ensure_ascii=False, indent=2)
-        os.replace(tmp_path, STATS_FILE_PATH)
+            f.write(payload)
+        os.replace(tmp_path, path)
+        return True
     except Exception:
         # Éviter tout crash si l'écriture échoue
-        pass
+        return False
 
 
-def update_mode_record(mode_key: str, accuracy_percent: float, attempts: int) -> Tuple[bool, Optional[float], float]:
-    """
-    Met à jour le record de précision pour un mode donné.
+def _stats_file_signature(path: str) -> Optional[Tuple[int, int, int]]:
+    """Identifie la version du fichier sur disque (chaque écriture le remplace par un nouveau fichier)."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
 
-    - mode_key: nom du mode (ex: 'CadenceMode')
-    - accuracy_percent: précision en pourcentage (0.0 à 100.0)
-    - attempts: nombre total de tentatives de la session (utilisé comme bris d'égalité)
 
-    Retourne (is_new_record, previous_best_percent_or_None, new_best_percent)
+@contextmanager
+def _stats_file_lock(path: str):
+    """Verrou consultatif entre processus (fichier stats.json.lock), pris le temps d'une écriture."""
+    try:
+        _ensure_stats_dir_exists(path)
+        handle = open(path + ".lock", "a+b")
+    except OSError:
+        # Dossier non accessible en écriture : l'écriture échouera de toute façon
+        handle = None
+    try:
+        if handle is not None:
+            _lock_file(handle)
+        yield
+    finally:
+        if handle is not None:
+            try:
+                _unlock_file(handle)
+            finally:
+                handle.close()
+
+
+class _StatsStore:
     """
-    stats = load_stats()
-    mode_stats = stats.get(mode_key, {})
+    Statistiques du processus, chargées une seule fois et servies depuis la mémoire.
+
+    Les mises à jour passent par apply(opération, *arguments) : l'opération modifie le
+    dictionnaire en mémoire et est ajoutée au journal des modifications non écrites.
+    Un thread d'écriture en arrière-plan regroupe les modifications et écrit le fichier
+    au plus tard `flush_interval` secondes après la première d'entre elles. Le magasin
+    est écrit une dernière fois à la sortie du programme (atexit).
+
+    Plusieurs instances de l'application peuvent partager le fichier : l'écriture se fait
+    sous un verrou consultatif entre processus et, si un autre processus a réécrit le
+    fichier depuis notre dernière lecture, le fichier est relu et les opérations du
+    journal y sont rejouées au lieu d'écraser ses modifications. Le verrou n'est pris
+    que par le thread d'écriture, jamais lors des mises à jour par tentative.
+    """
+
+    def __init__(self, path: str, flush_interval: float = FLUSH_INTERVAL):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._lock = threading.RLock()
+        self._data: Optional[Dict[str, Any]] = None
+        self._version = 0          # incrémentée à chaque modification
+        self._saved_version = 0    # dernière version écrite sur disque
+        self._journal: List[Tuple[Callable, tuple]] = []  # opérations pas encore écrites
+        self._overwrite = False    # save_stats : le contenu remplace celui du fichier
+        self._disk_signature = None
+        self._write_lock = threading.Lock()
+        self._dirty = threading.Event()
+        self._writer = None
+
+    def _loaded(self) -> Dict[str, Any]:
+        if self._data is None:
+            # Signature relevée avant la lecture : une écriture concurrente sera vue au flush
+            self._disk_signature = _stats_file_signature(self.path)
+            self._data = _read_stats_file(self.path)
+        return self._data
+
+    @contextmanager
+    def read(self):
+        """Accès en lecture (ne pas conserver de référence hors du bloc)."""
+        with self._lock:
+            yield self._loaded()
+
+    def apply(self, operation: Callable, *args):
+        """
+        Applique operation(stats, *args) en mémoire, la journalise et retourne son résultat.
+        L'opération doit pouvoir être rejouée telle quelle sur une autre version des stats.
+        """
+        with self._lock:
+            result = operation(self._loaded(), *args)
+            self._journal.append((operation, args))
+            self._version += 1
+        self._schedule()
+        return result
+
+    def replace(self, stats: Dict[str, Any]) -> None:
+        with self._lock:
+            self._data = stats
+            self._journal = []
+            self._overwrite = True
+            self._version += 1
+        self._schedule()
+
+    def _schedule(self):
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._run_writer, name="stats-writer", daemon=True)
+            self._writer.start()
+        self._dirty.set()
+
+    def _run_writer(self):
+        while True:
+            self._dirty.wait()
+            # Regroupe toutes les modifications arrivées pendant l'intervalle en une écriture
+            time.sleep(self.flush_interval)
+            self._dirty.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        """Écrit immédiatement les modifications en attente."""
+        with self._write_lock:
+            with self._lock:
+                if self._version == self._saved_version or self._data is None:
+                    return
+            with _stats_file_lock(self.path):
+                with self._lock:
+                    journal, self._journal = self._journal, []
+                    overwrite, self._overwrite = self._overwrite, False
+                    version = self._version
+                    in_sync = overwrite or _stats_file_signature(self.path) == self._disk_signature
+                    if in_sync:
+                        payload = json.dumps(self._data, ensure_ascii=False, indent=2)
+
+                if not in_sync:
+                    # Fichier réécrit par un autre processus : rejouer nos opérations sur sa version
+                    merged = _read_stats_file(self.path)
+                    for operation, args in journal:
+                        operation(merged, *args)
+                    payload = json.dumps(merged, ensure_ascii=False, indent=2)
+                    with self._lock:
+                        if not self._overwrite:
+                            # Opérations arrivées pendant la fusion : appliquées, et gardées au journal
+                            for operation, args in self._journal:
+                                operation(merged, *args)
+                            self._data = merged
+
+                if _write_stats_file(self.path, payload):
+                    self._disk_signature = _stats_file_signature(self.path)
+                    self._saved_version = version
+                else:
+                    with self._lock:
+                        self._journal[:0] = journal
+                        self._overwrite = self._overwrite or overwrite
+
+
+_store = _StatsStore(STATS_FILE_PATH)
+
+
+def set_stats_path(path: str) -> None:
+    """
+    Change le fichier de stats (profil actif) : les modifications en attente sont écrites
+    dans l'ancien fichier, le nouveau n'est lu qu'au premier accès.
+    """
+    global _store, STATS_FILE_PATH
+    if os.path.abspath(path) == os.path.abspath(_store.path):
+        return
+    _store.flush()
+    STATS_FILE_PATH = path
+    _store = _StatsStore(path)
+
+
+def load_stats() -> Dict[str, Any]:
+    """Retourne une copie des statistiques (chargées depuis le disque au premier accès)."""
+    with _store.read() as stats:
+        return json.loads(json.dumps(stats))
+
+
+def save_stats(stats: Dict[str, Any]) -> None:
+    """Remplace toutes les statistiques (au format SCHEMA_VERSION) ; l'écriture sur disque est différée."""
+    stats.setdefault("schema_version", SCHEMA_VERSION)
+    _store.replace(stats)
+
+
+def flush_stats() -> None:
+    """Force l'écriture des statistiques en attente."""
+    _store.flush()
+
+
+atexit.register(flush_stats)
+
+
+def _apply_mode_record(stats: Dict[str, Any], mode_key: str, accuracy_percent: float, attempts: int):
+    modes = stats.setdefault("modes", {})
+    mode_stats = modes.get(mode_key, {})
 
     prev_best = mode_stats.get("best_accuracy_percent")
     prev_best_attempts = mode_stats.get("best_accuracy_attempts", 0)
@@ -69,27 +339,28 @@ def update_mode_record(mode_key: str, accuracy_percent: float, attempts: int) ->
             "best_accuracy_attempts": int(attempts),
             "best_accuracy_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
         })
-        stats[mode_key] = mode_stats
-        save_stats(stats)
+        modes[mode_key] = mode_stats
         return True, prev_best, float(accuracy_percent)
 
     return False, prev_best, float(prev_best) if prev_best is not None else float(accuracy_percent)
 
 
-def update_stopwatch_record(mode_key: str, elapsed_seconds: float, attempts: int):
+def update_mode_record(mode_key: str, accuracy_percent: float, attempts: int) -> Tuple[bool, Optional[float], float]:
     """
-    Met à jour le record de temps écoulé (chronomètre) pour un mode donné.
-    Amélioration = temps plus court, en comparant aussi le nombre de tentatives.
+    Met à jour le record de précision pour un mode donné.
 
-    Critères d'amélioration:
-    - Si aucun record → améliorer
-    - Si attempts > prev_attempts et elapsed_seconds <= prev_time → améliorer
-    - Si attempts == prev_attempts et elapsed_seconds < prev_time → améliorer
+    - mode_key: nom du mode (ex: 'CadenceMode')
+    - accuracy_percent: précision en pourcentage (0.0 à 100.0)
+    - attempts: nombre total de tentatives de la session (utilisé comme bris d'égalité)
 
-    Retourne (is_new_record, previous_best_seconds_or_None, new_best_seconds)
+    Retourne (is_new_record, previous_best_percent_or_None, new_best_percent)
     """
-    stats = load_stats()
-    mode_stats = stats.get(mode_key, {})
+    return _store.apply(_apply_mode_record, mode_key, accuracy_percent, attempts)
+
+
+def _apply_stopwatch_record(stats: Dict[str, Any], mode_key: str, elapsed_seconds: float, attempts: int):
+    modes = stats.setdefault("modes", {})
+    mode_stats = modes.get(mode_key, {})
 
     prev_best = mode_stats.get("best_stopwatch_time_seconds")
     prev_best_attempts = mode_stats.get("best_stopwatch_attempts", 0)
@@ -111,20 +382,30 @@ def update_stopwatch_record(mode_key: str, elapsed_seconds: float, attempts: int
             "best_stopwatch_attempts": int(attempts),
             "best_stopwatch_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
         })
-        stats[mode_key] = mode_stats
-        save_stats(stats)
+        modes[mode_key] = mode_stats
         return True, prev_best, float(elapsed_seconds)
 
     return False, prev_best, float(prev_best) if prev_best is not None else float(elapsed_seconds)
 
 
-def update_timer_remaining_record(mode_key: str, remaining_seconds: float, attempts: int):
+def update_stopwatch_record(mode_key: str, elapsed_seconds: float, attempts: int):
     """
-    Met à jour le record de temps restant (minuteur) pour un mode donné.
-    Amélioration = plus de temps restant. Si temps égal, plus de tentatives est mieux.
+    Met à jour le record de temps écoulé (chronomètre) pour un mode donné.
+    Amélioration = temps plus court, en comparant aussi le nombre de tentatives.
+
+    Critères d'amélioration:
+    - Si aucun record → améliorer
+    - Si attempts > prev_attempts et elapsed_seconds <= prev_time → améliorer
+    - Si attempts == prev_attempts et elapsed_seconds < prev_time → améliorer
+
+    Retourne (is_new_record, previous_best_seconds_or_None, new_best_seconds)
     """
-    stats = load_stats()
-    mode_stats = stats.get(mode_key, {})
+    return _store.apply(_apply_stopwatch_record, mode_key, elapsed_seconds, attempts)
+
+
+def _apply_timer_remaining_record(stats: Dict[str, Any], mode_key: str, remaining_seconds: float, attempts: int):
+    modes = stats.setdefault("modes", {})
+    mode_stats = modes.get(mode_key, {})
 
     prev_best_time = mode_stats.get("best_timer_remaining_seconds")
     prev_best_attempts = mode_stats.get("best_timer_remaining_attempts", 0)
@@ -146,87 +427,175 @@ def update_timer_remaining_record(mode_key: str, remaining_seconds: float, attem
             "best_timer_remaining_attempts": int(attempts),
             "best_timer_remaining_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
         })
-        stats[mode_key] = mode_stats
-        save_stats(stats)
+        modes[mode_key] = mode_stats
         return True, prev_best_time, float(remaining_seconds)
 
     return False, prev_best_time, float(prev_best_time) if prev_best_time is not None else float(remaining_seconds)
 
 
+def update_timer_remaining_record(mode_key: str, remaining_seconds: float, attempts: int):
+    """
+    Met à jour le record de temps restant (minuteur) pour un mode donné.
+    Amélioration = plus de temps restant. Si temps égal, plus de tentatives est mieux.
+    """
+    return _store.apply(_apply_timer_remaining_record, mode_key, remaining_seconds, attempts)
+
+
+def _increment_error(stats: Dict[str, Any], section: str, name: str) -> None:
+    stats.setdefault(section, {})
+    stats[section][name] = stats[section].get(name, 0) + 1
+
+
+def _decrement_error(stats: Dict[str, Any], section: str, name: str) -> None:
+    if section in stats and name in stats[section]:
+        stats[section][name] = max(0, stats[section][name] - 1)
+        # Supprimer la clé si le score d'erreur est à 0
+        if stats[section][name] == 0:
+            del stats[section][name]
+
+
+def _apply_synced_stats(stats: Dict[str, Any], sections: Dict[str, Any], records: Dict[str, Dict[str, Any]]) -> None:
+    for name, value in sections.items():
+        if value:
+            stats[name] = value
+        else:
+            stats.pop(name, None)
+    modes = stats.setdefault("modes", {})
+    for mode_key, fields in records.items():
+        modes.setdefault(mode_key, {}).update(fields)
+
+
+def apply_synced_stats(sections: Dict[str, Any], records: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Installe l'état fusionné d'une synchronisation (voir stats_sync) : les sections
+    (compteurs d'erreurs, confusions, esquisses) sont remplacées, les records complétés.
+    """
+    _store.apply(_apply_synced_stats, sections, records)
+
+
 def get_chord_errors() -> Dict[str, int]:
     """Charge les statistiques d'erreurs par accord."""
-    stats = load_stats()
-    return stats.get("chord_errors", {})
+    with _store.read() as stats:
+        return dict(stats.get("chord_errors", {}))
 
 
 def update_chord_error(chord_name: str) -> None:
     """Met à jour le compteur d'erreurs pour un accord spécifique."""
-    stats = load_stats()
-    if "chord_errors" not in stats:
-        stats["chord_errors"] = {}
-
-    stats["chord_errors"][chord_name] = stats["chord_errors"].get(chord_name, 0) + 1
-    save_stats(stats)
+    _store.apply(_increment_error, "chord_errors", chord_name)
 
 
 def update_chord_success(chord_name: str) -> None:
     """Diminue le compteur d'erreurs pour un accord spécifique après une réussite."""
-    stats = load_stats()
-    if "chord_errors" in stats and chord_name in stats["chord_errors"]:
-        stats["chord_errors"][chord_name] = max(0, stats["chord_errors"][chord_name] - 1)
-        # Optionnel : supprimer la clé si le score d'erreur est à 0
-        if stats["chord_errors"][chord_name] == 0:
-            del stats["chord_errors"][chord_name]
-        save_stats(stats)
+    _store.apply(_decrement_error, "chord_errors", chord_name)
 
 
 def get_note_errors() -> Dict[str, int]:
     """Charge les statistiques d'erreurs par note."""
-    stats = load_stats()
-    return stats.get("note_errors", {})
+    with _store.read() as stats:
+        return dict(stats.get("note_errors", {}))
 
 
 def update_note_error(note_name: str) -> None:
     """Met à jour le compteur d'erreurs pour une note spécifique."""
-    stats = load_stats()
-    if "note_errors" not in stats:
-        stats["note_errors"] = {}
-
-    stats["note_errors"][note_name] = stats["note_errors"].get(note_name, 0) + 1
-    save_stats(stats)
+    _store.apply(_increment_error, "note_errors", note_name)
 
 
 def update_note_success(note_name: str) -> None:
     """Diminue le compteur d'erreurs pour une note spécifique après une réussite."""
-    stats = load_stats()
-    if "note_errors" in stats and note_name in stats["note_errors"]:
-        stats["note_errors"][note_name] = max(0, stats["note_errors"][note_name] - 1)
-        if stats["note_errors"][note_name] == 0:
-            del stats["note_errors"][note_name]
-        save_stats(stats)
+    _store.apply(_decrement_error, "note_errors", note_name)
 
 
 def get_scale_errors() -> Dict[str, int]:
     """Charge les statistiques d'erreurs par gamme."""
-    stats = load_stats()
-    return stats.get("scale_errors", {})
+    with _store.read() as stats:
+        return dict(stats.get("scale_errors", {}))
 
 
 def update_scale_error(scale_name: str) -> None:
     """Met à jour le compteur d'erreurs pour une gamme spécifique."""
-    stats = load_stats()
-    if "scale_errors" not in stats:
-        stats["scale_errors"] = {}
-
-    stats["scale_errors"][scale_name] = stats["scale_errors"].get(scale_name, 0) + 1
-    save_stats(stats)
+    _store.apply(_increment_error, "scale_errors", scale_name)
 
 
 def update_scale_success(scale_name: str) -> None:
     """Diminue le compteur d'erreurs pour une gamme spécifique après une réussite."""
-    stats = load_stats()
-    if "scale_errors" in stats and scale_name in stats["scale_errors"]:
-        stats["scale_errors"][scale_name] = max(0, stats["scale_errors"][scale_name] - 1)
-        if stats["scale_errors"][scale_name] == 0:
-            del stats["scale_errors"][scale_name]
-        save_stats(stats)
\ No newline at end of file
+    _store.apply(_decrement_error, "scale_errors", scale_name)
+
+
+def _apply_latency(stats: Dict[str, Any], kind: str, item: str, mode_key: str,
+                   reaction: Optional[float], completion: Optional[float]) -> None:
+    sketches = stats.setdefault("latency_sketches", {})
+    for scope, key in ((kind, item), ("mode", mode_key)):
+        entry = sketches.setdefault(scope, {}).setdefault(key, {})
+        for metric, value in (("reaction", reaction), ("completion", completion)):
+            if value is not None:
+                DDSketch(entry.setdefault(metric, {})).add(max(0.0, value))
+
+
+def record_latency(kind: str, item: str, mode_key: str,
+                   reaction: Optional[float], completion: Optional[float]) -> None:
+    """
+    Ajoute les temps de réponse d'une tentative réussie aux esquisses de quantiles de
+    l'élément et du mode : 'reaction' (consigne -> première note) et 'completion'
+    (consigne -> accord complet). Mise à jour en O(1).
+    """
+    _store.apply(_apply_latency, kind, item, mode_key, reaction, completion)
+
+
+def get_latency_quantiles(scope: str, key: str, metric: str = "completion",
+                          qs: Iterable[float] = (0.5, 0.9, 0.99)) -> Optional[Dict[float, Optional[float]]]:
+    """Quantiles des temps de réponse d'un élément (scope 'chord', 'note'...) ou d'un mode (scope 'mode')."""
+    with _store.read() as stats:
+        state = stats.get("latency_sketches", {}).get(scope, {}).get(key, {}).get(metric)
+        if not state:
+            return None
+        return DDSketch(state).quantiles(qs)
+
+
+def get_slowest_items(scope: str, items: Optional[Iterable[str]] = None, metric: str = "completion",
+                      q: float = 0.9, limit: int = 3) -> List[Tuple[str, float]]:
+    """Éléments les plus lents au quantile q : [(élément, secondes)], parmi `items` si fourni."""
+    with _store.read() as stats:
+        entries = stats.get("latency_sketches", {}).get(scope, {})
+        keys = entries.keys() if items is None else [item for item in items if item in entries]
+        slowest = []
+        for key in keys:
+            state = entries[key].get(metric)
+            if state:
+                value = DDSketch(state).quantile(q)
+                if value is not None:
+                    slowest.append((key, value))
+    slowest.sort(key=lambda entry: entry[1], reverse=True)
+    return slowest[:limit]
+
+
+def _apply_confusion(stats: Dict[str, Any], kind: str, expected: str, recognized: str) -> None:
+    row = stats.setdefault("confusions", {}).setdefault(kind, {}).setdefault(expected, {})
+    row[recognized] = row.get(recognized, 0) + 1
+
+
+def update_confusion(kind: str, expected: str, recognized: str) -> None:
+    """Compte une confusion (élément attendu -> élément joué à la place), en O(1)."""
+    _store.apply(_apply_confusion, kind, expected, recognized)
+
+
+def get_confusions(kind: str, expected: str) -> Dict[str, int]:
+    """Ce qui a été joué à la place de `expected` : {élément joué: nombre}."""
+    with _store.read() as stats:
+        return dict(stats.get("confusions", {}).get(kind, {}).get(expected, {}))
+
+
+def get_top_confusions(kind: str, limit: int = 5,
+                       expected_items: Optional[Iterable[str]] = None) -> List[Tuple[str, str, int]]:
+    """
+    Confusions les plus fréquentes : [(attendu, joué, nombre)], nombre décroissant.
+    `expected_items` restreint la recherche à certains éléments attendus (ex: ceux de la session) ;
+    utile aussi pour construire des exercices de contraste entre accords souvent confondus.
+    """
+    with _store.read() as stats:
+        matrix = stats.get("confusions", {}).get(kind, {})
+        rows = matrix.keys() if expected_items is None else [item for item in expected_items if item in matrix]
+        pairs = [(expected, recognized, count)
+                 for expected in rows
+                 for recognized, count in matrix[expected].items()]
+    pairs.sort(key=lambda pair: pair[2], reverse=True)
+    return pairs[:limit]
@@ -0,0 +1,338 @@
+# stats_sync.py
+import argparse
+import json
+import os
+import sys
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+import stats_manager
+from attempt_store import get_attempt_store
+from latency_sketch import DDSketch
+from profiles import activate_profile
+
+SYNC_FORMAT = 1
+# État de synchronisation de l'appareil, à côté de stats.json
+SYNC_STATE_FILE_NAME = "sync_state.json"
+
+COUNTER_SECTIONS = ("chord_errors", "note_errors", "scale_errors")
+# Familles de records : (préfixe des champs, champ de la valeur, sens : 1 = plus grand est meilleur)
+RECORD_FAMILIES = (
+    ("best_accuracy", "best_accuracy_percent", 1),
+    ("best_stopwatch", "best_stopwatch_time_seconds", -1),
+    ("best_timer_remaining", "best_timer_remaining_seconds", 1),
+)
+
+
+# ---------- État fusionnable ----------
+#
+# Un état de synchronisation est un dictionnaire JSON :
+#   counters   : {section: {élément: {"p": {appareil: n}, "n": {appareil: n}}}}  (compteurs PN)
+#   confusions : {type: {attendu: {joué: {appareil: n}}}}                        (compteurs G)
+#   sketches   : {portée: {clé: {métrique: {appareil: esquisse}}}}               (esquisse propre à chaque appareil)
+#   records    : {mode: {famille: {champs du record}}}                            (fusion par maximum)
+#   events     : [[event_id, ts, mode, kind, item, correct, played, expected, latency], ...]  (union)
+#
+# Chaque appareil n'écrit que ses propres entrées : la fusion prend, entrée par entrée, le
+# maximum (les valeurs d'un appareil ne font que croître). Elle est commutative,
+# associative et idempotente : fusionner deux fois le même historique ne compte rien en
+# double, et le résultat ne dépend pas de l'ordre des fusions.
+
+def empty_state() -> Dict[str, Any]:
+    return {"format": SYNC_FORMAT, "counters": {}, "confusions": {}, "sketches": {}, "records": {}, "events": []}
+
+
+def _max_vector(a: Dict[str, int], b: Dict[str, int]) -> Dict[str, int]:
+    merged = dict(a)
+    for device, value in b.items():
+        if value > merged.get(device, 0):
+            merged[device] = value
+    return merged
+
+
+def _merge_nested(a: Dict[str, Any], b: Dict[str, Any], depth: int, merge_leaf) -> Dict[str, Any]:
+    """Fusionne deux dictionnaires imbriqués sur `depth` niveaux, puis les feuilles avec merge_leaf."""
+    if depth == 0:
+        return merge_leaf(a, b)
+    merged = dict(a)
+    for key, value in b.items():
+        merged[key] = _merge_nested(merged[key], value, depth - 1, merge_leaf) if key in merged else value
+    return merged
+
+
+def _merge_pn(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
+    return {"p": _max_vector(a.get("p", {}), b.get("p", {})), "n": _max_vector(a.get("n", {}), b.get("n", {}))}
+
+
+def _merge_device_sketches(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
+    # L'esquisse d'un appareil ne fait que croître : on garde la plus remplie
+    merged = dict(a)
+    for device, sketch in b.items():
+        current = merged.get(device)
+        if current is None or (sketch["count"], json.dumps(sketch, sort_keys=True)) > \
+                (current["count"], json.dumps(current, sort_keys=True)):
+            merged[device] = sketch
+    return merged
+
+
+def _record_key(record: Dict[str, Any], family: str, value_field: str, sign: int) -> Tuple:
+    # Ordre total compatible avec les règles de stats_manager (valeur, puis tentatives, puis date)
+    return (sign * float(record[value_field]), int(record.get(f"{family}_attempts", 0)), record.get(f"{family}_at", ""))
+
+
+def _merge_records(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
+    merged = dict(a)
+    for family, value_field, sign in RECORD_FAMILIES:
+        if family in b and (family not in merged or
+                            _record_key(b[family], family, value_field, sign) >
+                            _record_key(merged[family], family, value_field, sign)):
+            merged[family] = b[family]
+    return merged
+
+
+def merge_states(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
+    """Fusionne deux états de synchronisation (temps linéaire en la taille des deux états)."""
+    events = {row[0]: row for row in a.get("events", [])}
+    for row in b.get("events", []):
+        events.setdefault(row[0], row)
+    merged = {
+        "format": SYNC_FORMAT,
+        "counters": _merge_nested(a.get("counters", {}), b.get("counters", {}), 2, _merge_pn),
+        "confusions": _merge_nested(a.get("confusions", {}), b.get("confusions", {}), 3, _max_vector),
+        "sketches": _merge_nested(a.get("sketches", {}), b.get("sketches", {}), 3, _merge_device_sketches),
+        "records": _merge_nested(a.get("records", {}), b.get("records", {}), 1, _merge_records),
+        "events": sorted(events.values(), key=lambda row: (row[1], row[0])),
+    }
+    return merged
+
+
+# ---------- Valeurs fusionnées ----------
+def counter_value(entry: Dict[str, Any]) -> int:
+    return max(0, sum(entry.get("p", {}).values()) - sum(entry.get("n", {}).values()))
+
+
+def _merged_sketch(device_sketches: Dict[str, Any]) -> Dict[str, Any]:
+    merged = None
+    for device in sorted(device_sketches):
+        sketch = DDSketch(json.loads(json.dumps(device_sketches[device])))
+        if merged is None:
+            merged = sketch
+        else:
+            merged.merge(sketch)
+    return merged.state if merged is not None else {}
+
+
+def materialize(state: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    """Valeurs des stats correspondant à un état : (sections remplacées, records par mode)."""
+    sections: Dict[str, Any] = {}
+    for section in COUNTER_SECTIONS:
+        values = {item: counter_value(entry) for item, entry in state["counters"].get(section, {}).items()}
+        sections[section] = {item: value for item, value in values.items() if value > 0}
+
+    confusions: Dict[str, Any] = {}
+    for kind, rows in state["confusions"].items():
+        for expected, row in rows.items():
+            for recognized, vector in row.items():
+                total = sum(vector.values())
+                if total:
+                    confusions.setdefault(kind, {}).setdefault(expected, {})[recognized] = total
+    sections["confusions"] = confusions
+
+    sketches: Dict[str, Any] = {}
+    for scope, entries in state["sketches"].items():
+        for key, metrics in entries.items():
+            for metric, device_sketches in metrics.items():
+                sketch = _merged_sketch(device_sketches)
+                if sketch:
+                    sketches.setdefault(scope, {}).setdefault(key, {})[metric] = sketch
+    sections["latency_sketches"] = sketches
+
+    records: Dict[str, Dict[str, Any]] = {}
+    for mode_key, families in state["records"].items():
+        fields: Dict[str, Any] = {}
+        for record in families.values():
+            fields.update(record)
+        records[mode_key] = fields
+    return sections, records
+
+
+# ---------- Contribution de l'appareil local ----------
+def _others(vector: Dict[str, int], device_id: str) -> int:
+    return sum(value for device, value in vector.items() if device != device_id)
+
+
+def _capture_counters(state, stats, device_id):
+    for section in COUNTER_SECTIONS:
+        local = stats.get(section, {})
+        entries = state["counters"].setdefault(section, {})
+        for item in set(local) | set(entries):
+            entry = entries.setdefault(item, {"p": {}, "n": {}})
+            positive, negative = entry.setdefault("p", {}), entry.setdefault("n", {})
+            others = _others(positive, device_id) - _others(negative, device_id)
+            own = positive.get(device_id, 0) - negative.get(device_id, 0)
+            # Écart entre la valeur locale et la somme connue : c'est ce que l'appareil a fait depuis
+            delta = int(local.get(item, 0)) - others - own
+            if delta > 0:
+                positive[device_id] = positive.get(device_id, 0) + delta
+            elif delta < 0:
+                negative[device_id] = negative.get(device_id, 0) - delta
+
+
+def _capture_confusions(state, stats, device_id):
+    for kind, rows in stats.get("confusions", {}).items():
+        for expected, row in rows.items():
+            for recognized, count in row.items():
+                vector = state["confusions"].setdefault(kind, {}).setdefault(expected, {}).setdefault(recognized, {})
+                own = int(count) - _others(vector, device_id)
+                if own > vector.get(device_id, 0):
+                    vector[device_id] = own
+
+
+def _capture_sketches(state, stats, device_id):
+    for scope, entries in stats.get("latency_sketches", {}).items():
+        for key, metrics in entries.items():
+            for metric, local in metrics.items():
+                device_sketches = state["sketches"].setdefault(scope, {}).setdefault(key, {}).setdefault(metric, {})
+                others = [sketch for device, sketch in device_sketches.items() if device != device_id]
+                own = device_sketches.get(device_id) or DDSketch(relative_accuracy=local["alpha"],
+                                                                  max_bins=local["max_bins"]).state
+                # Classes de l'appareil = classes locales moins celles des autres appareils
+                bins = dict(own["bins"])
+                for bin_key, count in local["bins"].items():
+                    remaining = count - sum(sketch["bins"].get(bin_key, 0) for sketch in others)
+                    if remaining > bins.get(bin_key, 0):
+                        bins[bin_key] = remaining
+                zero = max(own["zero"], local["zero"] - sum(sketch["zero"] for sketch in others))
+                own = dict(own, bins=bins, zero=zero, count=zero + sum(bins.values()))
+                if own["count"]:
+                    own["min"] = local["min"] if own["min"] is None else min(own["min"], local["min"])
+                    own["max"] = local["max"] if own["max"] is None else max(own["max"], local["max"])
+                    device_sketches[device_id] = own
+
+
+def _capture_records(state, stats):
+    for mode_key, fields in stats.get("modes", {}).items():
+        families = {}
+        for family, value_field, _ in RECORD_FAMILIES:
+            if fields.get(value_field) is not None:
+                families[family] = {name: value for name, value in fields.items() if name.startswith(family + "_")}
+        if families:
+            current = state["records"].get(mode_key, {})
+            state["records"][mode_key] = _merge_records(current, families)
+
+
+def capture_local_state(state: Dict[str, Any], stats: Dict[str, Any], device_id: str) -> Dict[str, Any]:
+    """Met à jour, dans `state`, les entrées de l'appareil d'après ses stats locales."""
+    _capture_counters(state, stats, device_id)
+    _capture_confusions(state, stats, device_id)
+    _capture_sketches(state, stats, device_id)
+    _capture_records(state, stats)
+    return state
+
+
+# ---------- Fichiers ----------
+def _sync_state_path() -> str:
+    return os.path.join(os.path.dirname(stats_manager.STATS_FILE_PATH), SYNC_STATE_FILE_NAME)
+
+
+def _read_json(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_json(path: str, payload: Dict[str, Any]) -> None:
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _load_local_state() -> Tuple[Dict[str, Any], str]:
+    """État de synchronisation de l'appareil (créé au premier usage), à jour des stats locales."""
+    path = _sync_state_path()
+    state = _read_json(path) if os.path.isfile(path) else empty_state()
+    device_id = state.get("device_id") or uuid.uuid4().hex
+    state = {**empty_state(), **state, "device_id": device_id}
+    capture_local_state(state, stats_manager.load_stats(), device_id)
+    return state, device_id
+
+
+def _save_local_state(state: Dict[str, Any], device_id: str) -> None:
+    saved = dict(state, device_id=device_id, events=[])
+    _write_json(_sync_state_path(), saved)
+
+
+def export_stats(path: str) -> Dict[str, int]:
+    """Exporte les stats du profil actif (et l'historique des tentatives) dans un fichier fusionnable."""
+    state, device_id = _load_local_state()
+    _save_local_state(state, device_id)
+    store = get_attempt_store()
+    events = [list(row) for row in store.export_events()] if store is not None else []
+    _write_json(path, dict(state, device_id=device_id, events=events))
+    return {"events": len(events)}
+
+
+def import_stats(path: str) -> Dict[str, int]:
+    """Fusionne un fichier exporté (par un autre appareil) dans les stats du profil actif."""
+    remote = _read_json(path)
+    if remote.get("format") != SYNC_FORMAT:
+        raise ValueError(f"Format de synchronisation non pris en charge : {remote.get('format')!r}")
+    local, device_id = _load_local_state()
+    events = remote.get("events", [])
+    merged = merge_states(local, dict(remote, events=[]))
+    sections, records = materialize(merged)
+    stats_manager.apply_synced_stats(sections, records)
+    _save_local_state(merged, device_id)
+    store = get_attempt_store()
+    rejected = 0
+    if store is not None:
+        rejected = store.import_events(events)
+        store.flush()
+    return {"events": len(events) - rejected, "rejected": rejected}
+
+
+def merge_files(paths: List[str], output: str) -> Dict[str, int]:
+    """Fusionne plusieurs fichiers exportés en un seul (sans toucher aux stats locales)."""
+    merged = empty_state()
+    for path in paths:
+        merged = merge_states(merged, _read_json(path))
+    _write_json(output, merged)
+    return {"events": len(merged["events"])}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Synchronisation des statistiques entre appareils.")
+    parser.add_argument("--profile", help="profil à utiliser (défaut : %(default)s)", default="default")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="exporter les stats du profil dans un fichier")
+    export_parser.add_argument("file")
+    import_parser = commands.add_parser("import", help="fusionner un fichier exporté dans les stats du profil")
+    import_parser.add_argument("file")
+    merge_parser = commands.add_parser("merge", help="fusionner des fichiers exportés en un seul")
+    merge_parser.add_argument("files", nargs="+")
+    merge_parser.add_argument("-o", "--output", required=True)
+    args = parser.parse_args(argv)
+
+    if args.command == "merge":
+        result = merge_files(args.files, args.output)
+        print(f"{len(args.files)} fichier(s) fusionné(s) dans {args.output} ({result['events']} tentatives).")
+        return 0
+
+    activate_profile(args.profile)
+    if args.command == "export":
+        result = export_stats(args.file)
+        print(f"Profil '{args.profile}' exporté dans {args.file} ({result['events']} tentatives).")
+    else:
+        result = import_stats(args.file)
+        print(f"{args.file} fusionné dans le profil '{args.profile}' ({result['events']} tentatives reçues).")
+        if result["rejected"]:
+            print(f"{result['rejected']} tentative(s) mal formée(s) ignorée(s).")
+    stats_manager.flush_stats()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+# virtual_midi.py
+import heapq
+import itertools
+import random
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+import mido
+
+import clock
+from settings import app_settings
+
+# Port de bouclage toujours proposé : ce qui est envoyé sur la sortie revient sur l'entrée
+VIRTUAL_PORT_NAME = "Bouclage virtuel"
+
+
+class VirtualInputPort:
+    """
+    Port d'entrée d'un bus virtuel, avec l'interface d'un port mido : iter_pending, poll,
+    ou `callback` appelé à l'arrivée de chaque message (comme avec rtmidi).
+    """
+
+    def __init__(self, bus: "LoopbackBus", callback: Optional[Callable] = None):
+        self._bus = bus
+        self.callback = callback
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self.closed = False
+        # Instant d'arrivée du dernier message programmé (ordre d'envoi conservé malgré la gigue)
+        self.last_due = float("-inf")
+
+    @property
+    def name(self):
+        return self._bus.name
+
+    def _deliver(self, msg):
+        if self.closed:
+            return
+        callback = self.callback
+        if callback is not None:
+            callback(msg)
+        else:
+            with self._lock:
+                self._pending.append(msg)
+
+    def iter_pending(self):
+        while True:
+            msg = self.poll()
+            if msg is None:
+                return
+            yield msg
+
+    def poll(self):
+        with self._lock:
+            return self._pending.popleft() if self._pending else None
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self._bus._detach(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class VirtualOutputPort:
+    """Port de sortie d'un bus virtuel : les messages envoyés arrivent sur les entrées du bus."""
+
+    def __init__(self, bus: "LoopbackBus"):
+        self._bus = bus
+        self.closed = False
+
+    @property
+    def name(self):
+        return self._bus.name
+
+    def send(self, msg):
+        if self.closed:
+            raise ValueError("send() called on closed port")
+        self._bus.transmit(msg)
+
+    def reset(self):
+        """Relâche toutes les notes et réinitialise les contrôleurs (comme mido)."""
+        for channel in range(16):
+            self.send(mido.Message('control_change', channel=channel, control=123, value=0))
+            self.send(mido.Message('control_change', channel=channel, control=121, value=0))
+
+    def panic(self):
+        for channel in range(16):
+            self.send(mido.Message('control_change', channel=channel, control=120, value=0))
+
+    def close(self):
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class LoopbackBus:
+    """
+    Câble MIDI virtuel en mémoire : chaque message envoyé sur une sortie du bus arrive
+    sur toutes ses entrées ouvertes, après `latency` secondes plus une gigue tirée
+    uniformément entre 0 et `jitter` secondes. Comme sur un vrai câble, l'ordre d'envoi
+    est conservé (un message n'arrive jamais avant le précédent).
+
+    Les arrivées suivent l'horloge active (voir clock) : sur une horloge virtuelle elles
+    sont programmées sur l'horloge et délivrées quand le programme attend ; sur l'horloge
+    réelle, un thread de livraison les délivre à l'heure. Sans latence ni gigue, le
+    message est délivré immédiatement.
+    """
+
+    def __init__(self, name: str, latency: float = 0.0, jitter: float = 0.0,
+                 rng: Optional[random.Random] = None):
+        self.name = name
+        self.latency = latency
+        self.jitter = jitter
+        self._rng = rng or random.Random()
+        self._inputs: List[VirtualInputPort] = []
+        self._lock = threading.Lock()
+        # Livraisons en attente sur l'horloge réelle : (instant, ordre, entrée, message)
+        self._heap = []
+        self._sequence = itertools.count()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread = None
+
+    def open_input(self, callback: Optional[Callable] = None) -> VirtualInputPort:
+        port = VirtualInputPort(self, callback)
+        with self._lock:
+            self._inputs.append(port)
+        return port
+
+    def open_output(self) -> VirtualOutputPort:
+        return VirtualOutputPort(self)
+
+    def _detach(self, port: VirtualInputPort):
+        with self._lock:
+            if port in self._inputs:
+                self._inputs.remove(port)
+
+    def transmit(self, msg):
+        active_clock = clock.get_clock()
+        now = active_clock.now()
+        with self._lock:
+            inputs = list(self._inputs)
+        for port in inputs:
+            delay = self.latency + (self._rng.uniform(0.0, self.jitter) if self.jitter > 0 else 0.0)
+            due = max(now + max(0.0, delay), port.last_due)
+            port.last_due = due
+            copy = msg.copy()
+            if due <= now and not self._heap:
+                port._deliver(copy)
+            elif active_clock.virtual:
+                active_clock.call_at(due, lambda port=port, copy=copy: port._deliver(copy))
+            else:
+                self._schedule(due, port, copy)
+
+    # ---------- Livraison sur l'horloge réelle ----------
+    def _schedule(self, due: float, port: VirtualInputPort, msg):
+        with self._wakeup:
+            heapq.heappush(self._heap, (due, next(self._sequence), port, msg))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run_delivery, name="virtual-midi", daemon=True)
+                self._thread.start()
+            self._wakeup.notify()
+
+    def _run_delivery(self):
+        while True:
+            with self._wakeup:
+                while not self._heap:
+                    self._wakeup.wait()
+                due, _, port, msg = self._heap[0]
+                delay = due - clock.now()
+                if delay > 0:
+                    self._wakeup.wait(delay)
+                    continue
+                heapq.heappop(self._heap)
+            port._deliver(msg)
+
+
+# Bus virtuels par nom ; le port de bouclage est créé au premier accès
+_buses: Dict[str, LoopbackBus] = {}
+
+
+def get_bus(name: str = VIRTUAL_PORT_NAME) -> LoopbackBus:
+    """Retourne le bus virtuel `name`, créé (latence et gigue des paramètres) s'il n'existe pas."""
+    bus = _buses.get(name)
+    if bus is None:
+        bus = _buses[name] = LoopbackBus(name, app_settings.virtual_midi_latency, app_settings.virtual_midi_jitter)
+    return bus
+
+
+def create_bus(name: str, latency: float = 0.0, jitter: float = 0.0,
+               rng: Optional[random.Random] = None) -> LoopbackBus:
+    """Crée (ou remplace) un bus virtuel, proposé ensuite comme port d'entrée et de sortie."""
+    bus = _buses[name] = LoopbackBus(name, latency, jitter, rng)
+    return bus
+
+
+def is_virtual_port(name: str) -> bool:
+    return name == VIRTUAL_PORT_NAME or name in _buses
+
+
+def _virtual_names() -> List[str]:
+    return list(dict.fromkeys([VIRTUAL_PORT_NAME] + list(_buses)))
+
+
+def _system_names(get_names) -> List[str]:
+    try:
+        return get_names()
+    except Exception:
+        # Pas de backend MIDI utilisable (rtmidi absent, pas d'ALSA...) : ports virtuels seulement
+        return []
+
+
+# ---------- Équivalents de mido.get_*_names / mido.open_* incluant les ports virtuels ----------
+def get_input_names() -> List[str]:
+    return _system_names(mido.get_input_names) + _virtual_names()
+
+
+def get_output_names() -> List[str]:
+    return _system_names(mido.get_output_names) + _virtual_names()
+
+
+def open_input(name: str, callback: Optional[Callable] = None, **kwargs):
+    if is_virtual_port(name):
+        return get_bus(name).open_input(callback)
+    return mido.open_input(name, callback=callback, **kwargs)
+
+
+def open_output(name: str, **kwargs):
+    if is_virtual_port(name):
+        return get_bus(name).open_output()
+    return mido.open_output(name, **kwargs)